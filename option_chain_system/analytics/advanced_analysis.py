@@ -7,6 +7,7 @@ Provides:
 - Max Pain Calculation
 """
 
+import numpy as np
 import pandas as pd
 
 
@@ -101,19 +102,16 @@ class AdvancedOptionAnalysis:
                 base_pe_oi = float(baseline_pe_oi_by_strike.get(strike, 0.0))
                 ce_oi_change_by_strike[float(strike)] = current_ce_oi - base_ce_oi
                 pe_oi_change_by_strike[float(strike)] = current_pe_oi - base_pe_oi
+            # One grouped pass per side instead of a boolean mask per strike.
+            ce_oi_all = (
+                pd.to_numeric(ce_df["open_interest"], errors="coerce").fillna(0.0).groupby(ce_df["strike_price"]).sum()
+            )
+            pe_oi_all = (
+                pd.to_numeric(pe_df["open_interest"], errors="coerce").fillna(0.0).groupby(pe_df["strike_price"]).sum()
+            )
             for strike in strikes:
-                current_ce_oi_all = float(
-                    pd.to_numeric(
-                        ce_df.loc[ce_df["strike_price"] == strike, "open_interest"],
-                        errors="coerce",
-                    ).fillna(0.0).sum()
-                )
-                current_pe_oi_all = float(
-                    pd.to_numeric(
-                        pe_df.loc[pe_df["strike_price"] == strike, "open_interest"],
-                        errors="coerce",
-                    ).fillna(0.0).sum()
-                )
+                current_ce_oi_all = float(ce_oi_all.get(strike, 0.0))
+                current_pe_oi_all = float(pe_oi_all.get(strike, 0.0))
                 base_ce_oi_all = float(baseline_ce_oi_by_strike.get(float(strike), 0.0))
                 base_pe_oi_all = float(baseline_pe_oi_by_strike.get(float(strike), 0.0))
                 ce_oi_change_all_by_strike[float(strike)] = current_ce_oi_all - base_ce_oi_all
@@ -200,35 +198,64 @@ class AdvancedOptionAnalysis:
 
     # -----------------------------------
     @staticmethod
-    def calculate_max_pain(
+    def calculate_pain_curve(
         df: pd.DataFrame
-    ) -> float:
+    ) -> pd.DataFrame:
         """
-        Calculate Max Pain level
+        Writer payout if expiry settles at each listed strike.
+
+        Uses prefix sums over strike-sorted OI, so the whole curve costs
+        O(n log n) instead of one pass over the chain per strike:
+        CE pain(s) = s * sum(oi, k < s) - sum(k * oi, k < s)
+        PE pain(s) = sum(k * oi, k > s) - s * sum(oi, k > s)
         """
 
-        strikes = sorted(df["strike_price"].unique())
-        max_pain_data = []
+        strikes = np.sort(pd.to_numeric(df["strike_price"], errors="coerce").dropna().unique()).astype(float)
+        k = pd.to_numeric(df["strike_price"], errors="coerce").to_numpy(dtype=float)
+        oi = pd.to_numeric(df["open_interest"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+        valid = ~np.isnan(k)
+        is_call = (df["option_type"] == "CE").to_numpy() & valid
+        is_put = ~(df["option_type"] == "CE").to_numpy() & valid
 
-        for strike in strikes:
+        def _prefix(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+            order = np.argsort(k[mask], kind="stable")
+            side_k = k[mask][order]
+            side_oi = oi[mask][order]
+            cum_oi = np.concatenate(([0.0], np.cumsum(side_oi)))
+            cum_koi = np.concatenate(([0.0], np.cumsum(side_k * side_oi)))
+            return side_k, cum_oi, cum_koi
 
-            total_loss = 0
+        ce_k, ce_cum_oi, ce_cum_koi = _prefix(is_call)
+        ce_idx = np.searchsorted(ce_k, strikes, side="left")
+        ce_pain = strikes * ce_cum_oi[ce_idx] - ce_cum_koi[ce_idx]
 
-            for _, row in df.iterrows():
+        pe_k, pe_cum_oi, pe_cum_koi = _prefix(is_put)
+        pe_idx = np.searchsorted(pe_k, strikes, side="right")
+        pe_pain = (pe_cum_koi[-1] - pe_cum_koi[pe_idx]) - strikes * (pe_cum_oi[-1] - pe_cum_oi[pe_idx])
 
-                if row["option_type"] == "CE":
-                    intrinsic = max(0, strike - row["strike_price"])
-                else:
-                    intrinsic = max(0, row["strike_price"] - strike)
+        return pd.DataFrame(
+            {
+                "strike_price": strikes,
+                "ce_pain": ce_pain,
+                "pe_pain": pe_pain,
+                "total_pain": ce_pain + pe_pain,
+            }
+        )
 
-                total_loss += intrinsic * row["open_interest"]
+    # -----------------------------------
+    @staticmethod
+    def calculate_max_pain(
+        df: pd.DataFrame
+    ) -> float:
+        """
+        Calculate Max Pain level
+        """
 
-            max_pain_data.append((strike, total_loss))
+        curve = AdvancedOptionAnalysis.calculate_pain_curve(df)
+        if curve.empty:
+            raise ValueError("Cannot compute max pain for an empty option chain")
 
-        # Strike with minimum total loss
-        max_pain_strike = min(
-            max_pain_data,
-            key=lambda x: x[1]
-        )[0]
+        # Strike with minimum total loss (first one on ties)
+        max_pain_strike = curve["strike_price"].iloc[int(np.argmin(curve["total_pain"].to_numpy()))]
 
         return float(max_pain_strike)
@@ -0,0 +1,117 @@
+"""
+Per-symbol, per-trading-day cache of the market-open OI baseline.
+
+The baseline is the first chain at or after market open; it does not
+change for the rest of the day, so it is loaded from PostgreSQL (one
+snapshot_batches probe plus that batch's rows) at most once per symbol per
+day and kept as {strike: oi} dicts per side. A new trading day replaces
+the entry.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Mapping
+import threading
+import pandas as pd
+
+from database.market_context_repository import MarketContextRepository
+
+
+@dataclass(frozen=True)
+class _Baseline:
+    day: date
+    snapshot_time: datetime | None
+    ce: Mapping[float, float]
+    pe: Mapping[float, float]
+
+
+_EMPTY: Mapping[float, float] = MappingProxyType({})
+
+
+class BaselineOICache:
+    MARKET_OPEN = "09:15:00"
+
+    _baselines: dict[str, _Baseline] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _by_strike(df: pd.DataFrame) -> tuple[Mapping[float, float], Mapping[float, float]]:
+        """
+        One grouped pass over the chain -> read-only {strike: oi} per side.
+        """
+        oi = pd.to_numeric(df["open_interest"], errors="coerce").fillna(0.0)
+        strikes = pd.to_numeric(df["strike_price"], errors="coerce")
+        grouped = oi.groupby([df["option_type"], strikes]).sum()
+        sides = {"CE": {}, "PE": {}}
+        for (option_type, strike), value in grouped.items():
+            if option_type in sides:
+                sides[option_type][float(strike)] = float(value)
+        return MappingProxyType(sides["CE"]), MappingProxyType(sides["PE"])
+
+    @classmethod
+    def _cached(cls, symbol: str, day: date) -> _Baseline | None:
+        with cls._lock:
+            entry = cls._baselines.get(symbol)
+            if entry is not None and entry.day != day:
+                # Day roll: yesterday's baseline is never valid again.
+                del cls._baselines[symbol]
+                entry = None
+        return entry
+
+    @classmethod
+    def get(cls, symbol: str, upto_time: datetime) -> tuple[Mapping[float, float], Mapping[float, float]]:
+        """
+        (CE, PE) baseline OI by strike for the trading day of `upto_time`.
+        Empty until the day's first chain has been stored. The mappings are
+        shared and read-only.
+        """
+        open_time = MarketContextRepository.session_open(upto_time, cls.MARKET_OPEN)
+        day = open_time.date()
+        entry = cls._cached(symbol, day)
+        if entry is not None and entry.snapshot_time is not None and entry.snapshot_time <= upto_time:
+            return entry.ce, entry.pe
+
+        df = MarketContextRepository.fetch_open_oi_by_strike(symbol, upto_time, cls.MARKET_OPEN)
+        if df.empty:
+            if entry is None:
+                with cls._lock:
+                    cls._baselines[symbol] = _Baseline(day, None, _EMPTY, _EMPTY)
+            return _EMPTY, _EMPTY
+
+        ce, pe = cls._by_strike(df)
+        baseline_time = df["baseline_snapshot_time"].iloc[0]
+        if entry is None or entry.snapshot_time is None:
+            with cls._lock:
+                cls._baselines[symbol] = _Baseline(day, baseline_time, ce, pe)
+        return ce, pe
+
+    @classmethod
+    def observe(cls, symbol: str, snapshot_time: datetime, df: pd.DataFrame) -> None:
+        """
+        Seed the day's baseline from a chain this process just committed, when
+        the database had none for the day yet (the first chain after open).
+        Call it only after the snapshot write succeeded, so the cache never
+        holds a baseline a reload from the database would not return.
+        """
+        if df.empty:
+            return
+        open_time = MarketContextRepository.session_open(snapshot_time, cls.MARKET_OPEN)
+        if snapshot_time < open_time:
+            return
+        entry = cls._cached(symbol, open_time.date())
+        if entry is None or entry.snapshot_time is not None:
+            return
+        ce, pe = cls._by_strike(df)
+        with cls._lock:
+            cls._baselines[symbol] = _Baseline(entry.day, snapshot_time, ce, pe)
+
+    @classmethod
+    def clear(cls, symbol: str | None = None) -> None:
+        with cls._lock:
+            if symbol is None:
+                cls._baselines.clear()
+            else:
+                cls._baselines.pop(symbol, None)
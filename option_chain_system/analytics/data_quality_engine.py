@@ -38,7 +38,12 @@ class DataQualityEngine:
         spot: float,
         snapshot_time: datetime,
         max_stale_minutes: int = 12,
+        as_of: datetime | None = None,
     ) -> DataQualityResult:
+        """
+        `as_of` is the reference clock for staleness (wall clock when None);
+        replays pass the snapshot's own time.
+        """
         warnings: list[str] = []
         anomaly_flags: list[str] = []
 
@@ -52,7 +57,10 @@ class DataQualityEngine:
             )
 
         # Stale data guardrail
-        now = datetime.now(snapshot_time.tzinfo) if snapshot_time.tzinfo else datetime.now()
+        if as_of is not None:
+            now = as_of
+        else:
+            now = datetime.now(snapshot_time.tzinfo) if snapshot_time.tzinfo else datetime.now()
         age = now - snapshot_time
         stale_data = age > timedelta(minutes=max_stale_minutes)
         if stale_data:
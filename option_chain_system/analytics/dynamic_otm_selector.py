@@ -4,6 +4,7 @@ Dynamic OTM strike selector using delta, liquidity, skew, theta and momentum ali
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from analytics.option_geeks_engine import OptionGeeksEngine
 
@@ -57,72 +58,65 @@ class DynamicOTMSelector:
 
         # Estimate skew using CE/PE IV medians if available.
         skew = 0.0
-        iv_col = next((c for c in ("iv", "implied_volatility", "impliedVolatility") if c in df.columns), None)
-        if iv_col:
-            ce_iv = pd.to_numeric(df[df["option_type"] == "CE"][iv_col], errors="coerce").median()
-            pe_iv = pd.to_numeric(df[df["option_type"] == "PE"][iv_col], errors="coerce").median()
-            if pd.notna(ce_iv) and pd.notna(pe_iv):
-                if ce_iv > 1.5:
-                    ce_iv = ce_iv / 100.0
-                if pe_iv > 1.5:
-                    pe_iv = pe_iv / 100.0
-                skew = float(pe_iv - ce_iv)
+        chain_iv = pd.Series(OptionGeeksEngine.chain_iv(df), index=df.index)
+        ce_iv = chain_iv[df["option_type"] == "CE"].median()
+        pe_iv = chain_iv[df["option_type"] == "PE"].median()
+        if pd.notna(ce_iv) and pd.notna(pe_iv):
+            skew = float(pe_iv - ce_iv)
 
         reasons: list[str] = []
-        scored_rows = []
         vol_ref = float(work["volume"].quantile(0.7) or work["volume"].mean() or 1.0)
         oi_ref = float(work["open_interest"].quantile(0.7) or work["open_interest"].mean() or 1.0)
 
-        for _, row in work.iterrows():
-            strike = float(row["strike_price"])
-            ltp = float(row["ltp"])
-            g = OptionGeeksEngine._bs_greeks(  # noqa: SLF001
-                spot=spot,
-                strike=strike,
-                time_years=t,
-                sigma=sigma,
-                option_type=side,
-            )
-            delta_abs = abs(float(g["delta"]))
-            theta_abs = abs(float(g["theta"]))
-            vega = float(g["vega"])
-
-            delta_score = 1.0 - min(1.0, abs((delta_abs - (d_low + d_high) / 2.0)) / 0.20)
-            liquidity_score = min(1.0, (float(row["volume"]) / max(1.0, vol_ref)) * 0.6 + (float(row["open_interest"]) / max(1.0, oi_ref)) * 0.4)
-            theta_score = max(0.0, 1.0 - min(1.0, theta_abs / 9.0))
-            skew_score = 0.5
-            if side == "CE":
-                skew_score = 1.0 if skew <= 0 else max(0.0, 1.0 - min(1.0, skew / 0.12))
-            if side == "PE":
-                skew_score = 1.0 if skew >= 0 else max(0.0, 1.0 - min(1.0, abs(skew) / 0.12))
-
-            momentum_score = 0.5
-            if breakout_signal == "Bullish Breakout" and side == "CE":
-                momentum_score = 1.0
-            elif breakout_signal == "Bearish Breakdown" and side == "PE":
-                momentum_score = 1.0
-            elif breakout_signal == "No Breakout":
-                momentum_score = 0.35
-
-            total = (
-                0.32 * delta_score
-                + 0.28 * liquidity_score
-                + 0.18 * theta_score
-                + 0.10 * skew_score
-                + 0.12 * momentum_score
-            )
-            scored_rows.append(
-                {
-                    "strike": strike,
-                    "ltp": ltp,
-                    "score": total,
-                    "delta_abs": delta_abs,
-                    "theta_abs": theta_abs,
-                    "vega": vega,
-                }
-            )
-
-        picked = max(scored_rows, key=lambda x: x["score"])
+        strikes = work["strike_price"].to_numpy(dtype=float)
+        g = OptionGeeksEngine._bs_greeks_vectorized(  # noqa: SLF001
+            spot=spot,
+            strikes=strikes,
+            time_years=t,
+            sigma=OptionGeeksEngine._row_sigma(work, sigma),  # noqa: SLF001
+            is_call=np.full(len(strikes), side == "CE"),
+        )
+        delta_abs = np.abs(g["delta"])
+        theta_abs = np.abs(g["theta"])
+
+        delta_score = 1.0 - np.minimum(1.0, np.abs(delta_abs - (d_low + d_high) / 2.0) / 0.20)
+        liquidity_score = np.minimum(
+            1.0,
+            (work["volume"].to_numpy(dtype=float) / max(1.0, vol_ref)) * 0.6
+            + (work["open_interest"].to_numpy(dtype=float) / max(1.0, oi_ref)) * 0.4,
+        )
+        theta_score = np.maximum(0.0, 1.0 - np.minimum(1.0, theta_abs / 9.0))
+
+        skew_score = 0.5
+        if side == "CE":
+            skew_score = 1.0 if skew <= 0 else max(0.0, 1.0 - min(1.0, skew / 0.12))
+        if side == "PE":
+            skew_score = 1.0 if skew >= 0 else max(0.0, 1.0 - min(1.0, abs(skew) / 0.12))
+
+        momentum_score = 0.5
+        if breakout_signal == "Bullish Breakout" and side == "CE":
+            momentum_score = 1.0
+        elif breakout_signal == "Bearish Breakdown" and side == "PE":
+            momentum_score = 1.0
+        elif breakout_signal == "No Breakout":
+            momentum_score = 0.35
+
+        total = (
+            0.32 * delta_score
+            + 0.28 * liquidity_score
+            + 0.18 * theta_score
+            + 0.10 * skew_score
+            + 0.12 * momentum_score
+        )
+        best = int(np.argmax(total))
+        picked = {
+            "strike": float(strikes[best]),
+            "ltp": float(work["ltp"].iloc[best]),
+            "score": float(total[best]),
+            "delta_abs": float(delta_abs[best]),
+            "theta_abs": float(theta_abs[best]),
+            "vega": float(g["vega"][best]),
+        }
         reasons.append(f"Selected strike with highest blended score ({picked['score']:.2f}).")
         reasons.append(f"Delta abs {picked['delta_abs']:.2f} in target regime band [{d_low:.2f}, {d_high:.2f}].")
         reasons.append(f"Theta abs {picked['theta_abs']:.2f} and liquidity considered.")
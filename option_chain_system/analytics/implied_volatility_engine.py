@@ -0,0 +1,160 @@
+"""
+Batched implied volatility solver.
+
+Inverts Black-Scholes for every strike's LTP at once using vectorized
+Newton steps with a per-row bisection bracket as fallback. Each symbol's
+last solved surface is kept in process and used to warm-start the next
+snapshot, so a full chain converges in a few array iterations.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import numpy as np
+import pandas as pd
+from analytics.option_geeks_engine import OptionGeeksEngine
+
+
+class ImpliedVolatilityEngine:
+    SIGMA_MIN = 0.01
+    SIGMA_MAX = 3.0
+    # Below one exchange tick of time value the price carries no vol information.
+    MIN_TIME_VALUE = 0.05
+
+    _surfaces: dict[str, dict[tuple[float, str], float]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _bs_price_and_vega(
+        spot: float,
+        strikes: np.ndarray,
+        time_years: np.ndarray,
+        sigma: np.ndarray,
+        is_call: np.ndarray,
+        rate: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        sqrt_t = np.sqrt(time_years)
+        d1 = (np.log(spot / strikes) + (rate + 0.5 * sigma * sigma) * time_years) / (sigma * sqrt_t)
+        d2 = d1 - sigma * sqrt_t
+        discounted_k = strikes * np.exp(-rate * time_years)
+        cdf = OptionGeeksEngine._norm_cdf_array  # noqa: SLF001
+        call_price = spot * cdf(d1) - discounted_k * cdf(d2)
+        put_price = discounted_k * cdf(-d2) - spot * cdf(-d1)
+        price = np.where(is_call, call_price, put_price)
+        vega = spot * np.exp(-0.5 * d1 * d1) / math.sqrt(2.0 * math.pi) * sqrt_t
+        return price, vega
+
+    @staticmethod
+    def solve(
+        spot: float,
+        strikes,
+        prices,
+        time_years,
+        is_call,
+        rate: float = 0.05,
+        initial_sigma=None,
+        max_iter: int = 40,
+        tol: float = 1e-4,
+    ) -> np.ndarray:
+        """
+        Return implied vol per row; NaN where the price violates no-arbitrage
+        bounds or the solver does not converge.
+        """
+        k = np.maximum(np.asarray(strikes, dtype=float), 1e-6)
+        target = np.asarray(prices, dtype=float)
+        t = np.broadcast_to(np.maximum(np.asarray(time_years, dtype=float), 1.0 / 3650.0), k.shape)
+        call = np.broadcast_to(np.asarray(is_call, dtype=bool), k.shape)
+        s = max(float(spot), 1e-6)
+
+        discounted_k = k * np.exp(-rate * t)
+        lower_bound = np.where(call, np.maximum(s - discounted_k, 0.0), np.maximum(discounted_k - s, 0.0))
+        upper_bound = np.where(call, s, discounted_k)
+        solvable = (
+            np.isfinite(target)
+            & (target - lower_bound >= ImpliedVolatilityEngine.MIN_TIME_VALUE)
+            & (target < upper_bound)
+        )
+
+        # Brenner-Subrahmanyam guess unless the previous surface has this contract.
+        guess = np.sqrt(2.0 * math.pi / t) * target / s
+        if initial_sigma is not None:
+            warm = np.asarray(initial_sigma, dtype=float)
+            guess = np.where(np.isfinite(warm), warm, guess)
+        sigma = np.clip(np.nan_to_num(guess, nan=0.2), 0.05, 2.0)
+
+        # Tolerance scales with time value so deep ITM rows still pin sigma down.
+        price_tol = tol * np.maximum(1.0, np.nan_to_num(target - lower_bound))
+        lo = np.full(k.shape, ImpliedVolatilityEngine.SIGMA_MIN)
+        hi = np.full(k.shape, ImpliedVolatilityEngine.SIGMA_MAX)
+        active = solvable.copy()
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            price, vega = ImpliedVolatilityEngine._bs_price_and_vega(s, k, t, sigma, call, rate)
+            diff = price - target
+            converged = np.abs(diff) < price_tol
+            active &= ~converged
+
+            # Price rises with sigma, so the sign of diff tightens the bracket.
+            hi = np.where(active & (diff > 0), sigma, hi)
+            lo = np.where(active & (diff < 0), sigma, lo)
+
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                newton = sigma - diff / vega
+            use_newton = (vega > 1e-8) & (newton > lo) & (newton < hi)
+            stepped = np.where(use_newton, newton, 0.5 * (lo + hi))
+            sigma = np.where(active, stepped, sigma)
+
+        price, _ = ImpliedVolatilityEngine._bs_price_and_vega(s, k, t, sigma, call, rate)
+        ok = solvable & (np.abs(price - target) < 10 * price_tol)
+        return np.where(ok, sigma, np.nan)
+
+    @classmethod
+    def smile_for_chain(
+        cls,
+        df: pd.DataFrame,
+        spot: float,
+        snapshot_time=None,
+        symbol: str | None = None,
+        rate: float = 0.05,
+    ) -> np.ndarray:
+        """
+        Per-row implied vol for a chain snapshot, aligned with `df` rows.
+
+        When `symbol` is given (or present as a column) the previous
+        snapshot's surface warm-starts the solver and is replaced by this one.
+        """
+        if df.empty:
+            return np.array([], dtype=float)
+
+        if symbol is None and "symbol" in df.columns:
+            symbol = str(df["symbol"].iloc[0])
+
+        time_years = OptionGeeksEngine._time_to_expiry_years(df, snapshot_time)  # noqa: SLF001
+        strikes = pd.to_numeric(df["strike_price"], errors="coerce").to_numpy(dtype=float)
+        prices = pd.to_numeric(df["ltp"], errors="coerce").to_numpy(dtype=float)
+        types = df["option_type"].astype(str).to_numpy()
+
+        previous = cls._surfaces.get(symbol, {}) if symbol else {}
+        warm = np.array([previous.get((k, o), np.nan) for k, o in zip(strikes, types)], dtype=float)
+
+        smile = cls.solve(
+            spot=spot,
+            strikes=strikes,
+            prices=prices,
+            time_years=time_years,
+            is_call=types == "CE",
+            rate=rate,
+            initial_sigma=warm,
+        )
+
+        if symbol:
+            surface = {
+                (float(k), str(o)): float(v)
+                for k, o, v in zip(strikes, types, smile)
+                if np.isfinite(v)
+            }
+            with cls._lock:
+                cls._surfaces[symbol] = surface
+        return smile
@@ -5,12 +5,25 @@ Intraday OI delta and acceleration engine.
 from __future__ import annotations
 
 from datetime import datetime, time, timedelta
+from typing import Callable
+import numpy as np
 import pandas as pd
 import pytz
 from database.db_connection import DatabaseConnection
+from analytics.snapshot_cache import SnapshotCache
 
 
 class IntradayOIDeltaEngine:
+    # Batch headers: one index probe instead of DISTINCT over chain rows.
+    SNAPSHOT_TIMES_QUERY = """
+    SELECT snapshot_time
+    FROM snapshot_batches
+    WHERE symbol = %s
+      AND snapshot_time <= %s
+    ORDER BY snapshot_time DESC
+    LIMIT 3
+    """
+
     @staticmethod
     def _get_strike_step(symbol: str) -> int:
         upper = symbol.upper()
@@ -48,6 +61,28 @@ class IntradayOIDeltaEngine:
         ]
         return filtered_current, filtered_prev
 
+    @staticmethod
+    def _side_deltas(current_df: pd.DataFrame, prev_df: pd.DataFrame) -> tuple[float, float]:
+        """
+        CE/PE sums of current OI minus the previous OI at the same strike
+        (0 when the strike is new). Same result as a left merge on
+        (strike_price, option_type), without building the merged frame.
+        """
+        cur_types = current_df["option_type"].to_numpy()
+        cur_strikes = current_df["strike_price"].to_numpy(dtype=float)
+        cur_oi = current_df["open_interest"].to_numpy(dtype=float)
+        prev_types = prev_df["option_type"].to_numpy()
+        prev_strikes = prev_df["strike_price"].to_numpy(dtype=float)
+        prev_oi = np.nan_to_num(prev_df["open_interest"].to_numpy(dtype=float))
+
+        deltas = []
+        for option_type in ("CE", "PE"):
+            cur_mask = (cur_types == option_type) & ~np.isnan(cur_oi)
+            prev_mask = prev_types == option_type
+            matched = np.isin(prev_strikes[prev_mask], cur_strikes[cur_mask])
+            deltas.append(float(cur_oi[cur_mask].sum() - prev_oi[prev_mask][matched].sum()))
+        return deltas[0], deltas[1]
+
     @staticmethod
     def _default_response(reason: str) -> dict:
         return {
@@ -67,24 +102,32 @@ class IntradayOIDeltaEngine:
     @staticmethod
     def _fetch_snapshot_times(symbol: str, snapshot_time: datetime) -> list[datetime]:
         # Prevent future-data leakage by restricting to historical-or-current timestamps.
-        query = """
-        SELECT DISTINCT snapshot_time
-        FROM option_chain_snapshot
-        WHERE symbol = %s
-          AND snapshot_time <= %s
-        ORDER BY snapshot_time DESC
-        LIMIT 3
-        """
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(query, (symbol, snapshot_time))
+            cursor.execute(IntradayOIDeltaEngine.SNAPSHOT_TIMES_QUERY, (symbol, snapshot_time))
             rows = cursor.fetchall()
             return [row[0] for row in rows]
         finally:
             cursor.close()
             DatabaseConnection.release_connection(conn)
 
+    @staticmethod
+    def _recent_snapshot_times(symbol: str, snapshot_time: datetime) -> list[datetime]:
+        # This process's own recent chains first; PostgreSQL only fills gaps (e.g. after a restart).
+        times = SnapshotCache.recent_times(symbol, snapshot_time, limit=3)
+        if len(times) < 3:
+            db_times = IntradayOIDeltaEngine._fetch_snapshot_times(symbol, snapshot_time)
+            times = sorted(set(times) | set(db_times), reverse=True)[:3]
+        return times
+
+    @staticmethod
+    def _load_snapshot(symbol: str, snapshot_time: datetime) -> pd.DataFrame | None:
+        cached = SnapshotCache.get(symbol, snapshot_time)
+        if cached is not None:
+            return cached
+        return IntradayOIDeltaEngine.fetch_snapshot_by_time(symbol, snapshot_time)
+
     @staticmethod
     def fetch_snapshot_by_time(symbol: str, snapshot_time: datetime) -> pd.DataFrame | None:
         query = """
@@ -110,6 +153,26 @@ class IntradayOIDeltaEngine:
 
     @staticmethod
     def calculate_oi_delta(symbol: str, snapshot_time: datetime, spot: float) -> dict:
+        return IntradayOIDeltaEngine.delta_from_snapshots(
+            symbol=symbol,
+            snapshot_time=snapshot_time,
+            spot=spot,
+            recent_times=lambda: IntradayOIDeltaEngine._recent_snapshot_times(symbol, snapshot_time),
+            load_snapshot=lambda ts: IntradayOIDeltaEngine._load_snapshot(symbol, ts),
+        )
+
+    @staticmethod
+    def delta_from_snapshots(
+        symbol: str,
+        snapshot_time: datetime,
+        spot: float,
+        recent_times: Callable[[], list[datetime]],
+        load_snapshot: Callable[[datetime], pd.DataFrame | None],
+    ) -> dict:
+        """
+        OI delta/acceleration over the latest snapshot times (newest first).
+        Sources are injected so historical replay can run on in-memory chains.
+        """
         ist = pytz.timezone("Asia/Kolkata")
         now_ist = snapshot_time.astimezone(ist)
         if now_ist.weekday() >= 5:
@@ -117,7 +180,7 @@ class IntradayOIDeltaEngine:
         if not (time(9, 15) <= now_ist.time() <= time(15, 30)):
             return IntradayOIDeltaEngine._market_closed_response()
 
-        times = IntradayOIDeltaEngine._fetch_snapshot_times(symbol, snapshot_time)
+        times = recent_times()
         if len(times) < 2:
             return IntradayOIDeltaEngine._default_response("No Previous Data")
 
@@ -126,8 +189,8 @@ class IntradayOIDeltaEngine:
         if abs(current_time - prev_time) > timedelta(minutes=15):
             return IntradayOIDeltaEngine._default_response("Data Gap - Skip")
 
-        current_df = IntradayOIDeltaEngine.fetch_snapshot_by_time(symbol, current_time)
-        prev_df = IntradayOIDeltaEngine.fetch_snapshot_by_time(symbol, prev_time)
+        current_df = load_snapshot(current_time)
+        prev_df = load_snapshot(prev_time)
         if current_df is None or prev_df is None:
             return IntradayOIDeltaEngine._default_response("Snapshot Fetch Failed")
 
@@ -141,39 +204,15 @@ class IntradayOIDeltaEngine:
         if current_df.empty or prev_df.empty:
             return IntradayOIDeltaEngine._default_response("ATM Filter Empty")
 
-        current_df = current_df[["strike_price", "option_type", "open_interest"]].rename(
-            columns={"open_interest": "oi_current"}
-        )
-        prev_df = prev_df[["strike_price", "option_type", "open_interest"]].rename(
-            columns={"open_interest": "oi_prev"}
-        )
-
-        merged = pd.merge(current_df, prev_df, on=["strike_price", "option_type"], how="left")
-        merged["oi_prev"] = merged["oi_prev"].fillna(0.0)
-        merged["oi_delta"] = merged["oi_current"] - merged["oi_prev"]
-
-        ce_delta = merged.loc[merged["option_type"] == "CE", "oi_delta"].sum()
-        pe_delta = merged.loc[merged["option_type"] == "PE", "oi_delta"].sum()
+        ce_delta, pe_delta = IntradayOIDeltaEngine._side_deltas(current_df, prev_df)
 
         acceleration_direction = "N/A"
         acceleration_probability = 0
         if len(times) >= 3:
             prev_prev_time = times[2]
-            prev_prev_df = IntradayOIDeltaEngine.fetch_snapshot_by_time(symbol, prev_prev_time)
+            prev_prev_df = load_snapshot(prev_prev_time)
             if prev_prev_df is not None:
-                prev_prev_df = prev_prev_df.rename(columns={"open_interest": "oi_prev_prev"})
-                prev_for_acc = prev_df.rename(columns={"oi_prev": "oi_current"})
-                merged_prev = pd.merge(
-                    prev_for_acc,
-                    prev_prev_df[["strike_price", "option_type", "oi_prev_prev"]],
-                    on=["strike_price", "option_type"],
-                    how="left",
-                )
-                merged_prev["oi_prev_prev"] = merged_prev["oi_prev_prev"].fillna(0.0)
-                merged_prev["oi_delta_prev"] = merged_prev["oi_current"] - merged_prev["oi_prev_prev"]
-
-                prev_ce_delta = merged_prev.loc[merged_prev["option_type"] == "CE", "oi_delta_prev"].sum()
-                prev_pe_delta = merged_prev.loc[merged_prev["option_type"] == "PE", "oi_delta_prev"].sum()
+                prev_ce_delta, prev_pe_delta = IntradayOIDeltaEngine._side_deltas(prev_df, prev_prev_df)
                 ce_acc = ce_delta - prev_ce_delta
                 pe_acc = pe_delta - prev_pe_delta
                 total_acc = abs(ce_acc) + abs(pe_acc)
@@ -9,6 +9,25 @@ Purpose:
 
 class MarketBiasEngine:
 
+    @staticmethod
+    def pick_side(market_bias_data: dict, geeks_data: dict) -> str:
+        """
+        Trade side from the bias score and the Greeks' preferred OTM side:
+        "CE", "PE" or "" for no trade. Shared by the live engine, the
+        historical runner and pipeline replay so their picks cannot drift.
+        """
+        score = int(market_bias_data.get("market_score", 0))
+        geeks_side = geeks_data.get("preferred_otm_side", "NO TRADE / WAIT")
+        if score >= 20 and "CE" in geeks_side:
+            return "CE"
+        if score <= -20 and "PE" in geeks_side:
+            return "PE"
+        if score >= 25:
+            return "CE"
+        if score <= -25:
+            return "PE"
+        return ""
+
     @staticmethod
     def _score_to_bias_label(score: int) -> str:
         if score >= 45:
@@ -4,8 +4,11 @@ Market regime engine v2.
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
+from analytics.option_geeks_engine import OptionGeeksEngine
+
 
 class MarketRegimeEngine:
     @staticmethod
@@ -17,18 +20,13 @@ class MarketRegimeEngine:
 
     @staticmethod
     def _iv_percentile(df: pd.DataFrame) -> float:
-        for col in ("iv", "implied_volatility", "impliedVolatility"):
-            if col in df.columns:
-                iv = pd.to_numeric(df[col], errors="coerce").dropna()
-                if iv.empty:
-                    continue
-                v = iv.median()
-                if v > 1.5:
-                    v = v / 100.0
-                # local percentile proxy against practical range 10% to 45%
-                pct = (v - 0.10) / max(0.01, 0.45 - 0.10)
-                return max(0.0, min(1.0, float(pct)))
-        return 0.45
+        iv = OptionGeeksEngine.chain_iv(df)
+        if not np.isfinite(iv).any():
+            return 0.45
+        v = float(np.nanmedian(iv))
+        # local percentile proxy against practical range 10% to 45%
+        pct = (v - 0.10) / max(0.01, 0.45 - 0.10)
+        return max(0.0, min(1.0, float(pct)))
 
     @staticmethod
     def _breadth(df: pd.DataFrame, spot: float) -> float:
@@ -11,10 +11,30 @@ from __future__ import annotations
 
 from datetime import datetime, date
 import math
+import numpy as np
 import pandas as pd
 
 
 class OptionGeeksEngine:
+    VENDOR_IV_COLUMNS = ("iv", "implied_volatility", "impliedVolatility")
+    # Decimal vols from ImpliedVolatilityEngine; never percent-converted.
+    SOLVED_IV_COLUMN = "iv_solved"
+
+    @staticmethod
+    def chain_iv(df: pd.DataFrame) -> np.ndarray:
+        """
+        Per-row decimal IV: the vendor column (percent values converted),
+        with rows it lacks filled from the solved smile; NaN where neither.
+        """
+        iv = np.full(len(df), np.nan)
+        iv_col = next((c for c in OptionGeeksEngine.VENDOR_IV_COLUMNS if c in df.columns), None)
+        if iv_col is not None:
+            vendor = pd.to_numeric(df[iv_col], errors="coerce").to_numpy(dtype=float)
+            iv = np.where(vendor > 1.5, vendor / 100.0, vendor)
+        if OptionGeeksEngine.SOLVED_IV_COLUMN in df.columns:
+            solved = pd.to_numeric(df[OptionGeeksEngine.SOLVED_IV_COLUMN], errors="coerce").to_numpy(dtype=float)
+            iv = np.where(np.isfinite(iv) & (iv > 0), iv, solved)
+        return np.where(np.isfinite(iv) & (iv > 0), iv, np.nan)
 
     @staticmethod
     def _norm_cdf(x: float) -> float:
@@ -24,6 +44,29 @@ class OptionGeeksEngine:
     def _norm_pdf(x: float) -> float:
         return (1.0 / math.sqrt(2.0 * math.pi)) * math.exp(-0.5 * x * x)
 
+    @staticmethod
+    def _norm_cdf_array(x: np.ndarray) -> np.ndarray:
+        # Chebyshev erfc approximation (fractional error < 1.2e-7); numpy has no erf.
+        z = np.abs(x) / math.sqrt(2.0)
+        t = 1.0 / (1.0 + 0.5 * z)
+        poly = -z * z - 1.26551223 + t * (
+            1.00002368 + t * (
+                0.37409196 + t * (
+                    0.09678418 + t * (
+                        -0.18628806 + t * (
+                            0.27886807 + t * (
+                                -1.13520398 + t * (
+                                    1.48851587 + t * (-0.82215223 + t * 0.17087277)
+                                )
+                            )
+                        )
+                    )
+                )
+            )
+        )
+        erfc = t * np.exp(poly)
+        return np.where(x >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
     @staticmethod
     def _parse_expiry(raw_expiry) -> date | None:
         if raw_expiry is None or (isinstance(raw_expiry, float) and math.isnan(raw_expiry)):
@@ -74,16 +117,10 @@ class OptionGeeksEngine:
 
     @staticmethod
     def _infer_sigma(df: pd.DataFrame, spot: float, atm: float) -> float:
-        # Prefer chain IV if available
-        for iv_col in ("iv", "implied_volatility", "impliedVolatility"):
-            if iv_col in df.columns:
-                iv_series = pd.to_numeric(df[iv_col], errors="coerce").dropna()
-                if not iv_series.empty:
-                    iv = float(iv_series.median())
-                    # If already in decimal keep as is, else convert %
-                    if iv > 1.5:
-                        iv = iv / 100.0
-                    return max(0.08, min(1.0, iv))
+        # Prefer chain IV (vendor, else solved) if available
+        iv = OptionGeeksEngine.chain_iv(df)
+        if np.isfinite(iv).any():
+            return max(0.08, min(1.0, float(np.nanmedian(iv))))
 
         # Fallback: derive rough vol from ATM straddle price ratio
         try:
@@ -96,6 +133,14 @@ class OptionGeeksEngine:
         except Exception:
             return 0.20
 
+    @staticmethod
+    def _row_sigma(df: pd.DataFrame, sigma: float) -> np.ndarray:
+        """
+        Per-row vol from the chain's IV (vendor, else solved), else the flat proxy.
+        """
+        iv = OptionGeeksEngine.chain_iv(df)
+        return np.where(np.isfinite(iv), iv, sigma)
+
     @staticmethod
     def _bs_greeks(
         spot: float,
@@ -135,6 +180,47 @@ class OptionGeeksEngine:
 
         return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega}
 
+    @staticmethod
+    def _bs_greeks_vectorized(
+        spot: float,
+        strikes,
+        time_years,
+        sigma,
+        is_call,
+        rate: float = 0.05,
+    ) -> dict[str, np.ndarray]:
+        """
+        Array version of `_bs_greeks`: one call prices a whole chain.
+
+        `time_years` and `sigma` may be scalars or per-row arrays; `is_call`
+        is a boolean array (True for CE, False for PE).
+        """
+        k = np.maximum(np.asarray(strikes, dtype=float), 1e-6)
+        t = np.maximum(np.asarray(time_years, dtype=float), 1.0 / 3650.0)
+        vol = np.maximum(np.asarray(sigma, dtype=float), 0.05)
+        call = np.asarray(is_call, dtype=bool)
+        s = max(float(spot), 1e-6)
+
+        sqrt_t = np.sqrt(t)
+        d1 = (np.log(s / k) + (rate + 0.5 * vol * vol) * t) / (vol * sqrt_t)
+        d2 = d1 - vol * sqrt_t
+
+        nd1 = OptionGeeksEngine._norm_cdf_array(d1)
+        pdf_d1 = np.exp(-0.5 * d1 * d1) / math.sqrt(2.0 * math.pi)
+        discounted_k = rate * k * np.exp(-rate * t)
+        decay = -(s * pdf_d1 * vol) / (2 * sqrt_t)
+
+        delta = np.where(call, nd1, nd1 - 1.0)
+        theta = np.where(
+            call,
+            decay - discounted_k * OptionGeeksEngine._norm_cdf_array(d2),
+            decay + discounted_k * OptionGeeksEngine._norm_cdf_array(-d2),
+        ) / 365.0
+        gamma = pdf_d1 / (s * vol * sqrt_t)
+        vega = s * pdf_d1 * sqrt_t / 100.0
+
+        return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega}
+
     @staticmethod
     def analyze(
         df: pd.DataFrame,
@@ -166,26 +252,24 @@ class OptionGeeksEngine:
         time_years = OptionGeeksEngine._time_to_expiry_years(work, snapshot_time)
         sigma = OptionGeeksEngine._infer_sigma(work, spot, atm)
 
-        greek_rows = []
-        for _, row in work.iterrows():
-            opt_type = str(row.get("option_type", ""))
-            if opt_type not in ("CE", "PE"):
-                continue
-            k = float(row["strike_price"])
-            g = OptionGeeksEngine._bs_greeks(
-                spot=spot,
-                strike=k,
-                time_years=time_years,
-                sigma=sigma,
-                option_type=opt_type,
-            )
-            g["option_type"] = opt_type
-            g["strike_price"] = k
-            g["open_interest"] = float(row["open_interest"])
-            g["volume"] = float(row["volume"])
-            greek_rows.append(g)
-
-        gdf = pd.DataFrame(greek_rows)
+        rows = work[work["option_type"].isin(["CE", "PE"])]
+        strikes = rows["strike_price"].to_numpy(dtype=float)
+        greeks = OptionGeeksEngine._bs_greeks_vectorized(
+            spot=spot,
+            strikes=strikes,
+            time_years=time_years,
+            sigma=OptionGeeksEngine._row_sigma(rows, sigma),
+            is_call=(rows["option_type"] == "CE").to_numpy(),
+        )
+        gdf = pd.DataFrame(
+            {
+                **greeks,
+                "option_type": rows["option_type"].astype(str).to_numpy(),
+                "strike_price": strikes,
+                "open_interest": rows["open_interest"].to_numpy(dtype=float),
+                "volume": rows["volume"].to_numpy(dtype=float),
+            }
+        )
         if gdf.empty:
             return {
                 "bias": "NEUTRAL",
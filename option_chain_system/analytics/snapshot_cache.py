@@ -0,0 +1,68 @@
+"""
+In-process rolling cache of recent option-chain snapshots.
+
+Keeps the last few cleaned chains per symbol, keyed by snapshot_time, so
+intraday engines can compare against chains this process already fetched
+instead of reloading them from PostgreSQL.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import pandas as pd
+
+
+class SnapshotCache:
+    MAX_SNAPSHOTS = 6
+    COLUMNS = ["strike_price", "option_type", "open_interest"]
+
+    _snapshots: dict[str, OrderedDict] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def put(cls, symbol: str, snapshot_time: datetime, df: pd.DataFrame) -> None:
+        """
+        Store the OI columns of a fetched chain, evicting the oldest entries.
+        """
+        if df.empty:
+            return
+
+        chain = df[cls.COLUMNS].copy()
+        chain["strike_price"] = pd.to_numeric(chain["strike_price"], errors="coerce").astype(float)
+        chain["open_interest"] = pd.to_numeric(chain["open_interest"], errors="coerce").fillna(0.0).astype(float)
+        chain = chain.dropna(subset=["strike_price"]).reset_index(drop=True)
+
+        with cls._lock:
+            ring = cls._snapshots.setdefault(symbol, OrderedDict())
+            ring[snapshot_time] = chain
+            if len(ring) > 1 and list(ring.keys())[-2] > snapshot_time:
+                cls._snapshots[symbol] = ring = OrderedDict(sorted(ring.items(), key=lambda item: item[0]))
+            while len(ring) > cls.MAX_SNAPSHOTS:
+                ring.popitem(last=False)
+
+    @classmethod
+    def recent_times(cls, symbol: str, upto_time: datetime, limit: int = 3) -> list[datetime]:
+        """
+        Cached snapshot times at or before `upto_time`, newest first.
+        """
+        with cls._lock:
+            ring = cls._snapshots.get(symbol)
+            times = list(ring.keys()) if ring else []
+        return [t for t in reversed(times) if t <= upto_time][:limit]
+
+    @classmethod
+    def get(cls, symbol: str, snapshot_time: datetime) -> pd.DataFrame | None:
+        with cls._lock:
+            ring = cls._snapshots.get(symbol)
+            chain = ring.get(snapshot_time) if ring else None
+        return chain.copy() if chain is not None else None
+
+    @classmethod
+    def clear(cls, symbol: str | None = None) -> None:
+        with cls._lock:
+            if symbol is None:
+                cls._snapshots.clear()
+            else:
+                cls._snapshots.pop(symbol, None)
@@ -0,0 +1,200 @@
+"""
+Grid parameter sweep over the walk-forward backtester.
+
+Signals and LTP paths for every (symbol, date range) book are loaded from
+PostgreSQL once, packed into shared-memory arrays, and evaluated against
+each BacktestConfig in the grid by a process pool. Workers attach to the
+arrays by name, so paths are never re-queried or pickled per config.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from itertools import product
+from multiprocessing import shared_memory
+import os
+import numpy as np
+import pandas as pd
+from backtesting.walk_forward_backtester import WalkForwardBacktester, BacktestConfig
+from database.market_context_repository import MarketContextRepository
+
+# Column order of the shared arrays.
+TRADE_COLUMNS = ["book", "trade_idx", "entry_ltp", "stop_loss_pct", "target_pct", "time_stop_min"]
+PATH_COLUMNS = ["trade_idx", "offset_min", "ltp"]
+
+
+def build_grid(
+    slippage_pct: list[float],
+    txn_cost_pct: list[float],
+    stop_loss_pct: list[float],
+    target_pct: list[float],
+    time_stop_min: list[int],
+) -> list[BacktestConfig]:
+    """
+    Cartesian product of parameter values; grid configs override the
+    risk settings stored on each signal.
+    """
+    return [
+        BacktestConfig(
+            slippage_pct=float(slip),
+            txn_cost_pct=float(cost),
+            default_stop_loss_pct=float(stop),
+            default_target_pct=float(target),
+            default_time_stop_min=int(tstop),
+            override_signal_risk=True,
+        )
+        for slip, cost, stop, target, tstop in product(
+            slippage_pct, txn_cost_pct, stop_loss_pct, target_pct, time_stop_min
+        )
+    ]
+
+
+def _to_shared(array: np.ndarray) -> tuple[shared_memory.SharedMemory, dict]:
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=np.float64, buffer=shm.buf)
+    view[:] = array
+    return shm, {"name": shm.name, "shape": array.shape}
+
+
+def _attach(spec: dict) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    shm = shared_memory.SharedMemory(name=spec["name"])
+    return shm, np.ndarray(spec["shape"], dtype=np.float64, buffer=shm.buf)
+
+
+def _evaluate_configs(
+    trades: pd.DataFrame,
+    paths: pd.DataFrame,
+    books: list[dict],
+    configs: list[BacktestConfig],
+) -> list[dict]:
+    rows = []
+    for cfg in configs:
+        resolved = WalkForwardBacktester._resolve_risk(trades, cfg)  # noqa: SLF001
+        horizon = resolved.set_index("trade_idx")["time_stop_min"]
+        in_window = paths[paths["offset_min"] <= paths["trade_idx"].map(horizon)]
+        simulated = WalkForwardBacktester._evaluate_exits(resolved, in_window, cfg)  # noqa: SLF001
+        simulated["book"] = resolved["book"].to_numpy()
+
+        for book_id, book in enumerate(books):
+            summary = WalkForwardBacktester.summarize(
+                book["symbol"],
+                book["start_date"],
+                book["end_date"],
+                simulated[simulated["book"] == book_id],
+            )
+            rows.append({**summary, **asdict(cfg)})
+    return rows
+
+
+def _sweep_worker(trade_spec: dict, path_spec: dict, books: list[dict], configs: list[BacktestConfig]) -> list[dict]:
+    trade_shm, trade_array = _attach(trade_spec)
+    path_shm, path_array = _attach(path_spec)
+    try:
+        trades = pd.DataFrame(trade_array.copy(), columns=TRADE_COLUMNS)
+        trades["book"] = trades["book"].astype(int)
+        trades["trade_idx"] = trades["trade_idx"].astype(int)
+        paths = pd.DataFrame(path_array.copy(), columns=PATH_COLUMNS)
+        paths["trade_idx"] = paths["trade_idx"].astype(int)
+    finally:
+        trade_shm.close()
+        path_shm.close()
+    return _evaluate_configs(trades, paths, books, configs)
+
+
+class ParameterSweep:
+    @staticmethod
+    def load_books(books: list[dict], max_time_stop_min: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Fetch signals for every book and their LTP paths (up to the longest
+        time stop in the grid) in one bulk load. Returns (trades, paths)
+        float arrays laid out as TRADE_COLUMNS / PATH_COLUMNS.
+        """
+        frames = []
+        for book_id, book in enumerate(books):
+            signals = MarketContextRepository.fetch_signals_for_range(
+                book["symbol"], book["start_date"], book["end_date"]
+            )
+            if not signals.empty:
+                frames.append(signals.assign(book=book_id))
+
+        if not frames:
+            return np.empty((0, len(TRADE_COLUMNS))), np.empty((0, len(PATH_COLUMNS)))
+
+        signals = pd.concat(frames, ignore_index=True)
+        trades = signals.reset_index(drop=True)
+        trades["trade_idx"] = range(len(trades))
+        trades["entry_ltp"] = pd.to_numeric(trades["entry_ltp"], errors="coerce").fillna(0.0).astype(float)
+        stored_stop = pd.to_numeric(trades["time_stop_min"], errors="coerce").fillna(0)
+        window = np.maximum(stored_stop.to_numpy(dtype=float), float(max_time_stop_min))
+        trades["until_time"] = trades["snapshot_time"] + pd.to_timedelta(window, unit="m")
+
+        paths = WalkForwardBacktester._fetch_ltp_paths(trades[trades["entry_ltp"] > 0])  # noqa: SLF001
+
+        trade_array = np.column_stack(
+            [
+                trades["book"].to_numpy(dtype=float),
+                trades["trade_idx"].to_numpy(dtype=float),
+                trades["entry_ltp"].to_numpy(dtype=float),
+                pd.to_numeric(trades["stop_loss_pct"], errors="coerce").to_numpy(dtype=float),
+                pd.to_numeric(trades["target_pct"], errors="coerce").to_numpy(dtype=float),
+                pd.to_numeric(trades["time_stop_min"], errors="coerce").to_numpy(dtype=float),
+            ]
+        )
+        # No paths (e.g. chains past retention with the archive off): every
+        # trade is skipped, as in the single-config backtester.
+        if paths.empty:
+            return trade_array, np.empty((0, len(PATH_COLUMNS)))
+
+        entry_time = trades.set_index("trade_idx")["snapshot_time"]
+        offsets = (paths["snapshot_time"] - paths["trade_idx"].map(entry_time)).dt.total_seconds() / 60.0
+        path_array = np.column_stack(
+            [
+                paths["trade_idx"].to_numpy(dtype=float),
+                offsets.to_numpy(dtype=float),
+                paths["ltp"].to_numpy(dtype=float),
+            ]
+        )
+        return trade_array, path_array
+
+    @staticmethod
+    def evaluate(
+        trade_array: np.ndarray,
+        path_array: np.ndarray,
+        books: list[dict],
+        grid: list[BacktestConfig],
+        max_workers: int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Evaluate `grid` over pre-loaded arrays on a process pool and return
+        results ranked by expectancy (then shallower drawdown).
+        """
+        if not grid:
+            return pd.DataFrame()
+
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(grid)))
+        chunk_size = max(1, -(-len(grid) // (workers * 4)))
+        chunks = [grid[i:i + chunk_size] for i in range(0, len(grid), chunk_size)]
+
+        trade_shm, trade_spec = _to_shared(np.ascontiguousarray(trade_array, dtype=np.float64))
+        path_shm, path_spec = _to_shared(np.ascontiguousarray(path_array, dtype=np.float64))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_sweep_worker, trade_spec, path_spec, books, chunk) for chunk in chunks]
+                rows = [row for future in futures for row in future.result()]
+        finally:
+            for shm in (trade_shm, path_shm):
+                shm.close()
+                shm.unlink()
+
+        results = pd.DataFrame(rows)
+        results = results.sort_values(
+            ["expectancy", "max_drawdown_pct", "trades"], ascending=[False, True, False], kind="stable"
+        )
+        return results.reset_index(drop=True)
+
+    @staticmethod
+    def run(books: list[dict], grid: list[BacktestConfig], max_workers: int | None = None) -> pd.DataFrame:
+        max_time_stop = max((cfg.default_time_stop_min for cfg in grid), default=30)
+        trade_array, path_array = ParameterSweep.load_books(books, max_time_stop)
+        return ParameterSweep.evaluate(trade_array, path_array, books, grid, max_workers=max_workers)
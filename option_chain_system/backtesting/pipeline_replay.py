@@ -0,0 +1,288 @@
+"""
+Walk-forward replay of the full analytics pipeline over stored snapshots.
+
+Every chain for a symbol and date range is streamed from PostgreSQL in one
+query and driven, in time order, through the same engine chain as a live
+cycle (quality, levels, bias, Greeks, timing, dynamic OTM pick). State the
+live engine reads back from the database - day-open baseline OI, recent
+chains for OI delta, and summary history for the regime model - is kept in
+memory, so each step only sees data up to its own snapshot time.
+
+Emitted signals have the `fetch_signals_for_range` columns and feed
+straight into WalkForwardBacktester; exits are evaluated against the same
+in-memory chains, so a replayed backtest needs no further queries.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, time
+import pandas as pd
+import pytz
+
+from analytics.advanced_analysis import AdvancedOptionAnalysis
+from analytics.basic_analysis import BasicOptionAnalysis
+from analytics.breakout_engine import BreakoutEngine
+from analytics.data_quality_engine import DataQualityEngine
+from analytics.dynamic_otm_selector import DynamicOTMSelector
+from analytics.interpretation_engine import InterpretationEngine
+from analytics.intraday_oi_engine import IntradayOIDeltaEngine
+from analytics.market_bias_engine import MarketBiasEngine
+from analytics.market_regime_engine import MarketRegimeEngine
+from analytics.option_geeks_engine import OptionGeeksEngine
+from analytics.otm_timing_engine_v2 import OTMTimingEngineV2
+from analytics.probability_engine import ProbabilityEngine
+from analytics.scalp_engine import OTMScalpEngine
+from analytics.volume_engine import VolumeEngine
+from backtesting.walk_forward_backtester import WalkForwardBacktester, BacktestConfig
+from database.market_context_repository import MarketContextRepository
+
+
+TIMEZONE = pytz.timezone("Asia/Kolkata")
+MARKET_OPEN = time(9, 15)
+
+SIGNAL_COLUMNS = [
+    "id",
+    "symbol",
+    "snapshot_time",
+    "side",
+    "strike_price",
+    "entry_ltp",
+    "stop_loss_pct",
+    "target_pct",
+    "time_stop_min",
+    "spot_price",
+    "regime",
+    "signal_strength",
+    "timing_score",
+    "raw_probability",
+]
+
+
+def _oi_by_strike(df: pd.DataFrame, option_type: str) -> dict[float, float]:
+    side = df[df["option_type"] == option_type]
+    return {
+        float(k): float(v)
+        for k, v in side.groupby("strike_price", as_index=True)["open_interest"].sum().to_dict().items()
+    }
+
+
+class PipelineReplay:
+    # Live regime detection reads the last 5 summaries; OI delta needs 3 chains.
+    SUMMARY_HISTORY = 5
+    OI_HISTORY = 3
+
+    @staticmethod
+    def load(symbol: str, start_date: str, end_date: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Chains and spot prices for the range (two queries in total).
+        """
+        snapshots = MarketContextRepository.fetch_snapshots_for_range(symbol, start_date, end_date)
+        spots = MarketContextRepository.fetch_spot_series(symbol, start_date, end_date)
+        return snapshots, spots
+
+    @staticmethod
+    def _attach_spots(snapshot_times: pd.Series, spots: pd.DataFrame) -> pd.Series:
+        # Latest summary spot at or before each snapshot (5 min tolerance) - never a later one.
+        if spots.empty:
+            return pd.Series(float("nan"), index=snapshot_times.index)
+        left = pd.DataFrame({"snapshot_time": snapshot_times}).sort_values("snapshot_time")
+        right = spots.sort_values("snapshot_time")
+        right = right.assign(snapshot_time=right["snapshot_time"].astype(left["snapshot_time"].dtype))
+        matched = pd.merge_asof(
+            left,
+            right,
+            on="snapshot_time",
+            direction="backward",
+            tolerance=pd.Timedelta(minutes=5),
+        )
+        return pd.Series(matched["spot_price"].to_numpy(), index=left.index).reindex(snapshot_times.index)
+
+    @staticmethod
+    def replay(symbol: str, snapshots: pd.DataFrame, spots: pd.DataFrame) -> pd.DataFrame:
+        """
+        Run the analytics chain over each snapshot in time order and return
+        one row per emitted signal (SIGNAL_COLUMNS). Calibration stays at
+        identity: fitting on stored outcomes would leak future labels.
+        """
+        if snapshots.empty:
+            return pd.DataFrame(columns=SIGNAL_COLUMNS)
+
+        basic = BasicOptionAnalysis()
+        advanced = AdvancedOptionAnalysis()
+        interpreter = InterpretationEngine()
+        breakout_engine = BreakoutEngine()
+        prob_engine = ProbabilityEngine()
+        volume_engine = VolumeEngine()
+        scalp_engine = OTMScalpEngine()
+        geeks_engine = OptionGeeksEngine()
+
+        chain_times = pd.Series(snapshots["snapshot_time"].unique())
+        spot_by_time = dict(zip(chain_times, PipelineReplay._attach_spots(chain_times, spots)))
+
+        recent_chains: deque[tuple[datetime, pd.DataFrame]] = deque(maxlen=PipelineReplay.OI_HISTORY)
+        summary_rows: deque[dict] = deque(maxlen=PipelineReplay.SUMMARY_HISTORY)
+        baselines: dict = {}
+        signals: list[dict] = []
+
+        for snapshot_time, df in snapshots.groupby("snapshot_time", sort=True):
+            df = df.reset_index(drop=True)
+            recent_chains.appendleft((snapshot_time, df))
+            local = snapshot_time.astimezone(TIMEZONE)
+            if local.date() not in baselines and local.time() >= MARKET_OPEN:
+                baselines[local.date()] = (_oi_by_strike(df, "CE"), _oi_by_strike(df, "PE"))
+
+            spot = spot_by_time.get(snapshot_time)
+            if spot is None or pd.isna(spot):
+                continue
+            spot = float(spot)
+
+            quality = DataQualityEngine.assess(
+                symbol=symbol, df=df, spot=spot, snapshot_time=snapshot_time, as_of=snapshot_time
+            )
+            atm = basic.detect_atm_strike(df, spot)
+            ce_df, pe_df = basic.split_ce_pe(df)
+            total_ce, total_pe = basic.calculate_total_oi(ce_df, pe_df)
+            pcr = basic.calculate_pcr(total_pe, total_ce)
+            baseline_ce, baseline_pe = baselines.get(local.date(), ({}, {}))
+            resistance, support, _ = advanced.oi_based_levels_atm_window(
+                ce_df,
+                pe_df,
+                atm,
+                baseline_ce_oi_by_strike=baseline_ce,
+                baseline_pe_oi_by_strike=baseline_pe,
+            )
+            max_pain = advanced.calculate_max_pain(df)
+            structure = interpreter.detect_writing(ce_df, pe_df)
+            trap = interpreter.detect_trap(spot, resistance, support)
+            volume_data = volume_engine.detect_volume_spike(df, atm)
+            breakout_signal = breakout_engine.detect_breakout(spot, resistance, support)
+            covering_signal = breakout_engine.detect_short_covering(ce_df, pe_df)
+
+            chains = dict(recent_chains)
+            oi_delta_data = IntradayOIDeltaEngine.delta_from_snapshots(
+                symbol=symbol,
+                snapshot_time=snapshot_time,
+                spot=spot,
+                recent_times=lambda: list(chains),
+                load_snapshot=chains.get,
+            )
+
+            summary_rows.append(
+                {
+                    "snapshot_time": snapshot_time,
+                    "spot_price": spot,
+                    "pcr": pcr,
+                    "resistance": resistance,
+                    "support": support,
+                    "max_pain": max_pain,
+                }
+            )
+            regime_data = MarketRegimeEngine.detect(pd.DataFrame(list(summary_rows)), df, oi_delta_data)
+
+            prob_data = prob_engine.calculate_bias(pcr, breakout_signal, structure)
+            scalp_data = scalp_engine.generate_signal(breakout_signal, covering_signal, volume_data, prob_data)
+            market_bias_data = MarketBiasEngine.calculate_market_bias(
+                pcr=pcr,
+                structure=structure,
+                breakout_signal=breakout_signal,
+                trap=trap,
+                spot=spot,
+                support=support,
+                resistance=resistance,
+                max_pain=max_pain,
+                prob_data=prob_data,
+                volume_data=volume_data,
+                oi_delta_data=oi_delta_data,
+                scalp_data=scalp_data,
+            )
+            geeks_data = geeks_engine.analyze(
+                df=df,
+                spot=spot,
+                atm=atm,
+                breakout_signal=breakout_signal,
+                snapshot_time=snapshot_time,
+                profile="aggressive",
+            )
+            timing_data = OTMTimingEngineV2.score(
+                geeks_data=geeks_data,
+                regime_data=regime_data,
+                quality_data={
+                    "stale_data": quality.stale_data,
+                    "missing_strikes": quality.missing_strikes,
+                    "anomaly_flags": quality.anomaly_flags,
+                },
+                market_bias_data=market_bias_data,
+            )
+
+            side = MarketBiasEngine.pick_side(market_bias_data, geeks_data)
+            if not (side and timing_data["allow_trade"] and quality.is_usable):
+                continue
+            pick = DynamicOTMSelector.select(
+                df=df,
+                spot=spot,
+                atm=atm,
+                side=side,
+                breakout_signal=breakout_signal,
+                regime=regime_data["label"],
+                snapshot_time=snapshot_time,
+            )
+            if pick.get("strike") is None:
+                continue
+
+            signals.append(
+                {
+                    "id": len(signals) + 1,
+                    "symbol": symbol,
+                    "snapshot_time": snapshot_time,
+                    "side": side,
+                    "strike_price": float(pick["strike"]),
+                    "entry_ltp": float(pick["entry_ltp"] or 0.0),
+                    "stop_loss_pct": 25.0,
+                    "target_pct": 45.0,
+                    "time_stop_min": 30,
+                    "spot_price": spot,
+                    "regime": regime_data["label"],
+                    "signal_strength": float(market_bias_data.get("market_score", 0)),
+                    "timing_score": float(timing_data["timing_score_v2"]),
+                    "raw_probability": float(timing_data["calibration_input_probability"]),
+                }
+            )
+
+        return pd.DataFrame(signals, columns=SIGNAL_COLUMNS)
+
+    @staticmethod
+    def ltp_paths(trades: pd.DataFrame, snapshots: pd.DataFrame) -> pd.DataFrame:
+        """
+        In-memory counterpart of WalkForwardBacktester._fetch_ltp_paths:
+        LTP of each trade's contract from entry to time stop, time-ordered.
+        """
+        return WalkForwardBacktester._paths_from_snapshots(trades, snapshots)  # noqa: SLF001
+
+    @staticmethod
+    def backtest(
+        symbol: str,
+        snapshots: pd.DataFrame,
+        spots: pd.DataFrame,
+        cfg: BacktestConfig | None = None,
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Replay signals over pre-loaded data and simulate them. Returns
+        (signals, simulated) with simulated rows in signal order.
+        """
+        cfg = cfg or BacktestConfig()
+        signals = PipelineReplay.replay(symbol, snapshots, spots)
+        if signals.empty:
+            return signals, pd.DataFrame()
+        trades = WalkForwardBacktester._prepare_trades(signals, cfg)  # noqa: SLF001
+        paths = PipelineReplay.ltp_paths(trades[trades["entry_ltp"] > 0], snapshots)
+        return signals, WalkForwardBacktester._evaluate_exits(trades, paths, cfg)  # noqa: SLF001
+
+    @staticmethod
+    def run(symbol: str, start_date: str, end_date: str, cfg: BacktestConfig | None = None) -> dict:
+        snapshots, spots = PipelineReplay.load(symbol, start_date, end_date)
+        signals, simulated = PipelineReplay.backtest(symbol, snapshots, spots, cfg)
+        result = WalkForwardBacktester.summarize(symbol, start_date, end_date, simulated)
+        result["snapshots"] = int(snapshots["snapshot_time"].nunique()) if not snapshots.empty else 0
+        result["signals"] = len(signals)
+        return result
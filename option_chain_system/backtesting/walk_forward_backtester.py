@@ -5,10 +5,11 @@ Walk-forward backtester for option-buying signals.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import timedelta
+import numpy as np
 import pandas as pd
 from database.db_connection import DatabaseConnection
 from database.market_context_repository import MarketContextRepository
+from database.snapshot_archive import SnapshotArchive
 
 
 @dataclass
@@ -18,114 +19,199 @@ class BacktestConfig:
     default_stop_loss_pct: float = 25.0
     default_target_pct: float = 45.0
     default_time_stop_min: int = 30
+    # When True the stop/target/time-stop above replace each signal's stored values.
+    override_signal_risk: bool = False
 
 
 class WalkForwardBacktester:
+    PATH_CHUNK_SIZE = 500
+    # Served by idx_snapshot_contract_time (index-only on ltp).
+    PATH_QUERY = """
+    SELECT r.trade_idx, s.snapshot_time, s.ltp
+    FROM unnest(%s::int[], %s::text[], %s::text[], %s::numeric[], %s::timestamptz[], %s::timestamptz[])
+         AS r(trade_idx, symbol, side, strike_price, entry_time, until_time)
+    JOIN option_chain_snapshot s
+      ON s.symbol = r.symbol
+     AND s.option_type = r.side
+     AND s.strike_price = r.strike_price
+     AND s.snapshot_time BETWEEN r.entry_time AND r.until_time
+    ORDER BY r.trade_idx, s.snapshot_time
+    """
+
     @staticmethod
-    def _fetch_ltp_path(symbol: str, side: str, strike: float, entry_time, until_time) -> pd.DataFrame:
-        query = """
-        SELECT snapshot_time, ltp
-        FROM option_chain_snapshot
-        WHERE symbol = %s
-          AND option_type = %s
-          AND strike_price = %s
-          AND snapshot_time BETWEEN %s AND %s
-        ORDER BY snapshot_time ASC
+    def _fetch_ltp_paths(trades: pd.DataFrame) -> pd.DataFrame:
+        """
+        Load every trade's LTP path (entry to time stop) with one range query
+        per chunk. Returns columns: trade_idx, snapshot_time, ltp.
         """
+        frames = []
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(query, (symbol, side, strike, entry_time, until_time))
-            rows = cursor.fetchall()
-            if not rows:
-                return pd.DataFrame()
-            df = pd.DataFrame(rows, columns=["snapshot_time", "ltp"])
-            df["ltp"] = pd.to_numeric(df["ltp"], errors="coerce")
-            return df.dropna(subset=["ltp"]).reset_index(drop=True)
+            for start in range(0, len(trades), WalkForwardBacktester.PATH_CHUNK_SIZE):
+                chunk = trades.iloc[start:start + WalkForwardBacktester.PATH_CHUNK_SIZE]
+                cursor.execute(
+                    WalkForwardBacktester.PATH_QUERY,
+                    (
+                        [int(i) for i in chunk["trade_idx"]],
+                        chunk["symbol"].astype(str).tolist(),
+                        chunk["side"].astype(str).tolist(),
+                        [float(k) for k in chunk["strike_price"]],
+                        chunk["snapshot_time"].tolist(),
+                        chunk["until_time"].tolist(),
+                    ),
+                )
+                rows = cursor.fetchall()
+                if rows:
+                    frames.append(pd.DataFrame(rows, columns=["trade_idx", "snapshot_time", "ltp"]))
         finally:
             cursor.close()
             DatabaseConnection.release_connection(conn)
 
+        if frames:
+            found = pd.concat(frames, ignore_index=True)["trade_idx"]
+            frames.extend(WalkForwardBacktester._archived_ltp_paths(trades[~trades["trade_idx"].isin(found)]))
+        else:
+            frames = WalkForwardBacktester._archived_ltp_paths(trades)
+        if not frames:
+            return pd.DataFrame(columns=["trade_idx", "snapshot_time", "ltp"])
+        paths = pd.concat(frames, ignore_index=True)
+        paths["ltp"] = pd.to_numeric(paths["ltp"], errors="coerce")
+        return paths.dropna(subset=["ltp"]).reset_index(drop=True)
+
+    @staticmethod
+    def _archived_ltp_paths(trades: pd.DataFrame) -> list[pd.DataFrame]:
+        """
+        Paths for trades whose chains have already moved to the snapshot
+        archive, one archive read per symbol.
+        """
+        if trades.empty or not SnapshotArchive.available():
+            return []
+        frames = []
+        for symbol, group in trades.groupby("symbol", sort=False):
+            snapshots = SnapshotArchive.read(
+                "option_chain_snapshot",
+                symbol,
+                group["snapshot_time"].min(),
+                group["until_time"].max(),
+                columns=["snapshot_time", "option_type", "strike_price", "ltp"],
+            )
+            path = WalkForwardBacktester._paths_from_snapshots(group, snapshots)
+            if not path.empty:
+                frames.append(path)
+        return frames
+
     @staticmethod
-    def _simulate_trade(row, cfg: BacktestConfig) -> dict:
-        entry_ltp = float(row.entry_ltp or 0.0)
-        if entry_ltp <= 0:
-            return {"status": "skip", "net_return_pct": 0.0}
-
-        stop_pct = float(row.stop_loss_pct or cfg.default_stop_loss_pct)
-        target_pct = float(row.target_pct or cfg.default_target_pct)
-        time_stop_min = int(row.time_stop_min or cfg.default_time_stop_min)
-
-        entry_time = row.snapshot_time
-        until_time = entry_time + timedelta(minutes=time_stop_min)
-        path = WalkForwardBacktester._fetch_ltp_path(
-            symbol=row.symbol,
-            side=row.side,
-            strike=float(row.strike_price),
-            entry_time=entry_time,
-            until_time=until_time,
+    def _paths_from_snapshots(trades: pd.DataFrame, snapshots: pd.DataFrame) -> pd.DataFrame:
+        """
+        In-memory counterpart of the path query: LTP of each trade's contract
+        from entry to time stop, time-ordered, from one symbol's chains.
+        """
+        columns = ["trade_idx", "snapshot_time", "ltp"]
+        if trades.empty or snapshots.empty:
+            return pd.DataFrame(columns=columns)
+        keys = trades[["trade_idx", "side", "strike_price", "snapshot_time", "until_time"]].rename(
+            columns={"side": "option_type", "snapshot_time": "entry_time"}
         )
+        keys = keys.assign(strike_price=keys["strike_price"].astype(float))
+        rows = snapshots[["option_type", "strike_price", "snapshot_time", "ltp"]]
+        path = keys.merge(rows, on=["option_type", "strike_price"], how="inner")
+        path = path[
+            (path["snapshot_time"] >= path["entry_time"])
+            & (path["snapshot_time"] <= path["until_time"])
+            & path["ltp"].notna()
+        ]
+        return path.sort_values(["trade_idx", "snapshot_time"], kind="stable")[columns].reset_index(drop=True)
+
+    @staticmethod
+    def _resolve_risk(trades: pd.DataFrame, cfg: BacktestConfig) -> pd.DataFrame:
+        """
+        Fill stop/target/time-stop from `cfg` (missing values, or all rows when
+        overriding) and derive the executed entry and exit levels.
+        """
+        trades = trades.copy()
+        for col, default in (
+            ("stop_loss_pct", cfg.default_stop_loss_pct),
+            ("target_pct", cfg.default_target_pct),
+            ("time_stop_min", cfg.default_time_stop_min),
+        ):
+            values = pd.to_numeric(trades[col], errors="coerce")
+            if cfg.override_signal_risk:
+                values = pd.Series(float(default), index=trades.index)
+            trades[col] = values.where(values.notna() & (values != 0), default).astype(float)
+        trades["time_stop_min"] = trades["time_stop_min"].astype(int)
+
+        trades["executed_entry"] = trades["entry_ltp"] * (1 + cfg.slippage_pct / 100.0)
+        trades["stop_level"] = trades["executed_entry"] * (1 - trades["stop_loss_pct"].abs() / 100.0)
+        trades["target_level"] = trades["executed_entry"] * (1 + trades["target_pct"].abs() / 100.0)
+        return trades
+
+    @staticmethod
+    def _prepare_trades(signals: pd.DataFrame, cfg: BacktestConfig) -> pd.DataFrame:
+        trades = signals.reset_index(drop=True).copy()
+        trades["trade_idx"] = range(len(trades))
+        trades["entry_ltp"] = pd.to_numeric(trades["entry_ltp"], errors="coerce").fillna(0.0).astype(float)
+        trades = WalkForwardBacktester._resolve_risk(trades, cfg)
+        trades["until_time"] = trades["snapshot_time"] + pd.to_timedelta(trades["time_stop_min"], unit="m")
+        return trades
+
+    @staticmethod
+    def _evaluate_exits(trades: pd.DataFrame, paths: pd.DataFrame, cfg: BacktestConfig) -> pd.DataFrame:
+        """
+        First stop/target crossing per trade, else the last LTP before the
+        time stop. `paths` must be time-ordered within each trade_idx.
+        Returns one row per trade in `trades` order; trades without a path
+        or entry price get status "skip".
+        """
+        out = pd.DataFrame({"trade_idx": trades["trade_idx"], "status": "skip", "exit_reason": None})
+        out["gross_return_pct"] = 0.0
+        out["net_return_pct"] = 0.0
+
+        tradable = trades[trades["entry_ltp"] > 0]
+        if paths.empty or tradable.empty:
+            return out
+
+        levels = tradable[["trade_idx", "executed_entry", "stop_level", "target_level"]]
+        # Paths arrive time-ordered within each trade; the merge keeps that order.
+        path = paths.merge(levels, on="trade_idx", how="inner")
         if path.empty:
-            return {"status": "skip", "net_return_pct": 0.0}
-
-        executed_entry = entry_ltp * (1 + cfg.slippage_pct / 100.0)
-        stop_level = executed_entry * (1 - abs(stop_pct) / 100.0)
-        target_level = executed_entry * (1 + abs(target_pct) / 100.0)
-
-        exit_ltp = float(path.iloc[-1]["ltp"])
-        exit_reason = "TIME_STOP"
-        for _, p in path.iterrows():
-            ltp = float(p["ltp"])
-            if ltp <= stop_level:
-                exit_ltp = ltp
-                exit_reason = "STOP_LOSS"
-                break
-            if ltp >= target_level:
-                exit_ltp = ltp
-                exit_reason = "TARGET"
-                break
-
-        executed_exit = exit_ltp * (1 - cfg.slippage_pct / 100.0)
-        gross_return_pct = ((executed_exit - executed_entry) / executed_entry) * 100.0
-        net_return_pct = gross_return_pct - cfg.txn_cost_pct
+            return out
 
-        return {
-            "status": "done",
-            "exit_reason": exit_reason,
-            "gross_return_pct": gross_return_pct,
-            "net_return_pct": net_return_pct,
-        }
+        path["hit_stop"] = path["ltp"] <= path["stop_level"]
+        path["hit_target"] = path["ltp"] >= path["target_level"]
+        crossed = path[path["hit_stop"] | path["hit_target"]].groupby("trade_idx", sort=False).head(1)
+        last = path.groupby("trade_idx", sort=False).tail(1)
+        exits = pd.concat([crossed, last[~last["trade_idx"].isin(crossed["trade_idx"])]]).set_index("trade_idx")
+
+        # Rows from `last` never crossed, so their flags are both False.
+        exit_reason = np.select([exits["hit_stop"], exits["hit_target"]], ["STOP_LOSS", "TARGET"], "TIME_STOP")
+
+        executed_exit = exits["ltp"] * (1 - cfg.slippage_pct / 100.0)
+        gross = (executed_exit - exits["executed_entry"]) / exits["executed_entry"] * 100.0
+
+        out = out.set_index("trade_idx")
+        out.loc[exits.index, "status"] = "done"
+        out.loc[exits.index, "exit_reason"] = exit_reason
+        out.loc[exits.index, "gross_return_pct"] = gross
+        out.loc[exits.index, "net_return_pct"] = gross - cfg.txn_cost_pct
+        return out.reset_index()
 
     @staticmethod
-    def run(symbol: str, start_date: str, end_date: str, cfg: BacktestConfig | None = None) -> dict:
-        cfg = cfg or BacktestConfig()
-        signals = MarketContextRepository.fetch_signals_for_range(symbol, start_date, end_date)
-        if signals.empty:
-            return {
-                "symbol": symbol,
-                "start_date": start_date,
-                "end_date": end_date,
-                "trades": 0,
-                "hit_rate": 0.0,
-                "avg_net_return_pct": 0.0,
-                "expectancy": 0.0,
-                "max_drawdown_pct": 0.0,
-            }
+    def simulate_trades(signals: pd.DataFrame, cfg: BacktestConfig) -> pd.DataFrame:
+        """
+        Simulate all signals with one bulk path load and vectorized exits.
+        """
+        trades = WalkForwardBacktester._prepare_trades(signals, cfg)
+        paths = WalkForwardBacktester._fetch_ltp_paths(trades[trades["entry_ltp"] > 0])
+        return WalkForwardBacktester._evaluate_exits(trades, paths, cfg)
 
-        results = []
-        equity = 0.0
-        peak = 0.0
-        max_dd = 0.0
-        for row in signals.itertuples(index=False):
-            r = WalkForwardBacktester._simulate_trade(row, cfg)
-            if r["status"] != "done":
-                continue
-            equity += float(r["net_return_pct"])
-            peak = max(peak, equity)
-            max_dd = min(max_dd, equity - peak)
-            results.append(r)
-
-        if not results:
+    @staticmethod
+    def summarize(symbol: str, start_date: str, end_date: str, simulated: pd.DataFrame) -> dict:
+        """
+        Aggregate simulated trades (in signal order) into the backtest report.
+        """
+        done = simulated[simulated["status"] == "done"] if not simulated.empty else simulated
+        if done.empty:
             return {
                 "symbol": symbol,
                 "start_date": start_date,
@@ -137,9 +223,14 @@ class WalkForwardBacktester:
                 "max_drawdown_pct": 0.0,
             }
 
-        wins = sum(1 for r in results if r["net_return_pct"] > 0)
-        trades = len(results)
-        avg_net = sum(r["net_return_pct"] for r in results) / trades
+        net = done["net_return_pct"].astype(float)
+        equity = net.cumsum()
+        peak = equity.cummax().clip(lower=0.0)
+        max_dd = float(min(0.0, (equity - peak).min()))
+
+        trades = len(net)
+        wins = int((net > 0).sum())
+        avg_net = float(net.mean())
         expectancy = avg_net / 100.0
 
         return {
@@ -153,3 +244,12 @@ class WalkForwardBacktester:
             "max_drawdown_pct": round(abs(max_dd), 4),
         }
 
+    @staticmethod
+    def run(symbol: str, start_date: str, end_date: str, cfg: BacktestConfig | None = None) -> dict:
+        cfg = cfg or BacktestConfig()
+        signals = MarketContextRepository.fetch_signals_for_range(symbol, start_date, end_date)
+        if signals.empty:
+            return WalkForwardBacktester.summarize(symbol, start_date, end_date, pd.DataFrame())
+
+        simulated = WalkForwardBacktester.simulate_trades(signals, cfg)
+        return WalkForwardBacktester.summarize(symbol, start_date, end_date, simulated)
@@ -0,0 +1,327 @@
+"""
+Offline latency benchmark for the analytics engines and the full pipeline.
+
+For each chain size a synthetic session is generated, then every engine
+runs `repeats` times on the session's last chain with the same inputs a
+live cycle would pass it. `fetch` parses the stub client's payload through
+OptionChainFetcher, and `pipeline` replays the whole session through
+PipelineReplay (reported per snapshot). Nothing touches FYERS or
+PostgreSQL.
+
+A run is one JSON record; records are appended to a JSONL history so a
+later run can be compared against an earlier one on p50 per
+(strikes, engine).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+import json
+import platform
+import time
+import numpy as np
+import pandas as pd
+
+from analytics.advanced_analysis import AdvancedOptionAnalysis
+from analytics.basic_analysis import BasicOptionAnalysis
+from analytics.breakout_engine import BreakoutEngine
+from analytics.data_quality_engine import DataQualityEngine
+from analytics.dynamic_otm_selector import DynamicOTMSelector
+from analytics.implied_volatility_engine import ImpliedVolatilityEngine
+from analytics.interpretation_engine import InterpretationEngine
+from analytics.intraday_oi_engine import IntradayOIDeltaEngine
+from analytics.market_bias_engine import MarketBiasEngine
+from analytics.market_regime_engine import MarketRegimeEngine
+from analytics.option_geeks_engine import OptionGeeksEngine
+from analytics.otm_timing_engine_v2 import OTMTimingEngineV2
+from analytics.probability_engine import ProbabilityEngine
+from analytics.scalp_engine import OTMScalpEngine
+from analytics.volume_engine import VolumeEngine
+from backtesting.pipeline_replay import PipelineReplay
+from benchmarking.stub_fyers import StubFyersModel
+from benchmarking.synthetic_chain import ChainProfile, SyntheticChainGenerator
+from data_layer.data_fetcher import OptionChainFetcher
+from data_layer.rate_limiter import RequestGovernor
+from monitoring.stage_timer import percentile
+
+
+DEFAULT_STRIKES = (40, 100, 500)
+# Smaller p50 changes are timer noise, whatever the percentage.
+MIN_DELTA_MS = 0.5
+
+
+def _timings(fn: Callable[[], object], repeats: int) -> list[float]:
+    fn()  # warm caches, imports and the IV surface
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+class EngineBenchmark:
+    @staticmethod
+    def history_path() -> Path:
+        return Path(__file__).resolve().parents[1] / "logs" / "benchmark_history.jsonl"
+
+    @staticmethod
+    def _cases(strikes: int, steps: int, seed: int) -> dict[str, tuple[Callable[[], object], int]]:
+        """
+        Engine name -> (call, divisor); each call's time is divided by its
+        divisor (the pipeline replays `steps` snapshots per call).
+        """
+        profile = ChainProfile(strikes=strikes, seed=seed, drift_pct=0.02, pe_flow_pct=1.0, ce_flow_pct=-0.5)
+        generator = SyntheticChainGenerator(profile)
+        symbol = profile.symbol
+        snapshots, spots = generator.session(steps)
+        # Unlimited budget: the stub has no rate limit and `fetch` times parsing.
+        fetcher = OptionChainFetcher(client=StubFyersModel([generator]), governor=RequestGovernor(per_second=0, per_minute=0))
+
+        basic = BasicOptionAnalysis()
+        advanced = AdvancedOptionAnalysis()
+        interpreter = InterpretationEngine()
+        breakout_engine = BreakoutEngine()
+        volume_engine = VolumeEngine()
+        geeks_engine = OptionGeeksEngine()
+
+        chains = {t: df.reset_index(drop=True) for t, df in snapshots.groupby("snapshot_time", sort=True)}
+        times = sorted(chains, reverse=True)
+        snapshot_time = times[0]
+        df = chains[snapshot_time]
+        spot = float(spots["spot_price"].iloc[-1])
+
+        history = []
+        for t in sorted(chains):
+            ce, pe = basic.split_ce_pe(chains[t])
+            total_ce, total_pe = basic.calculate_total_oi(ce, pe)
+            history.append({"snapshot_time": t, "pcr": basic.calculate_pcr(total_pe, total_ce)})
+        summary_history = pd.DataFrame(history).merge(spots, on="snapshot_time").tail(5).reset_index(drop=True)
+        open_chain = chains[times[-1]]
+        baseline = (
+            open_chain[open_chain["option_type"] == "CE"].set_index("strike_price")["open_interest"].to_dict(),
+            open_chain[open_chain["option_type"] == "PE"].set_index("strike_price")["open_interest"].to_dict(),
+        )
+
+        atm = basic.detect_atm_strike(df, spot)
+        ce_df, pe_df = basic.split_ce_pe(df)
+        total_ce, total_pe = basic.calculate_total_oi(ce_df, pe_df)
+        pcr = basic.calculate_pcr(total_pe, total_ce)
+        resistance, support, _ = advanced.oi_based_levels_atm_window(
+            ce_df, pe_df, atm, baseline_ce_oi_by_strike=baseline[0], baseline_pe_oi_by_strike=baseline[1]
+        )
+        max_pain = advanced.calculate_max_pain(df)
+        structure = interpreter.detect_writing(ce_df, pe_df)
+        trap = interpreter.detect_trap(spot, resistance, support)
+        volume_data = volume_engine.detect_volume_spike(df, atm)
+        breakout_signal = breakout_engine.detect_breakout(spot, resistance, support)
+        covering_signal = breakout_engine.detect_short_covering(ce_df, pe_df)
+        quality = DataQualityEngine.assess(symbol, df, spot, snapshot_time, as_of=snapshot_time)
+
+        def _oi_delta() -> dict:
+            return IntradayOIDeltaEngine.delta_from_snapshots(
+                symbol=symbol,
+                snapshot_time=snapshot_time,
+                spot=spot,
+                recent_times=lambda: times[:3],
+                load_snapshot=chains.get,
+            )
+
+        oi_delta_data = _oi_delta()
+        regime_data = MarketRegimeEngine.detect(summary_history, df, oi_delta_data)
+        prob_data = ProbabilityEngine().calculate_bias(pcr, breakout_signal, structure)
+        scalp_data = OTMScalpEngine().generate_signal(breakout_signal, covering_signal, volume_data, prob_data)
+        market_bias_data = MarketBiasEngine.calculate_market_bias(
+            pcr=pcr,
+            structure=structure,
+            breakout_signal=breakout_signal,
+            trap=trap,
+            spot=spot,
+            support=support,
+            resistance=resistance,
+            max_pain=max_pain,
+            prob_data=prob_data,
+            volume_data=volume_data,
+            oi_delta_data=oi_delta_data,
+            scalp_data=scalp_data,
+        )
+
+        def _greeks() -> dict:
+            return geeks_engine.analyze(
+                df=df,
+                spot=spot,
+                atm=atm,
+                breakout_signal=breakout_signal,
+                snapshot_time=snapshot_time,
+                profile="aggressive",
+            )
+
+        geeks_data = _greeks()
+        quality_data = {
+            "stale_data": quality.stale_data,
+            "missing_strikes": quality.missing_strikes,
+            "anomaly_flags": quality.anomaly_flags,
+        }
+
+        def _levels():
+            atm_strike = basic.detect_atm_strike(df, spot)
+            ce, pe = basic.split_ce_pe(df)
+            ce_oi, pe_oi = basic.calculate_total_oi(ce, pe)
+            basic.calculate_pcr(pe_oi, ce_oi)
+            return advanced.oi_based_levels_atm_window(
+                ce, pe, atm_strike, baseline_ce_oi_by_strike=baseline[0], baseline_pe_oi_by_strike=baseline[1]
+            )
+
+        def _signals():
+            interpreter.detect_writing(ce_df, pe_df)
+            interpreter.detect_trap(spot, resistance, support)
+            volume_engine.detect_volume_spike(df, atm)
+            breakout_engine.detect_breakout(spot, resistance, support)
+            return breakout_engine.detect_short_covering(ce_df, pe_df)
+
+        return {
+            "fetch": (lambda: fetcher.fetch_option_chain(symbol, strike_count=strikes), 1),
+            "quality": (lambda: DataQualityEngine.assess(symbol, df, spot, snapshot_time, as_of=snapshot_time), 1),
+            "iv_smile": (
+                lambda: ImpliedVolatilityEngine.smile_for_chain(df, spot, snapshot_time=snapshot_time, symbol=symbol),
+                1,
+            ),
+            "levels": (_levels, 1),
+            "max_pain": (lambda: advanced.calculate_max_pain(df), 1),
+            "signals": (_signals, 1),
+            "oi_delta": (_oi_delta, 1),
+            "regime": (lambda: MarketRegimeEngine.detect(summary_history, df, oi_delta_data), 1),
+            "greeks": (_greeks, 1),
+            "timing": (
+                lambda: OTMTimingEngineV2.score(
+                    geeks_data=geeks_data,
+                    regime_data=regime_data,
+                    quality_data=quality_data,
+                    market_bias_data=market_bias_data,
+                ),
+                1,
+            ),
+            "otm_pick": (
+                lambda: DynamicOTMSelector.select(
+                    df=df,
+                    spot=spot,
+                    atm=atm,
+                    side="CE",
+                    breakout_signal=breakout_signal,
+                    regime=regime_data["label"],
+                    snapshot_time=snapshot_time,
+                ),
+                1,
+            ),
+            "pipeline": (lambda: PipelineReplay.replay(symbol, snapshots, spots), steps),
+        }
+
+    @staticmethod
+    def run(
+        sizes=DEFAULT_STRIKES,
+        repeats: int = 20,
+        steps: int = 12,
+        seed: int = 0,
+        engines: list[str] | None = None,
+    ) -> dict:
+        """
+        Benchmark every engine at each chain size. The pipeline replays a
+        whole session per call, so it runs a fifth as many times.
+        """
+        results = []
+        for strikes in sizes:
+            for engine, (call, divisor) in EngineBenchmark._cases(int(strikes), steps, seed).items():
+                if engines and engine not in engines:
+                    continue
+                runs = max(1, repeats // 5) if engine == "pipeline" else repeats
+                samples = [ms / divisor for ms in _timings(call, runs)]
+                results.append(
+                    {
+                        "strikes": int(strikes),
+                        "engine": engine,
+                        "runs": runs,
+                        "p50_ms": round(percentile(samples, 50), 3),
+                        "p95_ms": round(percentile(samples, 95), 3),
+                        "mean_ms": round(float(np.mean(samples)), 3),
+                    }
+                )
+        return {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "repeats": repeats,
+            "steps": steps,
+            "seed": seed,
+            "results": results,
+        }
+
+    @staticmethod
+    def append_history(record: dict, path: Path | None = None) -> Path:
+        path = path or EngineBenchmark.history_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+        return path
+
+    @staticmethod
+    def load_history(path: Path | None = None) -> list[dict]:
+        path = path or EngineBenchmark.history_path()
+        if not path.exists():
+            return []
+        records = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return records
+
+    @staticmethod
+    def compare(current: dict, baseline: dict, tolerance: float = 0.25) -> list[dict]:
+        """
+        p50 change per (strikes, engine) present in both runs; a regression
+        is slower by more than `tolerance` and by at least MIN_DELTA_MS.
+        """
+        before = {(r["strikes"], r["engine"]): r["p50_ms"] for r in baseline.get("results", [])}
+        rows = []
+        for r in current.get("results", []):
+            key = (r["strikes"], r["engine"])
+            if key not in before:
+                continue
+            old, new = float(before[key]), float(r["p50_ms"])
+            change = (new - old) / old if old > 0 else 0.0
+            rows.append(
+                {
+                    "strikes": key[0],
+                    "engine": key[1],
+                    "baseline_ms": old,
+                    "current_ms": new,
+                    "change_pct": round(change * 100.0, 1),
+                    "regression": change > tolerance and new - old >= MIN_DELTA_MS,
+                }
+            )
+        return rows
+
+    @staticmethod
+    def format_results(record: dict) -> str:
+        lines = [f"{'strikes':>7} {'engine':<10} {'runs':>5} {'p50 ms':>10} {'p95 ms':>10} {'mean ms':>10}"]
+        for r in record["results"]:
+            lines.append(
+                f"{r['strikes']:>7} {r['engine']:<10} {r['runs']:>5} "
+                f"{r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['mean_ms']:>10.3f}"
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_comparison(rows: list[dict]) -> str:
+        lines = [f"{'strikes':>7} {'engine':<10} {'base ms':>10} {'now ms':>10} {'change':>8}"]
+        for r in rows:
+            flag = "  REGRESSION" if r["regression"] else ""
+            lines.append(
+                f"{r['strikes']:>7} {r['engine']:<10} {r['baseline_ms']:>10.3f} "
+                f"{r['current_ms']:>10.3f} {r['change_pct']:>7.1f}%{flag}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,103 @@
+"""
+Offline stand-in for fyersModel.FyersModel.
+
+Serves `quotes` and `optionchain` from SyntheticChainGenerator instances,
+one per symbol, so OptionChainFetcher (and anything built on it) runs with
+no credentials or network. Payloads are built once per session step and
+reused until `advance()`, so repeated fetches measure parsing, not
+generation. `latency_ms` adds a fixed sleep per call to model the network.
+
+AsyncStubFyersModel is the awaitable face used by AsyncOptionChainFetcher;
+its latency is an asyncio sleep, so concurrent calls overlap.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable
+import asyncio
+import threading
+import time
+
+from benchmarking.synthetic_chain import ChainProfile, SyntheticChainGenerator
+
+
+class StubFyersModel:
+    def __init__(
+        self,
+        generators: Iterable[SyntheticChainGenerator] | None = None,
+        latency_ms: float = 0.0,
+    ) -> None:
+        generators = list(generators) if generators is not None else [SyntheticChainGenerator(ChainProfile())]
+        self.generators = {g.profile.symbol: g for g in generators}
+        self.latency_ms = latency_ms
+        self.calls: Counter = Counter()
+        self._payloads: dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+
+    def _wait(self, endpoint: str) -> None:
+        with self._lock:
+            self.calls[endpoint] += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+    def advance(self, minutes: int = 10) -> None:
+        """
+        Step every symbol's session and drop cached payloads.
+        """
+        with self._lock:
+            for generator in self.generators.values():
+                generator.step(minutes)
+            self._payloads.clear()
+
+    def quotes(self, data: dict) -> dict:
+        self._wait("quotes")
+        entries = []
+        for symbol in str(data.get("symbols", "")).split(","):
+            symbol = symbol.strip()
+            generator = self.generators.get(symbol)
+            if generator is None:
+                entries.append({"n": symbol, "s": "error", "v": {"errmsg": "invalid symbol"}})
+            else:
+                entries.append(generator.quote())
+        if not any(entry["s"] == "ok" for entry in entries):
+            return {"code": -300, "message": "Please provide a valid symbol", "s": "error"}
+        return {"code": 200, "d": entries, "message": "", "s": "ok"}
+
+    def optionchain(self, data: dict) -> dict:
+        self._wait("optionchain")
+        symbol = data.get("symbol")
+        generator = self.generators.get(symbol)
+        if generator is None:
+            return {"code": -300, "message": "Please provide a valid symbol", "s": "error"}
+        key = (symbol, int(data.get("strikecount") or 0), str(data.get("timestamp") or ""))
+        with self._lock:
+            payload = self._payloads.get(key)
+            if payload is None:
+                payload = self._payloads[key] = generator.options_chain_payload(key[1], key[2])
+        return payload
+
+
+class AsyncStubFyersModel:
+    def __init__(
+        self,
+        generators: Iterable[SyntheticChainGenerator] | None = None,
+        latency_ms: float = 0.0,
+    ) -> None:
+        self.stub = StubFyersModel(generators)
+        self.latency_ms = latency_ms
+
+    @property
+    def calls(self) -> Counter:
+        return self.stub.calls
+
+    def advance(self, minutes: int = 10) -> None:
+        self.stub.advance(minutes)
+
+    async def quotes(self, data: dict) -> dict:
+        await asyncio.sleep(self.latency_ms / 1000.0)
+        return self.stub.quotes(data)
+
+    async def optionchain(self, data: dict) -> dict:
+        await asyncio.sleep(self.latency_ms / 1000.0)
+        return self.stub.optionchain(data)
@@ -0,0 +1,351 @@
+"""
+Deterministic synthetic option chains in the FYERS v3 `optionsChain` shape.
+
+A generator holds one underlying's listed strike grid and, per expiry and
+side, open interest, traded volume and an IV smile. `step()` moves the
+session forward: spot follows a seeded log-normal walk, OI drifts by the
+configured writing/unwinding flow and volume accumulates. Prices are
+Black-Scholes off the smile at each expiry's real time to expiry, so the
+IV solver and Greeks see internally consistent chains.
+
+Two views of the same state are produced:
+- `options_chain_payload()` / `quote()`: raw API responses, as returned
+  by fyersModel (chain rows carry no expiry, like the live API).
+- `frame()` / `session()`: the normalized chain OptionChainFetcher and the
+  snapshot table hold, for engines and PipelineReplay.
+
+The same profile and seed always produce the same chains.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+import numpy as np
+import pandas as pd
+import pytz
+
+from analytics.implied_volatility_engine import ImpliedVolatilityEngine
+
+
+TIMEZONE = pytz.timezone("Asia/Kolkata")
+# A Wednesday session open; expiries are offsets from this date.
+DEFAULT_START = TIMEZONE.localize(datetime(2026, 2, 18, 9, 15))
+EXPIRY_CLOSE = time(15, 30)
+TICK = 0.05
+
+NORMALIZED_COLUMNS = [
+    "symbol",
+    "strike_price",
+    "option_type",
+    "open_interest",
+    "oi_change",
+    "volume",
+    "ltp",
+    "snapshot_time",
+]
+
+
+@dataclass
+class ChainProfile:
+    symbol: str = "NSE:NIFTY50-INDEX"
+    spot: float = 22000.0
+    # Listed strikes, centred on the opening ATM.
+    strikes: int = 40
+    strike_step: float = 50.0
+    # Days from the session date (Tuesday expiries from DEFAULT_START); the
+    # first is the chain FYERS returns by default.
+    expiry_days: tuple[int, ...] = (6, 13, 34)
+    atm_iv: float = 0.14
+    # IV = atm_iv + iv_skew * ln(K/S) + iv_curvature * ln(K/S)^2
+    iv_skew: float = -0.35
+    iv_curvature: float = 3.0
+    # "flat", "bell" (peaked at ATM) or "walls" (bell plus round-strike walls)
+    oi_profile: str = "walls"
+    oi_scale: float = 2.0e5
+    wall_every: int = 10
+    wall_factor: float = 2.5
+    # Per step, in percent: mean and std-dev of the spot move, mean OI flow per side.
+    drift_pct: float = 0.0
+    vol_pct: float = 0.08
+    ce_flow_pct: float = 0.0
+    pe_flow_pct: float = 0.0
+    rate: float = 0.05
+    seed: int = 0
+    start: datetime | None = None
+
+
+def _underlying_code(symbol: str) -> str:
+    name = symbol.split(":", 1)[-1].replace("-INDEX", "")
+    return {"NIFTY50": "NIFTY", "NIFTYBANK": "BANKNIFTY"}.get(name, name)
+
+
+def _ticks(values: np.ndarray) -> np.ndarray:
+    return np.round(np.maximum(TICK, np.round(values / TICK) * TICK), 2)
+
+
+class SyntheticChainGenerator:
+    def __init__(self, profile: ChainProfile | None = None) -> None:
+        self.profile = profile or ChainProfile()
+        p = self.profile
+        if p.oi_profile not in ("flat", "bell", "walls"):
+            raise ValueError(f"Unknown oi_profile: {p.oi_profile}")
+        self._rng = np.random.default_rng(p.seed)
+        self.snapshot_time: datetime = p.start or DEFAULT_START
+        self.spot = float(p.spot)
+        self.prev_close = float(p.spot)
+
+        atm = round(p.spot / p.strike_step) * p.strike_step
+        first = atm - (p.strikes // 2) * p.strike_step
+        self.strikes = first + p.strike_step * np.arange(p.strikes, dtype=float)
+        session_date = self.snapshot_time.astimezone(TIMEZONE).date()
+        self.expiries: list[date] = [session_date + timedelta(days=d) for d in p.expiry_days]
+
+        self._oi: dict[tuple[int, str], np.ndarray] = {}
+        self._prev_oi: dict[tuple[int, str], np.ndarray] = {}
+        self._volume: dict[tuple[int, str], np.ndarray] = {}
+        self._prev_ltp: dict[tuple[int, str], np.ndarray] = {}
+        for i in range(len(self.expiries)):
+            for option_type in ("CE", "PE"):
+                key = (i, option_type)
+                oi = self._initial_oi(option_type == "CE", p.oi_scale / (1 + i))
+                self._oi[key] = oi
+                self._prev_oi[key] = oi.copy()
+                self._volume[key] = np.zeros(len(self.strikes))
+                self._prev_ltp[key] = self._prices(i, option_type)
+
+    # -----------------------------------
+    # Model
+    # -----------------------------------
+    def _bell(self) -> np.ndarray:
+        width = max(3.0, len(self.strikes) / 8.0)
+        distance = (self.strikes - self.spot) / self.profile.strike_step
+        return np.exp(-0.5 * (distance / width) ** 2)
+
+    def _initial_oi(self, is_call: bool, scale: float) -> np.ndarray:
+        p = self.profile
+        n = len(self.strikes)
+        if p.oi_profile == "flat":
+            shape = np.ones(n)
+        else:
+            shape = 0.05 + self._bell()
+            if p.oi_profile == "walls":
+                walls = np.isclose(np.mod(self.strikes, p.strike_step * p.wall_every), 0.0)
+                shape = np.where(walls, shape * p.wall_factor, shape)
+        # Writers sit out of the money: calls above spot, puts below.
+        tilt = np.tanh((self.strikes - self.spot) / (p.strike_step * max(3.0, n / 8.0)))
+        shape = shape * (1.0 + 0.5 * (tilt if is_call else -tilt))
+        noise = self._rng.lognormal(0.0, 0.15, n)
+        return np.round(scale * shape * noise)
+
+    def _time_to_expiry(self, expiry_index: int) -> float:
+        expiry = TIMEZONE.localize(datetime.combine(self.expiries[expiry_index], EXPIRY_CLOSE))
+        seconds = (expiry - self.snapshot_time).total_seconds()
+        return max(seconds, 15 * 60) / (365.0 * 86400.0)
+
+    def smile(self, expiry_index: int = 0) -> np.ndarray:
+        """
+        Model IV per listed strike for an expiry (decimal).
+        """
+        p = self.profile
+        moneyness = np.log(self.strikes / self.spot)
+        iv = p.atm_iv + 0.005 * expiry_index + p.iv_skew * moneyness + p.iv_curvature * moneyness ** 2
+        return np.clip(iv, 0.03, 2.0)
+
+    def _prices(self, expiry_index: int, option_type: str) -> np.ndarray:
+        price, _ = ImpliedVolatilityEngine._bs_price_and_vega(  # noqa: SLF001
+            self.spot,
+            self.strikes,
+            self._time_to_expiry(expiry_index),
+            self.smile(expiry_index),
+            option_type == "CE",
+            self.profile.rate,
+        )
+        return _ticks(price)
+
+    def step(self, minutes: int = 10) -> "SyntheticChainGenerator":
+        """
+        Advance the session: spot walk, OI flow near the money, volume.
+        """
+        p = self.profile
+        self.snapshot_time = self.snapshot_time + timedelta(minutes=minutes)
+        self.spot *= float(np.exp(self._rng.normal(p.drift_pct, p.vol_pct) / 100.0))
+        activity = 0.1 + self._bell()
+        for (i, option_type), oi in self._oi.items():
+            flow = p.ce_flow_pct if option_type == "CE" else p.pe_flow_pct
+            change = activity * (flow / 100.0 + self._rng.normal(0.0, 0.01, len(oi)))
+            self._oi[(i, option_type)] = np.maximum(0.0, np.round(oi * (1.0 + change)))
+            traded = self._rng.poisson(activity * p.oi_scale * 0.05 / (1 + i))
+            self._volume[(i, option_type)] = self._volume[(i, option_type)] + traded
+        return self
+
+    # -----------------------------------
+    # Normalized chain
+    # -----------------------------------
+    def frame(self, expiry_index: int = 0) -> pd.DataFrame:
+        """
+        The chain as OptionChainFetcher returns it (one row per strike/side).
+        """
+        parts = []
+        for option_type in ("CE", "PE"):
+            key = (expiry_index, option_type)
+            parts.append(
+                pd.DataFrame(
+                    {
+                        "strike_price": self.strikes,
+                        "option_type": option_type,
+                        "open_interest": self._oi[key],
+                        "oi_change": self._oi[key] - self._prev_oi[key],
+                        "volume": self._volume[key],
+                        "ltp": self._prices(expiry_index, option_type),
+                    }
+                )
+            )
+        df = pd.concat(parts, ignore_index=True)
+        df["symbol"] = self.profile.symbol
+        df["snapshot_time"] = self.snapshot_time
+        return df[NORMALIZED_COLUMNS].sort_values(["strike_price", "option_type"]).reset_index(drop=True)
+
+    def session(self, steps: int, minutes: int = 10) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        `steps` consecutive chains and their spots, in the shape
+        PipelineReplay.load returns (snapshots, spots).
+        """
+        chains, spots = [], []
+        for n in range(steps):
+            if n:
+                self.step(minutes)
+            chains.append(self.frame())
+            spots.append({"snapshot_time": self.snapshot_time, "spot_price": round(self.spot, 2)})
+        return pd.concat(chains, ignore_index=True), pd.DataFrame(spots)
+
+    # -----------------------------------
+    # FYERS payloads
+    # -----------------------------------
+    def _expiry_epoch(self, expiry_index: int) -> int:
+        return int(TIMEZONE.localize(datetime.combine(self.expiries[expiry_index], EXPIRY_CLOSE)).timestamp())
+
+    def _option_symbol(self, expiry: date, strike: float, option_type: str) -> str:
+        exchange = self.profile.symbol.split(":", 1)[0]
+        code = f"{expiry:%y}{expiry.month}{expiry:%d}"
+        return f"{exchange}:{_underlying_code(self.profile.symbol)}{code}{int(strike)}{option_type}"
+
+    def _underlying_row(self) -> dict:
+        change = self.spot - self.prev_close
+        future = self.spot * float(np.exp(self.profile.rate * self._time_to_expiry(0))) if self.expiries else self.spot
+        return {
+            "ask": 0,
+            "bid": 0,
+            "description": f"{_underlying_code(self.profile.symbol)} INDEX",
+            "ex_symbol": _underlying_code(self.profile.symbol),
+            "exchange": self.profile.symbol.split(":", 1)[0],
+            "fp": round(future, 2),
+            "fpch": round(future - self.prev_close, 2),
+            "fpchp": round((future - self.prev_close) / self.prev_close * 100.0, 2),
+            "fyToken": "101000000026000",
+            "ltp": round(self.spot, 2),
+            "ltpch": round(change, 2),
+            "ltpchp": round(change / self.prev_close * 100.0, 2),
+            "option_type": "",
+            "strike_price": -1,
+            "symbol": self.profile.symbol,
+        }
+
+    def _window(self, strikecount: int | None) -> slice:
+        # FYERS returns `strikecount` strikes either side of ATM.
+        if not strikecount:
+            return slice(0, len(self.strikes))
+        atm_index = int(np.argmin(np.abs(self.strikes - self.spot)))
+        return slice(max(0, atm_index - strikecount), min(len(self.strikes), atm_index + strikecount + 1))
+
+    def options_chain_payload(self, strikecount: int | None = None, timestamp: str = "") -> dict:
+        """
+        Response of fyersModel.optionchain for this underlying. `timestamp`
+        selects an expiry from `expiryData` (nearest when empty/unknown).
+        """
+        if not self.expiries:
+            return {"code": -470, "message": "No expiry contracts available", "s": "error"}
+        epochs = [str(self._expiry_epoch(i)) for i in range(len(self.expiries))]
+        expiry_index = epochs.index(str(timestamp)) if str(timestamp) in epochs else 0
+        expiry = self.expiries[expiry_index]
+        window = self._window(strikecount)
+
+        rows = [self._underlying_row()]
+        side_data = {}
+        for option_type in ("CE", "PE"):
+            key = (expiry_index, option_type)
+            ltp = self._prices(expiry_index, option_type)
+            spread = _ticks(np.maximum(TICK, ltp * 0.002))
+            side_data[option_type] = (ltp, spread, self._oi[key], self._prev_oi[key], self._volume[key], self._prev_ltp[key])
+
+        for k in range(window.start, window.stop):
+            strike = float(self.strikes[k])
+            for option_type in ("CE", "PE"):
+                ltp, spread, oi, prev_oi, volume, prev_ltp = side_data[option_type]
+                oich = float(oi[k] - prev_oi[k])
+                ltpch = float(ltp[k] - prev_ltp[k])
+                rows.append(
+                    {
+                        "ask": round(float(ltp[k] + spread[k]), 2),
+                        "bid": round(float(max(0.0, ltp[k] - spread[k])), 2),
+                        "fyToken": f"1011{k:05d}{0 if option_type == 'CE' else 1}{expiry_index:02d}",
+                        "ltp": float(ltp[k]),
+                        "ltpch": round(ltpch, 2),
+                        "ltpchp": round(ltpch / float(prev_ltp[k]) * 100.0, 2) if prev_ltp[k] else 0.0,
+                        "oi": int(oi[k]),
+                        "oich": int(oich),
+                        "oichp": round(oich / float(prev_oi[k]) * 100.0, 2) if prev_oi[k] else 0.0,
+                        "option_type": option_type,
+                        "prev_oi": int(prev_oi[k]),
+                        "strike_price": strike,
+                        "symbol": self._option_symbol(expiry, strike, option_type),
+                        "volume": int(volume[k]),
+                    }
+                )
+
+        return {
+            "code": 200,
+            "data": {
+                "callOi": int(self._oi[(expiry_index, "CE")].sum()),
+                "putOi": int(self._oi[(expiry_index, "PE")].sum()),
+                "expiryData": [
+                    {"date": f"{d:%d-%m-%Y}", "expiry": epoch} for d, epoch in zip(self.expiries, epochs)
+                ],
+                "indiavixData": {
+                    "ask": 0,
+                    "bid": 0,
+                    "description": "INDIAVIX-INDEX",
+                    "ex_symbol": "INDIAVIX",
+                    "exchange": "NSE",
+                    "fyToken": "101000000026017",
+                    "ltp": round(self.profile.atm_iv * 100.0, 2),
+                    "option_type": "",
+                    "strike_price": -1,
+                    "symbol": "NSE:INDIAVIX-INDEX",
+                },
+                "optionsChain": rows,
+            },
+            "message": "",
+            "s": "ok",
+        }
+
+    def quote(self) -> dict:
+        """
+        One `d` entry of a fyersModel.quotes response.
+        """
+        change = self.spot - self.prev_close
+        return {
+            "n": self.profile.symbol,
+            "s": "ok",
+            "v": {
+                "ch": round(change, 2),
+                "chp": round(change / self.prev_close * 100.0, 2),
+                "lp": round(self.spot, 2),
+                "prev_close_price": round(self.prev_close, 2),
+                "short_name": self.profile.symbol.split(":", 1)[-1],
+                "exchange": self.profile.symbol.split(":", 1)[0],
+                "description": self.profile.symbol,
+                "symbol": self.profile.symbol,
+                "tt": str(int(self.snapshot_time.timestamp())),
+            },
+        }
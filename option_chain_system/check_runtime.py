@@ -5,12 +5,18 @@ Runtime readiness check for env toggles and database tables.
 from __future__ import annotations
 
 import argparse
+import json
 from pathlib import Path
 from config.settings import settings
 from database.db_connection import DatabaseConnection
+from database.query_audit import QueryAudit
+from database.snapshot_archive import SnapshotArchive
+from monitoring import metrics
+from monitoring.stage_timer import StageTimer
 
 
 REQUIRED_TABLES = [
+    "snapshot_batches",
     "option_chain_snapshot",
     "option_chain_summary",
     "scalp_score_tracking",
@@ -30,8 +36,27 @@ def print_settings_summary() -> None:
     print(f"ENABLE_REGIME_V2={settings.ENABLE_REGIME_V2}")
     print(f"ENABLE_DYNAMIC_OTM={settings.ENABLE_DYNAMIC_OTM}")
     print(f"ENABLE_CALIBRATION={settings.ENABLE_CALIBRATION}")
+    print(f"ENABLE_IV_SMILE={settings.ENABLE_IV_SMILE}")
     print(f"CALIBRATION_MIN_SAMPLES={settings.CALIBRATION_MIN_SAMPLES}")
     print(f"OPTION_CHAIN_STRIKE_COUNT={settings.OPTION_CHAIN_STRIKE_COUNT}")
+    print(f"ENABLE_ASYNC_FETCH={settings.ENABLE_ASYNC_FETCH}")
+    print(
+        f"FYERS_REQUEST_TIMEOUT_SECONDS={settings.FYERS_REQUEST_TIMEOUT_SECONDS} "
+        f"FYERS_MAX_RETRIES={settings.FYERS_MAX_RETRIES} "
+        f"FYERS_RETRY_BACKOFF_SECONDS={settings.FYERS_RETRY_BACKOFF_SECONDS} "
+        f"FYERS_HTTP_POOL_SIZE={settings.FYERS_HTTP_POOL_SIZE}"
+    )
+    print(
+        f"FYERS_RATE_PER_SECOND={settings.FYERS_RATE_PER_SECOND or 'unlimited'} "
+        f"FYERS_RATE_PER_MINUTE={settings.FYERS_RATE_PER_MINUTE or 'unlimited'} "
+        f"FYERS_RATE_LIMIT_RETRIES={settings.FYERS_RATE_LIMIT_RETRIES}"
+    )
+    print(f"ENABLE_SNAPSHOT_ARCHIVE={settings.ENABLE_SNAPSHOT_ARCHIVE}")
+    print(f"SNAPSHOT_ARCHIVE_DIR={SnapshotArchive.root()}")
+    print(f"ENABLE_STAGE_TIMING={settings.ENABLE_STAGE_TIMING}")
+    print(f"STAGE_TIMING_LOG={StageTimer.log_path()}")
+    print(f"METRICS_PORT={settings.METRICS_PORT or 'disabled'}")
+    print(f"METRICS_TEXTFILE={metrics.textfile_path()}")
     print()
 
 
@@ -57,6 +82,12 @@ def validate_flag_combinations() -> tuple[list[str], list[str]]:
     if settings.OPTION_CHAIN_STRIKE_COUNT < 20:
         warnings.append("OPTION_CHAIN_STRIKE_COUNT < 20 can reduce regime and strike-selection quality.")
 
+    if settings.FYERS_RATE_PER_SECOND > 10 or settings.FYERS_RATE_PER_MINUTE > 200:
+        warnings.append("FYERS_RATE_PER_SECOND/MINUTE above FYERS limits (10/s, 200/min) will draw rate-limit rejections.")
+
+    if settings.ENABLE_SNAPSHOT_ARCHIVE and not SnapshotArchive.available():
+        warnings.append("ENABLE_SNAPSHOT_ARCHIVE=True but pyarrow is not installed; cleanup will keep aged rows.")
+
     return warnings, errors
 
 
@@ -101,6 +132,36 @@ def apply_schema() -> None:
         DatabaseConnection.release_connection(conn)
 
 
+def explain_hot_queries(baseline_path: str | None, save_baseline: bool) -> bool:
+    """
+    EXPLAIN ANALYZE the hot queries on a synthetic dataset; True when no
+    query regressed.
+    """
+    baseline = {}
+    path = Path(baseline_path) if baseline_path else None
+    if path and path.exists() and not save_baseline:
+        baseline = json.loads(path.read_text(encoding="utf-8"))
+
+    conn = DatabaseConnection.get_connection()
+    try:
+        results = QueryAudit.run(conn, baseline)
+    finally:
+        DatabaseConnection.release_connection(conn)
+
+    print("Query Plan Audit")
+    print("----------------")
+    for row in results:
+        status = "OK" if not row["problems"] else "REGRESSION: " + "; ".join(row["problems"])
+        scans = ", ".join(row["indexes"]) or "no index"
+        print(f"{row['name']:<24} {row['execution_ms']:>9.2f} ms  [{scans}]  {status}")
+    print()
+
+    if path and save_baseline:
+        path.write_text(json.dumps({r["name"]: r["execution_ms"] for r in results}, indent=2), encoding="utf-8")
+        print(f"Baseline written to: {path}")
+    return not any(row["problems"] for row in results)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Check runtime readiness.")
     parser.add_argument("--skip-db", action="store_true", help="Skip database table checks")
@@ -109,6 +170,17 @@ def main() -> None:
         action="store_true",
         help="If DB check fails, apply database/schema.sql and re-check once",
     )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="EXPLAIN ANALYZE the hot repository queries on a synthetic dataset and report regressions",
+    )
+    parser.add_argument("--explain-baseline", help="JSON file of per-query timings to compare against")
+    parser.add_argument(
+        "--save-explain-baseline",
+        action="store_true",
+        help="Write this run's timings to --explain-baseline instead of comparing",
+    )
     args = parser.parse_args()
 
     print_settings_summary()
@@ -138,6 +210,9 @@ def main() -> None:
     if not ok:
         raise SystemExit(1)
 
+    if args.explain and not explain_hot_queries(args.explain_baseline, args.save_explain_baseline):
+        raise SystemExit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -26,7 +26,23 @@ class Settings:
             s.strip() for s in os.getenv("TEST_SYMBOLS", "").split(",") if s.strip()
         ]
         self.DATA_RETENTION_DAYS: int = int(os.getenv("DATA_RETENTION_DAYS", 7))
+        self.ENABLE_SNAPSHOT_ARCHIVE: bool = os.getenv("ENABLE_SNAPSHOT_ARCHIVE", "False") == "True"
+        self.SNAPSHOT_ARCHIVE_DIR: str = os.getenv("SNAPSHOT_ARCHIVE_DIR", "archive")
+        self.ENABLE_STAGE_TIMING: bool = os.getenv("ENABLE_STAGE_TIMING", "True") == "True"
+        self.STAGE_TIMING_LOG: str = os.getenv("STAGE_TIMING_LOG", "logs/stage_timings.jsonl")
+        self.METRICS_PORT: int = int(os.getenv("METRICS_PORT", 9108))
+        self.METRICS_TEXTFILE: str = os.getenv("METRICS_TEXTFILE", "logs/scheduler_metrics.prom")
         self.OPTION_CHAIN_STRIKE_COUNT: int = int(os.getenv("OPTION_CHAIN_STRIKE_COUNT", 40))
+        self.ENABLE_ASYNC_FETCH: bool = os.getenv("ENABLE_ASYNC_FETCH", "False") == "True"
+        self.FYERS_REQUEST_TIMEOUT_SECONDS: float = max(1.0, float(os.getenv("FYERS_REQUEST_TIMEOUT_SECONDS", 10)))
+        self.FYERS_MAX_RETRIES: int = max(0, int(os.getenv("FYERS_MAX_RETRIES", 2)))
+        self.FYERS_RETRY_BACKOFF_SECONDS: float = max(0.0, float(os.getenv("FYERS_RETRY_BACKOFF_SECONDS", 0.5)))
+        self.FYERS_RATE_PER_SECOND: float = max(0.0, float(os.getenv("FYERS_RATE_PER_SECOND", 8)))
+        self.FYERS_RATE_PER_MINUTE: float = max(0.0, float(os.getenv("FYERS_RATE_PER_MINUTE", 180)))
+        self.FYERS_RATE_LIMIT_RETRIES: int = max(0, int(os.getenv("FYERS_RATE_LIMIT_RETRIES", 3)))
+        self.FYERS_HTTP_POOL_SIZE: int = max(1, int(os.getenv("FYERS_HTTP_POOL_SIZE", 20)))
+        self.CYCLE_MAX_WORKERS: int = max(1, int(os.getenv("CYCLE_MAX_WORKERS", 3)))
+        self.SYMBOL_TIMEOUT_SECONDS: int = max(10, int(os.getenv("SYMBOL_TIMEOUT_SECONDS", 240)))
         self.ENABLE_ALL_ENHANCEMENTS: bool = os.getenv("ENABLE_ALL_ENHANCEMENTS", "False") == "True"
         self.ENABLE_GUARDRAILS: bool = os.getenv("ENABLE_GUARDRAILS", "True") == "True"
         self.ENABLE_REGIME_V2: bool = os.getenv("ENABLE_REGIME_V2", "False") == "True"
@@ -34,6 +50,7 @@ class Settings:
         self.ENABLE_DYNAMIC_OTM: bool = os.getenv("ENABLE_DYNAMIC_OTM", "False") == "True"
         self.ENABLE_OUTCOME_TRACKING: bool = os.getenv("ENABLE_OUTCOME_TRACKING", "False") == "True"
         self.ENABLE_CALIBRATION: bool = os.getenv("ENABLE_CALIBRATION", "False") == "True"
+        self.ENABLE_IV_SMILE: bool = os.getenv("ENABLE_IV_SMILE", "False") == "True"
         self.CALIBRATION_MIN_SAMPLES: int = int(os.getenv("CALIBRATION_MIN_SAMPLES", 30))
 
         if self.ENABLE_ALL_ENHANCEMENTS:
@@ -43,6 +60,7 @@ class Settings:
             self.ENABLE_DYNAMIC_OTM = True
             self.ENABLE_OUTCOME_TRACKING = True
             self.ENABLE_CALIBRATION = True
+            self.ENABLE_IV_SMILE = True
 
         # Database Config
         self.DB_NAME: str = os.getenv("DB_NAME", "")
@@ -0,0 +1,256 @@
+"""
+Asyncio FYERS data client and per-cycle prefetch.
+
+`AsyncFyersClient` calls the FYERS v3 data REST endpoints through one
+pooled aiohttp session, so keep-alive connections are reused across calls
+and cycles. Every request has its own timeout and is retried with
+exponential backoff on transport errors, timeouts and 5xx responses. Its
+`quotes(data)` / `optionchain(data)` take and return the same dicts as
+fyersModel.FyersModel, so responses parse through data_fetcher's helpers.
+
+`AsyncOptionChainFetcher.fetch_cycle(symbols)` sends one batched quotes
+call for all symbols and one optionchain call per symbol, all at once, so
+the fetch phase of a cycle costs about one round trip instead of two per
+symbol.
+
+Both fetchers draw from the same data_layer.rate_limiter governor, which
+throttles to the configured budget and retries rate-limited responses. The
+client's own transport/5xx retries also take a token each, so error storms
+stay inside the budget.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable
+import asyncio
+import threading
+import time
+
+import aiohttp
+import pandas as pd
+import pytz
+
+from config.settings import settings
+from data_layer.data_fetcher import chain_from_response, spot_from_quote
+from data_layer.rate_limiter import RequestGovernor, default_governor
+from monitoring import metrics
+
+
+@dataclass
+class SymbolFetch:
+    """
+    Spot and chain fetched for one symbol; `error` holds the first failure.
+    """
+    symbol: str
+    spot: float | None = None
+    chain: pd.DataFrame | None = None
+    error: Exception | None = None
+
+    def unwrap(self) -> tuple[float, pd.DataFrame]:
+        if self.error is not None:
+            raise self.error
+        return self.spot, self.chain
+
+
+class AsyncFyersClient:
+    BASE_URL = "https://api-t1.fyers.in/data"
+    RETRY_STATUSES = (500, 502, 503, 504)
+    PRIORITIES = {"quotes": RequestGovernor.PRIORITY_SPOT, "optionchain": RequestGovernor.PRIORITY_CHAIN}
+
+    def __init__(
+        self,
+        client_id: str | None = None,
+        access_token: str | None = None,
+        timeout_seconds: float | None = None,
+        max_retries: int | None = None,
+        backoff_seconds: float | None = None,
+        pool_size: int | None = None,
+        governor: RequestGovernor | None = None,
+    ) -> None:
+        """
+        The caller's governor grant covers the first attempt of a request;
+        `governor` charges every retry.
+        """
+        self.client_id = client_id or settings.FYERS_CLIENT_ID
+        self.access_token = access_token or settings.FYERS_ACCESS_TOKEN
+        if not self.access_token:
+            raise ValueError(
+                "FYERS_ACCESS_TOKEN is missing. "
+                "Please generate access token and update .env"
+            )
+        self.timeout_seconds = timeout_seconds or settings.FYERS_REQUEST_TIMEOUT_SECONDS
+        self.max_retries = settings.FYERS_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_seconds = settings.FYERS_RETRY_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        self.pool_size = pool_size or settings.FYERS_HTTP_POOL_SIZE
+        self.governor = governor if governor is not None else default_governor()
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created inside the running loop; aiohttp sessions are loop-bound.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                headers={
+                    "Authorization": f"{self.client_id}:{self.access_token}",
+                    "Content-Type": "application/json",
+                    "version": "3",
+                },
+            )
+        return self._session
+
+    async def _get(self, endpoint: str, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._get_session()
+        timeout = aiohttp.ClientTimeout(total=self.timeout_seconds)
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with session.get(self.BASE_URL + path, params=params, timeout=timeout) as resp:
+                    if resp.status == 429:
+                        # Left to the governor, which backs off with jitter.
+                        return {"s": "error", "code": 429, "message": await resp.text()}
+                    if resp.status not in self.RETRY_STATUSES:
+                        return await resp.json(content_type=None)
+                    failure: Exception = RuntimeError(f"FYERS {endpoint} returned HTTP {resp.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                failure = exc
+            finally:
+                metrics.FYERS_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+
+            metrics.FYERS_ERRORS.inc(endpoint=endpoint)
+            if attempt >= self.max_retries:
+                raise RuntimeError(f"FYERS {endpoint} failed after {attempt + 1} attempt(s): {failure!r}")
+            await asyncio.sleep(self.backoff_seconds * (2 ** attempt))
+            await self.governor.acquire_async(endpoint, self.PRIORITIES.get(endpoint, RequestGovernor.PRIORITY_CHAIN))
+            attempt += 1
+
+    async def quotes(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._get("quotes", "/quotes", {"symbols": data["symbols"]})
+
+    async def optionchain(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        params = {
+            "symbol": data["symbol"],
+            "strikecount": data.get("strikecount") or settings.OPTION_CHAIN_STRIKE_COUNT,
+            "timestamp": data.get("timestamp") or "",
+        }
+        return await self._get("optionchain", "/options-chain-v3", params)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class AsyncOptionChainFetcher:
+    # FYERS accepts at most 50 symbols per quotes call.
+    QUOTES_BATCH_SIZE = 50
+
+    def __init__(self, client: Any | None = None, governor: RequestGovernor | None = None) -> None:
+        """
+        `client` replaces AsyncFyersClient (e.g. the offline
+        benchmarking.stub_fyers.AsyncStubFyersModel); `governor` replaces the
+        process-wide request budget.
+        """
+        self.governor = governor if governor is not None else default_governor()
+        self.client = client if client is not None else AsyncFyersClient(governor=self.governor)
+        self.timezone = pytz.timezone(settings.TIMEZONE)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock = threading.Lock()
+
+    async def fetch_spot_prices(self, symbols: Iterable[str]) -> Dict[str, float | Exception]:
+        """
+        Spot per symbol from batched quotes calls; a symbol missing from the
+        response or quoted with an error maps to its exception.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        batches = [symbols[i:i + self.QUOTES_BATCH_SIZE] for i in range(0, len(symbols), self.QUOTES_BATCH_SIZE)]
+        responses = await asyncio.gather(
+            *(
+                self.governor.call_async(
+                    "quotes",
+                    RequestGovernor.PRIORITY_SPOT,
+                    lambda batch=batch: self.client.quotes({"symbols": ",".join(batch)}),
+                )
+                for batch in batches
+            ),
+            return_exceptions=True,
+        )
+
+        spots: Dict[str, float | Exception] = {}
+        for batch, response in zip(batches, responses):
+            if not isinstance(response, Exception) and response.get("s") != "ok":
+                metrics.FYERS_ERRORS.inc(endpoint="quotes")
+                response = ValueError(f"Invalid response: {response}")
+            if isinstance(response, Exception):
+                spots.update({symbol: response for symbol in batch})
+                continue
+            entries = {entry.get("n"): entry for entry in response.get("d", [])}
+            for symbol in batch:
+                try:
+                    if symbol not in entries:
+                        raise RuntimeError(f"Spot price fetch failed: no quote returned for {symbol}")
+                    spots[symbol] = spot_from_quote(entries[symbol])
+                except Exception as exc:
+                    spots[symbol] = exc
+        return spots
+
+    async def fetch_option_chain(self, symbol: str, strike_count: int | None = None) -> pd.DataFrame:
+        data = {
+            "symbol": symbol,
+            "strikecount": strike_count or settings.OPTION_CHAIN_STRIKE_COUNT,
+            "timestamp": "",
+        }
+        response = await self.governor.call_async(
+            "optionchain",
+            RequestGovernor.PRIORITY_CHAIN,
+            lambda: self.client.optionchain(data),
+        )
+        return chain_from_response(response, symbol, self.timezone)
+
+    async def fetch_cycle_async(self, symbols: Iterable[str], strike_count: int | None = None) -> Dict[str, SymbolFetch]:
+        symbols = list(dict.fromkeys(symbols))
+        spots, *chains = await asyncio.gather(
+            self.fetch_spot_prices(symbols),
+            *(self.fetch_option_chain(symbol, strike_count) for symbol in symbols),
+            return_exceptions=True,
+        )
+
+        results: Dict[str, SymbolFetch] = {}
+        for symbol, chain in zip(symbols, chains):
+            spot = spots if isinstance(spots, Exception) else spots[symbol]
+            fetched = SymbolFetch(symbol)
+            if isinstance(spot, Exception):
+                fetched.error = spot
+            elif isinstance(chain, Exception):
+                fetched.error = chain
+            else:
+                fetched.spot, fetched.chain = spot, chain
+            results[symbol] = fetched
+        return results
+
+    def fetch_cycle(self, symbols: Iterable[str], strike_count: int | None = None) -> Dict[str, SymbolFetch]:
+        """
+        Blocking entry point for the threaded scheduler. Runs on the
+        fetcher's own event loop so the pooled session outlives the call.
+        """
+        future = asyncio.run_coroutine_threadsafe(self.fetch_cycle_async(symbols, strike_count), self._get_loop())
+        return future.result()
+
+    def close(self) -> None:
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            asyncio.run_coroutine_threadsafe(close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="fyers-async-fetch", daemon=True).start()
+                self._loop = loop
+            return self._loop
@@ -7,23 +7,63 @@ Responsible for:
 - Cleaning & Structuring Data
 """
 
+from __future__ import annotations
+
 from typing import Dict, Any
+from contextlib import contextmanager
 import pandas as pd
 from datetime import datetime
+import time
 import pytz
 
 from fyers_apiv3 import fyersModel
 from data_layer.fyers_auth import FyersAuth
+from data_layer.rate_limiter import RequestGovernor, default_governor
 from config.settings import settings
+from monitoring import metrics
+
+
+@contextmanager
+def _timed_call(endpoint: str):
+    """
+    Record FYERS call latency; exceptions count as errors.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.FYERS_ERRORS.inc(endpoint=endpoint)
+        raise
+    finally:
+        metrics.FYERS_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
 
 
 class OptionChainFetcher:
 
-    def __init__(self) -> None:
-        auth = FyersAuth()
-        self.fyers: fyersModel.FyersModel = auth.get_client()
+    def __init__(
+        self,
+        client: fyersModel.FyersModel | None = None,
+        governor: RequestGovernor | None = None,
+    ) -> None:
+        """
+        `client` replaces the authenticated FYERS client (e.g. the offline
+        benchmarking.stub_fyers.StubFyersModel); `governor` replaces the
+        process-wide request budget.
+        """
+        self.fyers: fyersModel.FyersModel = client if client is not None else FyersAuth().get_client()
+        self.governor = governor if governor is not None else default_governor()
         self.timezone = pytz.timezone(settings.TIMEZONE)
 
+    def _request(self, endpoint: str, priority: int, call) -> Dict[str, Any]:
+        """
+        One FYERS call under the governor; latency excludes throttled time.
+        """
+        def timed() -> Dict[str, Any]:
+            with _timed_call(endpoint):
+                return call()
+
+        return self.governor.call(endpoint, priority, timed)
+
     # -----------------------------------
     # Spot Price
     # -----------------------------------
@@ -33,117 +73,141 @@ class OptionChainFetcher:
         Robust version
         """
 
-        response: Dict[str, Any] = self.fyers.quotes(
-            {"symbols": symbol}
+        response: Dict[str, Any] = self._request(
+            "quotes",
+            RequestGovernor.PRIORITY_SPOT,
+            lambda: self.fyers.quotes({"symbols": symbol}),
         )
 
         if response.get("s") != "ok":
+            metrics.FYERS_ERRORS.inc(endpoint="quotes")
             raise ValueError(f"Invalid response: {response}")
 
-        try:
-            quote_data = response["d"][0]["v"]
-
-            # Try standard field
-            if "lp" in quote_data:
-                return float(quote_data["lp"])
-
-            # Fallback option
-            if "last_price" in quote_data:
-                return float(quote_data["last_price"])
-
-            # If still missing, print structure
-            print("Unexpected quote structure:", response)
-            raise KeyError("Spot price field not found")
-
-        except Exception as e:
-            raise RuntimeError(f"Spot price fetch failed: {e}")
-
+        return spot_from_quote(response["d"][0])
 
     # -----------------------------------
     # Option Chain
     # -----------------------------------
-    def fetch_option_chain(self, symbol: str) -> pd.DataFrame:
+    def fetch_option_chain(self, symbol: str, strike_count: int | None = None) -> pd.DataFrame:
 
         data = {
             "symbol": symbol,
-            "strikecount": settings.OPTION_CHAIN_STRIKE_COUNT,
+            "strikecount": strike_count or settings.OPTION_CHAIN_STRIKE_COUNT,
             "timestamp": ""
         }
 
-        response = self.fyers.optionchain(data=data)
+        response = self._request(
+            "optionchain",
+            RequestGovernor.PRIORITY_CHAIN,
+            lambda: self.fyers.optionchain(data=data),
+        )
 
-        if response.get("s") != "ok":
+        return chain_from_response(response, symbol, self.timezone)
 
-            if response.get("code") == -470:
-                print(f"No expiry contracts available for {symbol}")
-                return pd.DataFrame()
 
-            raise ValueError(f"Invalid API response: {response}")
+# -----------------------------------
+# Response Parsing
+# -----------------------------------
+# Shared by OptionChainFetcher and data_layer.async_fetcher, so both paths
+# return identical spot values and frames.
+def spot_from_quote(quote: Dict[str, Any]) -> float:
+    """
+    Spot price from one entry of a quotes response's `d` list.
+    """
+    try:
+        if quote.get("s", "ok") != "ok":
+            raise KeyError(f"Quote error for {quote.get('n')}: {quote.get('v')}")
 
-        option_data = response["data"]["optionsChain"]
+        quote_data = quote["v"]
 
-        if not option_data:
-            raise ValueError("No option chain data received")
+        # Try standard field
+        if "lp" in quote_data:
+            return float(quote_data["lp"])
 
-        df = pd.DataFrame(option_data)
+        # Fallback option
+        if "last_price" in quote_data:
+            return float(quote_data["last_price"])
 
-        return self._clean_dataframe(df, symbol)
+        # If still missing, print structure
+        print("Unexpected quote structure:", quote)
+        raise KeyError("Spot price field not found")
 
-    # -----------------------------------
-    # Data Cleaning
-    # -----------------------------------
-    def _clean_dataframe(
-        self,
-        df: pd.DataFrame,
-        symbol: str
-    ) -> pd.DataFrame:
-
-        required_columns = [
-            "strike_price",
-            "option_type",
-            "oi",
-            "oich",
-            "volume",
-            "ltp"
-        ]
-
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f"Missing column: {col}")
-
-        df = df.rename(columns={
-            "oi": "open_interest",
-            "oich": "oi_change"
-        })
-
-        # Normalize dtypes early for robust analytics
-        for col in ["strike_price", "open_interest", "oi_change", "volume", "ltp"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        df = df.dropna(subset=["strike_price", "option_type", "open_interest", "volume", "ltp"])
-
-        # Remove underlying row (strike_price = -1)
-        df = df[df["strike_price"] != -1]
-
-        df["symbol"] = symbol
-        df["snapshot_time"] = datetime.now(self.timezone)
-
-        core_columns = [
-            "symbol",
-            "strike_price",
-            "option_type",
-            "open_interest",
-            "oi_change",
-            "volume",
-            "ltp",
-            "snapshot_time",
-        ]
-
-        optional_columns = []
-        for col in ["iv", "implied_volatility", "impliedVolatility", "expiry", "expiry_date", "expiryDate", "exd"]:
-            if col in df.columns:
-                optional_columns.append(col)
-
-        df = df[core_columns + optional_columns]
-
-        df = df.sort_values(["strike_price", "option_type"]).reset_index(drop=True)
-        return df
+    except Exception as e:
+        raise RuntimeError(f"Spot price fetch failed: {e}")
+
+
+def chain_from_response(response: Dict[str, Any], symbol: str, timezone) -> pd.DataFrame:
+    """
+    Normalized chain frame from an optionchain response; empty when the
+    symbol has no expiry contracts (code -470).
+    """
+    if response.get("s") != "ok":
+
+        if response.get("code") == -470:
+            print(f"No expiry contracts available for {symbol}")
+            return pd.DataFrame()
+
+        metrics.FYERS_ERRORS.inc(endpoint="optionchain")
+        raise ValueError(f"Invalid API response: {response}")
+
+    option_data = response["data"]["optionsChain"]
+
+    if not option_data:
+        raise ValueError("No option chain data received")
+
+    df = pd.DataFrame(option_data)
+
+    return clean_option_chain(df, symbol, timezone)
+
+
+def clean_option_chain(df: pd.DataFrame, symbol: str, timezone) -> pd.DataFrame:
+
+    required_columns = [
+        "strike_price",
+        "option_type",
+        "oi",
+        "oich",
+        "volume",
+        "ltp"
+    ]
+
+    for col in required_columns:
+        if col not in df.columns:
+            raise ValueError(f"Missing column: {col}")
+
+    df = df.rename(columns={
+        "oi": "open_interest",
+        "oich": "oi_change"
+    })
+
+    # Normalize dtypes early for robust analytics
+    for col in ["strike_price", "open_interest", "oi_change", "volume", "ltp"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna(subset=["strike_price", "option_type", "open_interest", "volume", "ltp"])
+
+    # Remove underlying row (strike_price = -1)
+    df = df[df["strike_price"] != -1]
+
+    df["symbol"] = symbol
+    df["snapshot_time"] = datetime.now(timezone)
+
+    core_columns = [
+        "symbol",
+        "strike_price",
+        "option_type",
+        "open_interest",
+        "oi_change",
+        "volume",
+        "ltp",
+        "snapshot_time",
+    ]
+
+    optional_columns = []
+    for col in ["iv", "implied_volatility", "impliedVolatility", "expiry", "expiry_date", "expiryDate", "exd"]:
+        if col in df.columns:
+            optional_columns.append(col)
+
+    df = df[core_columns + optional_columns]
+
+    df = df.sort_values(["strike_price", "option_type"]).reset_index(drop=True)
+    return df
@@ -0,0 +1,223 @@
+"""
+Token-bucket governor for FYERS API calls.
+
+One process-wide `RequestGovernor` (see `default_governor()`) is shared by
+OptionChainFetcher and AsyncOptionChainFetcher, so threaded symbol cycles
+and the async prefetch draw from the same budget:
+
+- a per-second and a per-minute bucket; a call needs a token from both
+- waiting calls are served by priority, then arrival: spot quotes ahead of
+  option chains, so a queue of deep chains never delays the quote a cycle
+  needs first
+- a rate-limit response (code 429) drains the per-second bucket and the
+  call is retried after exponential backoff with jitter
+- time spent waiting for tokens or backing off is counted per endpoint in
+  `oc_fyers_throttled_seconds_total`
+
+Sync callers block on a condition variable; async callers poll with
+asyncio.sleep, so neither holds the lock while waiting.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from config.settings import settings
+from monitoring import metrics
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """
+        Seconds until one whole token is available (0 if one is now).
+        """
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+
+class RequestGovernor:
+    PRIORITY_SPOT = 0
+    PRIORITY_CHAIN = 1
+    RATE_LIMIT_CODES = (429, -429)
+    MAX_BACKOFF_SECONDS = 30.0
+    # Upper bound on one wait, so a waiter re-checks the queue after a
+    # higher-priority call arrives or an async head is granted.
+    POLL_SECONDS = 0.05
+
+    def __init__(
+        self,
+        per_second: float | None = None,
+        per_minute: float | None = None,
+        max_retries: int | None = None,
+        backoff_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        per_second = settings.FYERS_RATE_PER_SECOND if per_second is None else per_second
+        per_minute = settings.FYERS_RATE_PER_MINUTE if per_minute is None else per_minute
+        self.max_retries = settings.FYERS_RATE_LIMIT_RETRIES if max_retries is None else max_retries
+        self.backoff_seconds = settings.FYERS_RETRY_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        self._clock = clock
+        now = clock()
+        # A budget of 0 disables that bucket.
+        self._second = TokenBucket(per_second, per_second, now) if per_second > 0 else None
+        self._minute = TokenBucket(per_minute / 60.0, per_minute, now) if per_minute > 0 else None
+        self._buckets = [b for b in (self._second, self._minute) if b is not None]
+        self._waiting: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    # -----------------------------------
+    # Token Acquisition
+    # -----------------------------------
+    def _try_take(self, ticket: tuple[int, int]) -> float:
+        """
+        0 when `ticket` got its token (and left the queue); otherwise the
+        seconds to wait before trying again. Caller holds the lock.
+        """
+        if self._waiting[0] != ticket:
+            return self.POLL_SECONDS
+        now = self._clock()
+        for bucket in self._buckets:
+            bucket.refill(now)
+        wait = max((bucket.wait_time() for bucket in self._buckets), default=0.0)
+        if wait > 0:
+            return min(wait, self.POLL_SECONDS)
+        for bucket in self._buckets:
+            bucket.tokens -= 1.0
+        heapq.heappop(self._waiting)
+        self._cond.notify_all()
+        return 0.0
+
+    def _enqueue(self, priority: int) -> tuple[int, int]:
+        ticket = (priority, next(self._seq))
+        heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _abandon(self, ticket: tuple[int, int]) -> None:
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+            heapq.heapify(self._waiting)
+            self._cond.notify_all()
+
+    def acquire(self, endpoint: str, priority: int = PRIORITY_CHAIN) -> float:
+        """
+        Block until a token is available; returns seconds spent waiting.
+        """
+        started = self._clock()
+        with self._cond:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    wait = self._try_take(ticket)
+                    if wait == 0:
+                        break
+                    self._cond.wait(wait)
+            except BaseException:
+                self._abandon(ticket)
+                raise
+        return self._throttled(endpoint, self._clock() - started)
+
+    async def acquire_async(self, endpoint: str, priority: int = PRIORITY_CHAIN) -> float:
+        started = self._clock()
+        with self._cond:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_take(ticket)
+                if wait == 0:
+                    break
+                await asyncio.sleep(wait)
+        except BaseException:
+            with self._cond:
+                self._abandon(ticket)
+            raise
+        return self._throttled(endpoint, self._clock() - started)
+
+    # -----------------------------------
+    # Governed Calls
+    # -----------------------------------
+    def call(self, endpoint: str, priority: int, request: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run `request` under the budget, retrying rate-limited responses; the
+        last response is returned once retries run out.
+        """
+        attempt = 0
+        while True:
+            self.acquire(endpoint, priority)
+            response = request()
+            if not self.is_rate_limited(response) or attempt >= self.max_retries:
+                return response
+            time.sleep(self._backoff(endpoint, attempt))
+            attempt += 1
+
+    async def call_async(
+        self,
+        endpoint: str,
+        priority: int,
+        request: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            await self.acquire_async(endpoint, priority)
+            response = await request()
+            if not self.is_rate_limited(response) or attempt >= self.max_retries:
+                return response
+            await asyncio.sleep(self._backoff(endpoint, attempt))
+            attempt += 1
+
+    @classmethod
+    def is_rate_limited(cls, response: Any) -> bool:
+        return isinstance(response, dict) and response.get("s") != "ok" and response.get("code") in cls.RATE_LIMIT_CODES
+
+    def _backoff(self, endpoint: str, attempt: int) -> float:
+        """
+        Record a rate-limit hit, empty the per-second bucket so queued calls
+        pause too, and return the jittered delay before the retry.
+        """
+        metrics.FYERS_RATE_LIMITED.inc(endpoint=endpoint)
+        with self._cond:
+            if self._second is not None:
+                self._second.refill(self._clock())
+                self._second.tokens = min(self._second.tokens, 0.0)
+        ceiling = min(self.MAX_BACKOFF_SECONDS, self.backoff_seconds * (2 ** attempt))
+        delay = random.uniform(ceiling / 2.0, ceiling)
+        self._throttled(endpoint, delay)
+        return delay
+
+    @staticmethod
+    def _throttled(endpoint: str, seconds: float) -> float:
+        if seconds > 0:
+            metrics.FYERS_THROTTLED_SECONDS.inc(seconds, endpoint=endpoint)
+        return seconds
+
+
+_default_governor: RequestGovernor | None = None
+_default_lock = threading.Lock()
+
+
+def default_governor() -> RequestGovernor:
+    """
+    Process-wide governor shared by every FYERS fetch path.
+    """
+    global _default_governor
+    if _default_governor is None:
+        with _default_lock:
+            if _default_governor is None:
+                _default_governor = RequestGovernor()
+    return _default_governor
@@ -1,12 +1,18 @@
 """
 Apply database/schema.sql to the configured PostgreSQL database.
+
+With --partition, also convert the snapshot, summary and scalp tables to
+daily or weekly range partitions by snapshot_time (one transaction per
+table; already-partitioned tables are left as they are).
 """
 
+import argparse
 from pathlib import Path
 from database.db_connection import DatabaseConnection
+from database.partition_manager import INTERVALS, PARTITIONED_TABLES, PartitionManager
 
 
-def main() -> None:
+def apply_schema() -> None:
     schema_path = Path(__file__).resolve().parent / "schema.sql"
     sql = schema_path.read_text(encoding="utf-8")
 
@@ -25,6 +31,44 @@ def main() -> None:
         DatabaseConnection.release_connection(conn)
 
 
+def partition_tables(tables: list[str], interval: str) -> None:
+    conn = DatabaseConnection.get_connection()
+    cursor = conn.cursor()
+    try:
+        for table in tables:
+            cursor.execute("SELECT to_regclass(%s)", (table,))
+            if cursor.fetchone()[0] is None:
+                print(f"Skipping {table}: table does not exist")
+                continue
+            try:
+                copied = PartitionManager.migrate(cursor, table, interval)
+                conn.commit()
+                print(f"Partitioned {table} ({interval}), {copied} rows copied")
+            except Exception as e:
+                conn.rollback()
+                print(f"Partitioning {table} failed:", e)
+                raise
+    finally:
+        cursor.close()
+        DatabaseConnection.release_connection(conn)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply schema and optionally partition snapshot tables.")
+    parser.add_argument("--partition", choices=sorted(INTERVALS), help="Convert tables to daily/weekly range partitions.")
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=list(PARTITIONED_TABLES),
+        default=list(PARTITIONED_TABLES),
+        help="Tables to partition (default: all partitionable tables).",
+    )
+    args = parser.parse_args()
+
+    apply_schema()
+    if args.partition:
+        partition_tables(args.tables, args.partition)
+
+
 if __name__ == "__main__":
     main()
-
@@ -3,17 +3,58 @@ Database cleanup manager.
 """
 
 from datetime import datetime, timedelta
+import pytz
 from database.db_connection import DatabaseConnection
+from database.partition_manager import PartitionManager
+from database.snapshot_archive import DATASETS, SnapshotArchive
 from config.settings import settings
 
 
 class CleanupManager:
+    @staticmethod
+    def _days_before(cursor, cutoff_date) -> list:
+        """
+        Trading days (configured timezone) with rows older than the cutoff.
+        """
+        cursor.execute(
+            """
+            SELECT DISTINCT (snapshot_time AT TIME ZONE %s)::date AS day
+            FROM (
+                SELECT snapshot_time FROM option_chain_snapshot WHERE snapshot_time < %s
+                UNION ALL
+                SELECT snapshot_time FROM option_chain_summary WHERE snapshot_time < %s
+                UNION ALL
+                SELECT snapshot_time FROM trade_signals WHERE snapshot_time < %s
+            ) aged
+            ORDER BY day
+            """,
+            (settings.TIMEZONE, cutoff_date, cutoff_date, cutoff_date),
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _archive_before(cursor, cutoff_date) -> bool:
+        """
+        Export every aged trading day to the snapshot archive. Returns False
+        if any day could not be exported.
+        """
+        try:
+            days = CleanupManager._days_before(cursor, cutoff_date)
+            for day in days:
+                written = SnapshotArchive.export_day(cursor, day)
+                print(f"Archived {written} partitions for {day}")
+            return True
+        except Exception as e:
+            print("Snapshot archive export failed:", e)
+            return False
+
     @staticmethod
     def cleanup_old_data():
         retention_days = settings.DATA_RETENTION_DAYS
         cutoff_date = datetime.now() - timedelta(days=retention_days)
         tables = [
             ("option_chain_snapshot", "snapshot_time"),
+            ("snapshot_batches", "snapshot_time"),
             ("option_chain_summary", "snapshot_time"),
             ("scalp_score_tracking", "snapshot_time"),
             ("trade_signals", "snapshot_time"),
@@ -23,9 +64,26 @@ class CleanupManager:
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
+            archived = True
+            if settings.ENABLE_SNAPSHOT_ARCHIVE:
+                # Whole days only, so an archived day is never exported half-deleted.
+                today = datetime.now(pytz.timezone(settings.TIMEZONE)).date()
+                cutoff_date, _ = SnapshotArchive.day_bounds(today - timedelta(days=retention_days))
+                archived = CleanupManager._archive_before(cursor, cutoff_date)
+            partitioned = PartitionManager.partitioned_tables(cursor)
             for table, column in tables:
+                # Batch headers stay as long as the chain rows they describe.
+                if not archived and (table in DATASETS or table == "snapshot_batches"):
+                    print(f"Keeping old data in {table} until it is archived")
+                    continue
+                if table in partitioned:
+                    for name in PartitionManager.drop_partitions_before(cursor, table, cutoff_date):
+                        print(f"Dropped partition {name}")
+                # On partitioned tables this only reaches the boundary and DEFAULT children.
                 cursor.execute(f"DELETE FROM {table} WHERE {column} < %s", (cutoff_date,))
                 print(f"Cleaned old data from {table}")
+            for name in PartitionManager.maintain(cursor):
+                print(f"Created partition {name}")
             conn.commit()
         except Exception as e:
             conn.rollback()
@@ -33,4 +91,3 @@ class CleanupManager:
         finally:
             cursor.close()
             DatabaseConnection.release_connection(conn)
-
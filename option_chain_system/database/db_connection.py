@@ -3,9 +3,32 @@ Database Connection Module
 Handles PostgreSQL connection pooling
 """
 
+import threading
+import time
 import psycopg2
 from psycopg2 import pool
+from psycopg2.extensions import cursor as _BaseCursor
 from config.settings import settings
+from monitoring import metrics
+from monitoring.stage_timer import StageTimer
+
+
+class CountingCursor(_BaseCursor):
+    """
+    Cursor that reports each statement to the active cycle trace.
+    """
+
+    def execute(self, query, vars=None):
+        StageTimer.count_query()
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        StageTimer.count_query()
+        return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        StageTimer.count_query()
+        return super().copy_expert(sql, file, size)
 
 
 class DatabaseConnection:
@@ -14,6 +37,11 @@ class DatabaseConnection:
     """
 
     _connection_pool = None
+    _max_connections = 10
+    _init_lock = threading.Lock()
+    # Bounds checkouts so concurrent symbol workers wait for a free
+    # connection instead of hitting PoolError on an exhausted pool.
+    _slots = threading.BoundedSemaphore(_max_connections)
 
     @classmethod
     def initialize_pool(cls) -> None:
@@ -21,17 +49,19 @@ class DatabaseConnection:
         Initialize connection pool
         """
 
-        if cls._connection_pool is None:
+        with cls._init_lock:
+            if cls._connection_pool is None:
 
-            cls._connection_pool = psycopg2.pool.SimpleConnectionPool(
-                1,
-                10,
-                user=settings.DB_USER,
-                password=settings.DB_PASSWORD,
-                host=settings.DB_HOST,
-                port=settings.DB_PORT,
-                database=settings.DB_NAME
-            )
+                cls._connection_pool = psycopg2.pool.ThreadedConnectionPool(
+                    1,
+                    cls._max_connections,
+                    user=settings.DB_USER,
+                    password=settings.DB_PASSWORD,
+                    host=settings.DB_HOST,
+                    port=settings.DB_PORT,
+                    database=settings.DB_NAME,
+                    cursor_factory=CountingCursor,
+                )
 
     @classmethod
     def get_connection(cls):
@@ -39,11 +69,24 @@ class DatabaseConnection:
         if cls._connection_pool is None:
             cls.initialize_pool()
 
-        return cls._connection_pool.getconn()
+        started = time.perf_counter()
+        cls._slots.acquire()
+        try:
+            conn = cls._connection_pool.getconn()
+        except Exception:
+            cls._slots.release()
+            raise
+        metrics.DB_POOL_WAIT.observe(time.perf_counter() - started)
+        metrics.DB_IN_USE.inc()
+        return conn
 
     @classmethod
     def release_connection(cls, connection) -> None:
-        cls._connection_pool.putconn(connection)
+        try:
+            cls._connection_pool.putconn(connection)
+        finally:
+            metrics.DB_IN_USE.dec()
+            cls._slots.release()
 
     @classmethod
     def close_all_connections(cls) -> None:
@@ -4,46 +4,89 @@ Read-side repository for market context and backtesting.
 
 from __future__ import annotations
 
+from datetime import datetime, time
 import pandas as pd
+import pytz
 from database.db_connection import DatabaseConnection
+from database.snapshot_archive import SnapshotArchive
 from config.settings import settings
 
 
+SNAPSHOT_RANGE_COLUMNS = ["snapshot_time", "strike_price", "option_type", "open_interest", "oi_change", "volume", "ltp"]
+SIGNAL_RANGE_COLUMNS = [
+    "id",
+    "symbol",
+    "snapshot_time",
+    "side",
+    "strike_price",
+    "entry_ltp",
+    "stop_loss_pct",
+    "target_pct",
+    "time_stop_min",
+]
+
+
 class MarketContextRepository:
-    @staticmethod
-    def fetch_open_oi_by_strike(symbol: str, upto_time, market_open_time: str = "09:15:00") -> pd.DataFrame:
-        query = """
-        WITH first_snap AS (
-            SELECT snapshot_time
-            FROM option_chain_snapshot
-            WHERE symbol = %s
-              AND (snapshot_time AT TIME ZONE %s)::date = (%s AT TIME ZONE %s)::date
-              AND (snapshot_time AT TIME ZONE %s)::time >= %s::time
-              AND snapshot_time <= %s
-            ORDER BY snapshot_time ASC
-            LIMIT 1
-        )
-        SELECT strike_price, option_type, open_interest,
-               (SELECT snapshot_time FROM first_snap) AS baseline_snapshot_time
-        FROM option_chain_snapshot
+    # The first batch of the session is one probe on the snapshot_batches
+    # unique key; the session window is computed in Python so the predicate
+    # stays a plain range. Rows are then fetched by batch id.
+    OPEN_OI_QUERY = """
+    WITH first_snap AS (
+        SELECT id, snapshot_time
+        FROM snapshot_batches
         WHERE symbol = %s
-          AND snapshot_time = (SELECT snapshot_time FROM first_snap)
+          AND snapshot_time >= %s
+          AND snapshot_time <= %s
+        ORDER BY snapshot_time ASC
+        LIMIT 1
+    )
+    SELECT s.strike_price, s.option_type, s.open_interest, f.snapshot_time AS baseline_snapshot_time
+    FROM first_snap f
+    JOIN option_chain_snapshot s
+      ON s.batch_id = f.id
+     AND s.snapshot_time = f.snapshot_time
+    """
+
+    SNAPSHOT_RANGE_QUERY = """
+    SELECT snapshot_time, strike_price, option_type, open_interest, oi_change, volume, ltp
+    FROM option_chain_snapshot
+    WHERE symbol = %s
+      AND snapshot_time >= %s::date
+      AND snapshot_time < %s::date + 1
+    ORDER BY snapshot_time ASC, option_type ASC, strike_price ASC
+    """
+
+    SIGNAL_RANGE_QUERY = """
+    SELECT id, symbol, snapshot_time, side, strike_price, entry_ltp,
+           stop_loss_pct, target_pct, time_stop_min
+    FROM trade_signals
+    WHERE symbol = %s
+      AND snapshot_time >= %s::date
+      AND snapshot_time < %s::date + 1
+    ORDER BY snapshot_time ASC
+    """
+
+    @staticmethod
+    def session_open(upto_time, market_open_time: str = "09:15:00") -> datetime:
         """
+        Market open on the trading day of `upto_time` (configured timezone).
+        Naive times are taken as local.
+        """
+        tz = pytz.timezone(getattr(settings, "TIMEZONE", "Asia/Kolkata"))
+        local = tz.localize(upto_time) if upto_time.tzinfo is None else upto_time.astimezone(tz)
+        return tz.localize(datetime.combine(local.date(), time.fromisoformat(market_open_time)))
+
+    @staticmethod
+    def fetch_open_oi_by_strike(symbol: str, upto_time, market_open_time: str = "09:15:00") -> pd.DataFrame:
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            tz_name = getattr(settings, "TIMEZONE", "Asia/Kolkata")
             cursor.execute(
-                query,
+                MarketContextRepository.OPEN_OI_QUERY,
                 (
                     symbol,
-                    tz_name,
-                    upto_time,
-                    tz_name,
-                    tz_name,
-                    market_open_time,
+                    MarketContextRepository.session_open(upto_time, market_open_time),
                     upto_time,
-                    symbol,
                 ),
             )
             rows = cursor.fetchall()
@@ -127,12 +170,72 @@ class MarketContextRepository:
 
     @staticmethod
     def fetch_signals_for_range(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        Stored signals for the range, including archived days.
+        """
+        live = MarketContextRepository._fetch_live_signals(symbol, start_date, end_date)
+        return SnapshotArchive.merge("trade_signals", symbol, start_date, end_date, live, SIGNAL_RANGE_COLUMNS)
+
+    @staticmethod
+    def _fetch_live_signals(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        conn = DatabaseConnection.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(MarketContextRepository.SIGNAL_RANGE_QUERY, (symbol, start_date, end_date))
+            rows = cursor.fetchall()
+            if not rows:
+                return pd.DataFrame()
+            return pd.DataFrame(rows, columns=SIGNAL_RANGE_COLUMNS)
+        finally:
+            cursor.close()
+            DatabaseConnection.release_connection(conn)
+
+
+    @staticmethod
+    def fetch_snapshots_for_range(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        Every stored chain row for the range, time-ordered: one query for the
+        live rows plus the archived days.
+        """
+        live = MarketContextRepository._fetch_live_snapshots(symbol, start_date, end_date)
+        return SnapshotArchive.merge(
+            "option_chain_snapshot", symbol, start_date, end_date, live, SNAPSHOT_RANGE_COLUMNS + ["symbol"]
+        )
+
+    @staticmethod
+    def _fetch_live_snapshots(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        conn = DatabaseConnection.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(MarketContextRepository.SNAPSHOT_RANGE_QUERY, (symbol, start_date, end_date))
+            rows = cursor.fetchall()
+            if not rows:
+                return pd.DataFrame()
+            df = pd.DataFrame(rows, columns=SNAPSHOT_RANGE_COLUMNS)
+            for col in ("strike_price", "open_interest", "oi_change", "volume", "ltp"):
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+            df["symbol"] = symbol
+            return df
+        finally:
+            cursor.close()
+            DatabaseConnection.release_connection(conn)
+
+    @staticmethod
+    def fetch_spot_series(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        live = MarketContextRepository._fetch_live_spot_series(symbol, start_date, end_date)
+        spots = SnapshotArchive.merge(
+            "option_chain_summary", symbol, start_date, end_date, live, ["snapshot_time", "spot_price"]
+        )
+        return spots.dropna(subset=["spot_price"]).reset_index(drop=True)
+
+    @staticmethod
+    def _fetch_live_spot_series(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
         query = """
-        SELECT id, symbol, snapshot_time, side, strike_price, entry_ltp,
-               stop_loss_pct, target_pct, time_stop_min
-        FROM trade_signals
+        SELECT snapshot_time, spot_price
+        FROM option_chain_summary
         WHERE symbol = %s
-          AND snapshot_time::date BETWEEN %s::date AND %s::date
+          AND snapshot_time >= %s::date
+          AND snapshot_time < %s::date + 1
         ORDER BY snapshot_time ASC
         """
         conn = DatabaseConnection.get_connection()
@@ -141,22 +244,10 @@ class MarketContextRepository:
             cursor.execute(query, (symbol, start_date, end_date))
             rows = cursor.fetchall()
             if not rows:
-                return pd.DataFrame()
-            return pd.DataFrame(
-                rows,
-                columns=[
-                    "id",
-                    "symbol",
-                    "snapshot_time",
-                    "side",
-                    "strike_price",
-                    "entry_ltp",
-                    "stop_loss_pct",
-                    "target_pct",
-                    "time_stop_min",
-                ],
-            )
+                return pd.DataFrame(columns=["snapshot_time", "spot_price"])
+            df = pd.DataFrame(rows, columns=["snapshot_time", "spot_price"])
+            df["spot_price"] = pd.to_numeric(df["spot_price"], errors="coerce")
+            return df.dropna(subset=["spot_price"]).reset_index(drop=True)
         finally:
             cursor.close()
             DatabaseConnection.release_connection(conn)
-
@@ -0,0 +1,218 @@
+"""
+Range partitioning by snapshot_time for the per-snapshot tables.
+
+A partitioned table has one child per day or week (`<table>_pYYYYMMDD`,
+named after the period start in the configured timezone) plus a DEFAULT
+child that catches rows outside the pre-created range. Retention drops
+whole children instead of deleting rows, and time-bounded reads are pruned
+to the children that can match.
+
+`migrate` converts an existing plain table in one transaction; see
+`python database/apply_schema.py --partition daily`.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+import re
+
+import pandas as pd
+import pytz
+
+from config.settings import settings
+
+
+# Table -> indexes recreated on the partitioned parent (propagated to children).
+PARTITIONED_TABLES = {
+    "option_chain_snapshot": {
+        "idx_snapshot_symbol_time": "(symbol, snapshot_time DESC)",
+        "idx_snapshot_contract_time": "(symbol, option_type, strike_price, snapshot_time) INCLUDE (ltp)",
+        "idx_snapshot_batch": "(batch_id)",
+    },
+    "option_chain_summary": {"idx_summary_symbol_time": "(symbol, snapshot_time DESC)"},
+    "scalp_score_tracking": {"idx_scalp_symbol_time": "(symbol, snapshot_time DESC)"},
+}
+
+INTERVALS = {"daily": 1, "weekly": 7}
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def pkey_pattern(table: str) -> re.Pattern:
+    """
+    Matches the parent primary key and the per-partition keys named in
+    unique-violation messages.
+    """
+    return re.compile(rf"\b{re.escape(table)}(?:_p\d{{8}}|_default)?_pkey\b")
+
+
+class PartitionManager:
+    # Children created ahead of time so inserts never land in DEFAULT.
+    PREMAKE_DAYS = 7
+
+    @staticmethod
+    def _tz():
+        return pytz.timezone(settings.TIMEZONE)
+
+    @staticmethod
+    def _midnight(day: date) -> datetime:
+        return PartitionManager._tz().localize(datetime.combine(day, datetime.min.time()))
+
+    @staticmethod
+    def _period_start(day: date, interval_days: int) -> date:
+        # Weekly partitions start on Monday.
+        return day - timedelta(days=day.weekday()) if interval_days == 7 else day
+
+    @staticmethod
+    def partition_name(table: str, start: date) -> str:
+        return f"{table}_p{start:%Y%m%d}"
+
+    @staticmethod
+    def partitioned_tables(cursor) -> set[str]:
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_partitioned_table p
+            JOIN pg_class c ON c.oid = p.partrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema()
+            """
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+    @staticmethod
+    def partitions(cursor, table: str) -> list[tuple[str, pd.Timestamp, pd.Timestamp]]:
+        """
+        (name, lower, upper) for each range child, oldest first; DEFAULT excluded.
+        """
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            (table,),
+        )
+        found = []
+        for name, bound in cursor.fetchall():
+            match = _BOUND_RE.search(bound or "")
+            if match:
+                found.append((name, pd.Timestamp(match.group(1)), pd.Timestamp(match.group(2))))
+        return sorted(found, key=lambda part: part[1])
+
+    @staticmethod
+    def _interval_days(existing: list[tuple[str, pd.Timestamp, pd.Timestamp]]) -> int:
+        if not existing:
+            return INTERVALS["daily"]
+        _, lower, upper = existing[-1]
+        return max(1, round((upper - lower) / pd.Timedelta(days=1)))
+
+    @staticmethod
+    def ensure_partitions(
+        cursor,
+        table: str,
+        first_day: date,
+        last_day: date,
+        interval_days: int | None = None,
+    ) -> list[str]:
+        """
+        Create any missing children covering first_day..last_day. The interval
+        defaults to that of the newest existing child. Returns created names.
+        """
+        existing = PartitionManager.partitions(cursor, table)
+        names = {name for name, _, _ in existing}
+        interval_days = interval_days or PartitionManager._interval_days(existing)
+        start = PartitionManager._period_start(first_day, interval_days)
+        created = []
+        while start <= last_day:
+            end = start + timedelta(days=interval_days)
+            name = PartitionManager.partition_name(table, start)
+            if name not in names:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                    (PartitionManager._midnight(start), PartitionManager._midnight(end)),
+                )
+                created.append(name)
+            start = end
+        return created
+
+    @staticmethod
+    def drop_partitions_before(cursor, table: str, cutoff) -> list[str]:
+        """
+        Drop every child whose whole range is older than the cutoff.
+        """
+        cutoff = pd.Timestamp(cutoff)
+        if cutoff.tzinfo is None:
+            cutoff = cutoff.tz_localize(PartitionManager._tz())
+        dropped = []
+        for name, _, upper in PartitionManager.partitions(cursor, table):
+            if upper <= cutoff:
+                cursor.execute(f"DROP TABLE IF EXISTS {name}")
+                dropped.append(name)
+        return dropped
+
+    @staticmethod
+    def maintain(cursor, days_ahead: int | None = None) -> list[str]:
+        """
+        Pre-create children from today through `days_ahead` for every
+        partitioned table.
+        """
+        today = datetime.now(PartitionManager._tz()).date()
+        horizon = today + timedelta(days=PartitionManager.PREMAKE_DAYS if days_ahead is None else days_ahead)
+        created = []
+        partitioned = PartitionManager.partitioned_tables(cursor)
+        for table in PARTITIONED_TABLES:
+            if table in partitioned:
+                created += PartitionManager.ensure_partitions(cursor, table, today, horizon)
+        return created
+
+    @staticmethod
+    def migrate(cursor, table: str, interval: str = "daily") -> int:
+        """
+        Convert a plain table into a range-partitioned one, copying its rows.
+        Rows without snapshot_time cannot be routed and are not copied.
+        Runs inside the caller's transaction; returns the copied row count.
+        """
+        if table not in PARTITIONED_TABLES:
+            raise ValueError(f"{table} is not a partitionable table")
+        if interval not in INTERVALS:
+            raise ValueError(f"interval must be one of {sorted(INTERVALS)}")
+        if table in PartitionManager.partitioned_tables(cursor):
+            print(f"{table} is already partitioned")
+            return 0
+
+        legacy = f"{table}_legacy"
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+        sequence = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT MIN(snapshot_time AT TIME ZONE %s)::date FROM {table}",
+            (settings.TIMEZONE,),
+        )
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        cursor.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+        for index in PARTITIONED_TABLES[table]:
+            cursor.execute(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_legacy")
+
+        cursor.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (snapshot_time)")
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, snapshot_time)")
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        today = datetime.now(PartitionManager._tz()).date()
+        PartitionManager.ensure_partitions(
+            cursor,
+            table,
+            oldest or today,
+            today + timedelta(days=PartitionManager.PREMAKE_DAYS),
+            INTERVALS[interval],
+        )
+        for index, columns in PARTITIONED_TABLES[table].items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} {columns}")
+
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy} WHERE snapshot_time IS NOT NULL")
+        copied = cursor.rowcount
+        if sequence:
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        cursor.execute(f"DROP TABLE {legacy}")
+        return copied
@@ -0,0 +1,247 @@
+"""
+EXPLAIN ANALYZE audit of the hot repository queries.
+
+Builds a synthetic market (several symbols x days x 10-minute chains) in
+temp tables that shadow the real ones for the session, copies the real
+tables' index definitions onto them, then runs each hot query exactly as
+the repositories issue it. Everything happens in one transaction that is
+rolled back, so the live tables are only read for their index definitions.
+
+A query regresses when it sequentially scans option_chain_snapshot, does
+not use the index it is meant to use, or (given a baseline) gets markedly
+slower than the recorded timing.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import json
+import re
+
+import pytz
+
+from analytics.intraday_oi_engine import IntradayOIDeltaEngine
+from backtesting.walk_forward_backtester import WalkForwardBacktester
+from config.settings import settings
+from database.market_context_repository import MarketContextRepository
+from database.snapshot_batch_repository import SnapshotBatchRepository, nearest_time_params
+from database.trade_outcome_repository import TradeOutcomeRepository
+
+
+AUDIT_TABLES = ("snapshot_batches", "option_chain_snapshot", "option_chain_summary", "trade_signals", "trade_outcomes")
+
+SYMBOLS = ["NSE:NIFTY50-INDEX", "NSE:NIFTYBANK-INDEX", "NSE:FINNIFTY-INDEX"]
+
+_INDEX_TARGET_RE = re.compile(r"\bON (?:ONLY )?(?:public\.)?(\w+)")
+
+
+class QueryAudit:
+    DAYS = 10
+    SNAPSHOTS_PER_DAY = 38
+    STRIKES_EACH_SIDE = 20
+    # A timing regression must be both this many times slower and this many ms slower.
+    SLOWDOWN_FACTOR = 2.0
+    SLOWDOWN_FLOOR_MS = 5.0
+
+    @staticmethod
+    def _first_open() -> datetime:
+        tz = pytz.timezone(settings.TIMEZONE)
+        first_day = datetime.now(tz).date() - timedelta(days=QueryAudit.DAYS - 1)
+        return tz.localize(datetime.combine(first_day, datetime.min.time()).replace(hour=9, minute=15))
+
+    @staticmethod
+    def build_dataset(cursor) -> datetime:
+        """
+        Create and fill the session-local tables; returns the first market open.
+        """
+        for table in AUDIT_TABLES:
+            cursor.execute(f"CREATE TEMP TABLE {table} (LIKE public.{table}) ON COMMIT DROP")
+            cursor.execute("SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = 'public' AND tablename = %s", (table,))
+            for _, indexdef in cursor.fetchall():
+                cursor.execute(_INDEX_TARGET_RE.sub(r"ON \1", indexdef, count=1))
+
+        first_open = QueryAudit._first_open()
+        cursor.execute(
+            """
+            INSERT INTO option_chain_snapshot
+                (id, symbol, strike_price, option_type, open_interest, oi_change, volume, ltp, snapshot_time)
+            SELECT row_number() OVER (), sym, 22000 + 50 * k, ot,
+                   100000 + 1000 * k + d * 10 + s, 10 * s, 500 + s, round((120 - 2 * k + s)::numeric / 3, 2),
+                   %s::timestamptz + make_interval(days => d, mins => 10 * s)
+            FROM unnest(%s::text[]) AS sym,
+                 generate_series(0, %s - 1) AS d,
+                 generate_series(0, %s - 1) AS s,
+                 generate_series(-%s, %s) AS k,
+                 unnest(ARRAY['CE', 'PE']) AS ot
+            """,
+            (
+                first_open,
+                SYMBOLS,
+                QueryAudit.DAYS,
+                QueryAudit.SNAPSHOTS_PER_DAY,
+                QueryAudit.STRIKES_EACH_SIDE,
+                QueryAudit.STRIKES_EACH_SIDE,
+            ),
+        )
+        cursor.execute(
+            """
+            INSERT INTO snapshot_batches (id, symbol, snapshot_time, row_count)
+            SELECT row_number() OVER (ORDER BY symbol, snapshot_time), symbol, snapshot_time, COUNT(*)
+            FROM option_chain_snapshot
+            GROUP BY symbol, snapshot_time
+            """
+        )
+        cursor.execute(
+            """
+            UPDATE option_chain_snapshot s
+            SET batch_id = b.id
+            FROM snapshot_batches b
+            WHERE b.symbol = s.symbol AND b.snapshot_time = s.snapshot_time
+            """
+        )
+        cursor.execute(
+            """
+            INSERT INTO option_chain_summary (id, symbol, snapshot_time, spot_price, atm_strike, pcr)
+            SELECT row_number() OVER (), symbol, snapshot_time, 22000 + 5 * extract(minute FROM snapshot_time), 22000, 1.0
+            FROM (SELECT DISTINCT symbol, snapshot_time FROM option_chain_snapshot) snaps
+            """
+        )
+        cursor.execute(
+            """
+            INSERT INTO trade_signals
+                (id, symbol, snapshot_time, side, strike_price, entry_ltp, spot_price, stop_loss_pct, target_pct, time_stop_min)
+            SELECT row_number() OVER (ORDER BY symbol, snapshot_time), symbol, snapshot_time,
+                   CASE WHEN extract(minute FROM snapshot_time)::int % 20 = 0 THEN 'CE' ELSE 'PE' END,
+                   22000 + 50 * (extract(minute FROM snapshot_time)::int % 5), 40, 22000, 25, 45, 30
+            FROM (SELECT DISTINCT symbol, snapshot_time FROM option_chain_snapshot) snaps
+            WHERE extract(minute FROM snapshot_time)::int % 40 = 15
+            """
+        )
+        for table in AUDIT_TABLES:
+            cursor.execute(f"ANALYZE {table}")
+        return first_open
+
+    @staticmethod
+    def hot_queries(first_open: datetime) -> list[dict]:
+        """
+        (name, sql, params, index) for each audited query; `index` is the
+        index the plan is expected to use.
+        """
+        symbol = SYMBOLS[0]
+        last_day = first_open + timedelta(days=QueryAudit.DAYS - 1)
+        probe = last_day + timedelta(minutes=110)
+        entries = [first_open + timedelta(days=d, minutes=10 * s) for d in range(QueryAudit.DAYS) for s in range(0, 30, 6)]
+        return [
+            {
+                "name": "open_oi_baseline",
+                "sql": MarketContextRepository.OPEN_OI_QUERY,
+                "params": (symbol, MarketContextRepository.session_open(probe), probe),
+                "index": "uq_snapshot_batches_symbol_time",
+            },
+            {
+                "name": "recent_snapshot_times",
+                "sql": IntradayOIDeltaEngine.SNAPSHOT_TIMES_QUERY,
+                "params": (symbol, probe),
+                "index": "uq_snapshot_batches_symbol_time",
+            },
+            {
+                "name": "nearest_batch",
+                "sql": SnapshotBatchRepository.NEAREST_QUERY,
+                "params": nearest_time_params(symbol, probe + timedelta(minutes=3)),
+                "index": "uq_snapshot_batches_symbol_time",
+            },
+            {
+                "name": "snapshot_range_day",
+                "sql": MarketContextRepository.SNAPSHOT_RANGE_QUERY,
+                "params": (symbol, last_day.date(), last_day.date()),
+                "index": "idx_snapshot_symbol_time",
+            },
+            {
+                "name": "signal_range",
+                "sql": MarketContextRepository.SIGNAL_RANGE_QUERY,
+                "params": (symbol, first_open.date(), last_day.date()),
+                "index": "idx_trade_signals_symbol_time",
+            },
+            {
+                "name": "pending_outcome_exits",
+                "sql": TradeOutcomeRepository._unresolved_exits_sql(  # noqa: SLF001
+                    TradeOutcomeRepository.PENDING_SIGNAL_FILTER
+                ),
+                "params": (symbol, 24 * QueryAudit.DAYS),
+                "index": "idx_snapshot_contract_time",
+            },
+            {
+                "name": "backtest_ltp_paths",
+                "sql": WalkForwardBacktester.PATH_QUERY,
+                "params": (
+                    list(range(len(entries))),
+                    [symbol] * len(entries),
+                    ["CE" if i % 2 else "PE" for i in range(len(entries))],
+                    [22000.0 + 50 * (i % 7 - 3) for i in range(len(entries))],
+                    entries,
+                    [entry + timedelta(minutes=30) for entry in entries],
+                ),
+                "index": "idx_snapshot_contract_time",
+            },
+        ]
+
+    @staticmethod
+    def _walk(plan: dict):
+        yield plan
+        for child in plan.get("Plans", []):
+            yield from QueryAudit._walk(child)
+
+    @staticmethod
+    def summarize_plan(name: str, explain: list | str, index: str | None) -> dict:
+        """
+        Execution time, scans and structural problems from EXPLAIN JSON output.
+        """
+        if isinstance(explain, str):
+            explain = json.loads(explain)
+        root = explain[0]
+        nodes = list(QueryAudit._walk(root["Plan"]))
+        indexes = sorted({node["Index Name"] for node in nodes if node.get("Index Name")})
+        seq_scans = sorted({node.get("Relation Name", "") for node in nodes if node["Node Type"] == "Seq Scan"})
+        problems = []
+        if "option_chain_snapshot" in seq_scans:
+            problems.append("seq scan on option_chain_snapshot")
+        if index and index not in indexes:
+            problems.append(f"{index} not used")
+        return {
+            "name": name,
+            "execution_ms": round(float(root.get("Execution Time", 0.0)), 3),
+            "indexes": indexes,
+            "seq_scans": seq_scans,
+            "problems": problems,
+        }
+
+    @staticmethod
+    def compare(results: list[dict], baseline: dict[str, float]) -> list[dict]:
+        """
+        Add timing regressions against a {name: execution_ms} baseline.
+        """
+        for row in results:
+            before = baseline.get(row["name"])
+            if before is None:
+                continue
+            now = row["execution_ms"]
+            if now > before * QueryAudit.SLOWDOWN_FACTOR and now - before > QueryAudit.SLOWDOWN_FLOOR_MS:
+                row["problems"].append(f"{now:.1f} ms vs baseline {before:.1f} ms")
+        return results
+
+    @staticmethod
+    def run(conn, baseline: dict[str, float] | None = None) -> list[dict]:
+        """
+        Build the dataset, EXPLAIN ANALYZE every hot query, roll back.
+        """
+        cursor = conn.cursor()
+        try:
+            first_open = QueryAudit.build_dataset(cursor)
+            results = []
+            for query in QueryAudit.hot_queries(first_open):
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query["sql"], query["params"])
+                results.append(QueryAudit.summarize_plan(query["name"], cursor.fetchone()[0], query["index"]))
+            return QueryAudit.compare(results, baseline or {})
+        finally:
+            conn.rollback()
+            cursor.close()
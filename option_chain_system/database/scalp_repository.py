@@ -3,6 +3,7 @@ Scalp score repository.
 """
 
 from database.db_connection import DatabaseConnection
+from database.partition_manager import pkey_pattern
 
 
 class ScalpRepository:
@@ -11,7 +12,7 @@ class ScalpRepository:
         msg = str(exc)
         return (
             getattr(exc, "pgcode", None) == "23505"
-            and "scalp_score_tracking_pkey" in msg
+            and pkey_pattern("scalp_score_tracking").search(msg) is not None
         )
 
     @staticmethod
@@ -27,7 +28,7 @@ class ScalpRepository:
         )
 
     @staticmethod
-    def insert_scalp_score(symbol: str, snapshot_time, spot_price: float, scalp_data: dict) -> None:
+    def write_scalp_score(cursor, symbol: str, snapshot_time, spot_price: float, scalp_data: dict) -> None:
         query = """
         INSERT INTO scalp_score_tracking (
             symbol, snapshot_time, spot_price,
@@ -36,9 +37,6 @@ class ScalpRepository:
         )
         VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
         """
-
-        conn = DatabaseConnection.get_connection()
-        cursor = conn.cursor()
         params = (
             symbol,
             snapshot_time,
@@ -52,8 +50,14 @@ class ScalpRepository:
             scalp_data["edge"],
             scalp_data["risk"],
         )
+        cursor.execute(query, params)
+
+    @staticmethod
+    def insert_scalp_score(symbol: str, snapshot_time, spot_price: float, scalp_data: dict) -> None:
+        conn = DatabaseConnection.get_connection()
+        cursor = conn.cursor()
         try:
-            cursor.execute(query, params)
+            ScalpRepository.write_scalp_score(cursor, symbol, snapshot_time, spot_price, scalp_data)
             conn.commit()
         except Exception as e:
             conn.rollback()
@@ -62,7 +66,7 @@ class ScalpRepository:
                     # Auto-heal SERIAL sequence drift and retry once.
                     ScalpRepository._reset_id_sequence(cursor)
                     conn.commit()
-                    cursor.execute(query, params)
+                    ScalpRepository.write_scalp_score(cursor, symbol, snapshot_time, spot_price, scalp_data)
                     conn.commit()
                     return
                 except Exception as retry_exc:
@@ -1,3 +1,20 @@
+-- ============================================
+-- SNAPSHOT BATCHES TABLE
+-- ============================================
+-- One header row per ingested chain; snapshot rows point at it via batch_id.
+
+CREATE TABLE IF NOT EXISTS snapshot_batches (
+    id BIGSERIAL PRIMARY KEY,
+    symbol VARCHAR(50) NOT NULL,
+    snapshot_time TIMESTAMP WITH TIME ZONE NOT NULL,
+    row_count INT NOT NULL DEFAULT 0,
+    spot_price NUMERIC,
+    expiry_date DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_snapshot_batches_symbol_time UNIQUE (symbol, snapshot_time)
+);
+
+
 -- ============================================
 -- OPTION CHAIN SNAPSHOT TABLE
 -- ============================================
@@ -22,6 +39,33 @@ CREATE TABLE IF NOT EXISTS option_chain_snapshot (
 CREATE INDEX IF NOT EXISTS idx_snapshot_symbol_time
 ON option_chain_snapshot(symbol, snapshot_time DESC);
 
+ALTER TABLE option_chain_snapshot ADD COLUMN IF NOT EXISTS batch_id BIGINT;
+
+CREATE INDEX IF NOT EXISTS idx_snapshot_batch
+ON option_chain_snapshot(batch_id);
+
+-- Headers for rows ingested before snapshot_batches existed (no-op once backfilled).
+INSERT INTO snapshot_batches (symbol, snapshot_time, row_count)
+SELECT symbol, snapshot_time, COUNT(*)
+FROM option_chain_snapshot
+WHERE batch_id IS NULL AND symbol IS NOT NULL AND snapshot_time IS NOT NULL
+GROUP BY symbol, snapshot_time
+ON CONFLICT (symbol, snapshot_time) DO NOTHING;
+
+UPDATE option_chain_snapshot s
+SET batch_id = b.id
+FROM snapshot_batches b
+WHERE s.batch_id IS NULL
+  AND b.symbol = s.symbol
+  AND b.snapshot_time = s.snapshot_time;
+
+-- Per-contract LTP lookups (outcome labeling, backtest paths) as index-only scans.
+CREATE INDEX IF NOT EXISTS idx_snapshot_contract_time
+ON option_chain_snapshot(symbol, option_type, strike_price, snapshot_time) INCLUDE (ltp);
+
+-- Snapshot, summary and scalp tables can be converted to snapshot_time
+-- range partitions with: python database/apply_schema.py --partition daily
+
 
 -- ============================================
 -- OPTION CHAIN SUMMARY TABLE
@@ -0,0 +1,269 @@
+"""
+Columnar on-disk archive for data that ages out of PostgreSQL.
+
+Before retention cleanup deletes a trading day, each symbol's rows are
+exported to a zstd-compressed Parquet file, Hive-partitioned as
+
+    <SNAPSHOT_ARCHIVE_DIR>/<dataset>/symbol=<slug>/date=YYYY-MM-DD/part-0.parquet
+
+Readers pick partitions by directory name, so a range read only opens the
+days it needs. Repository range reads merge archive rows with live rows
+(live wins on overlap), which lets replay, backtest and calibration look back
+past DATA_RETENTION_DAYS.
+
+Parquet support needs the optional `pyarrow` package; without it the
+archive reports itself unavailable and cleanup keeps rows it could not export.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import importlib.util
+import os
+import re
+
+import pandas as pd
+import pytz
+
+from config.settings import settings
+
+
+# Per dataset: export query for one day (all symbols), numeric columns and
+# the natural key used to de-duplicate against live rows.
+DATASETS = {
+    "option_chain_snapshot": {
+        "query": """
+        SELECT symbol, snapshot_time, strike_price, option_type, open_interest, oi_change, volume, ltp
+        FROM option_chain_snapshot
+        WHERE snapshot_time >= %s AND snapshot_time < %s
+        ORDER BY symbol, snapshot_time, option_type, strike_price
+        """,
+        "numeric": ("strike_price", "open_interest", "oi_change", "volume", "ltp"),
+        "key": ("snapshot_time", "option_type", "strike_price"),
+    },
+    "option_chain_summary": {
+        "query": """
+        SELECT symbol, snapshot_time, spot_price, atm_strike, total_ce_oi, total_pe_oi, pcr,
+               resistance, support, max_pain, structure, trap_signal
+        FROM option_chain_summary
+        WHERE snapshot_time >= %s AND snapshot_time < %s
+        ORDER BY symbol, snapshot_time
+        """,
+        "numeric": ("spot_price", "atm_strike", "total_ce_oi", "total_pe_oi", "pcr", "resistance", "support", "max_pain"),
+        "key": ("snapshot_time",),
+    },
+    "trade_signals": {
+        "query": """
+        SELECT symbol, id, snapshot_time, side, strike_price, entry_ltp, spot_price, regime,
+               signal_strength, timing_score, raw_probability, calibrated_probability,
+               stop_loss_pct, target_pct, time_stop_min
+        FROM trade_signals
+        WHERE snapshot_time >= %s AND snapshot_time < %s
+        ORDER BY symbol, snapshot_time, id
+        """,
+        "numeric": (
+            "strike_price", "entry_ltp", "spot_price", "signal_strength", "timing_score",
+            "raw_probability", "calibrated_probability", "stop_loss_pct", "target_pct", "time_stop_min",
+        ),
+        "key": ("id",),
+    },
+    # Outcomes cascade-delete with their signal, so they are partitioned by the signal's day.
+    "trade_outcomes": {
+        "query": """
+        SELECT s.symbol, o.signal_id, s.snapshot_time, o.horizon_min, o.exit_time, o.exit_ltp,
+               o.return_pct, o.pnl_points, o.outcome_label, o.hit_target, o.hit_stop
+        FROM trade_outcomes o
+        JOIN trade_signals s ON s.id = o.signal_id
+        WHERE s.snapshot_time >= %s AND s.snapshot_time < %s
+        ORDER BY s.symbol, s.snapshot_time, o.signal_id, o.horizon_min
+        """,
+        "numeric": ("horizon_min", "exit_ltp", "return_pct", "pnl_points"),
+        "key": ("signal_id", "horizon_min"),
+    },
+}
+
+PART_NAME = "part-0.parquet"
+
+
+class SnapshotArchive:
+    COMPRESSION = "zstd"
+    # Rows per server-side fetch; memory holds one symbol-day plus one batch.
+    EXPORT_BATCH_ROWS = 20000
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("pyarrow") is not None
+
+    @staticmethod
+    def root() -> Path:
+        configured = Path(settings.SNAPSHOT_ARCHIVE_DIR)
+        if configured.is_absolute():
+            return configured
+        return Path(__file__).resolve().parent.parent / configured
+
+    @staticmethod
+    def _symbol_slug(symbol: str) -> str:
+        return re.sub(r"[^A-Za-z0-9._-]+", "_", str(symbol or "UNKNOWN"))
+
+    @staticmethod
+    def partition_path(dataset: str, symbol: str, day: date) -> Path:
+        return (
+            SnapshotArchive.root()
+            / dataset
+            / f"symbol={SnapshotArchive._symbol_slug(symbol)}"
+            / f"date={day.isoformat()}"
+            / PART_NAME
+        )
+
+    @staticmethod
+    def day_bounds(day: date) -> tuple[datetime, datetime]:
+        """
+        Start and end of a trading day in the configured timezone.
+        """
+        tz = pytz.timezone(settings.TIMEZONE)
+        start = tz.localize(datetime.combine(day, datetime.min.time()))
+        return start, tz.localize(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _frame(rows: list[tuple], columns: list[str], dataset: str) -> pd.DataFrame:
+        df = pd.DataFrame(rows, columns=columns)
+        for col in DATASETS[dataset]["numeric"]:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        return df
+
+    @staticmethod
+    def write_partition(dataset: str, symbol: str, day: date, df: pd.DataFrame) -> Path:
+        """
+        Write one (dataset, symbol, day) partition atomically, replacing any
+        earlier export of the same day.
+        """
+        path = SnapshotArchive.partition_path(dataset, symbol, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".parquet.tmp")
+        df.drop(columns=["symbol"], errors="ignore").to_parquet(
+            tmp, engine="pyarrow", compression=SnapshotArchive.COMPRESSION, index=False
+        )
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def export_day(cursor, day: date) -> int:
+        """
+        Export every dataset for one trading day, one query per dataset.
+        Rows stream through a server-side cursor in symbol order and each
+        symbol's partition is written as soon as its rows end, so memory is
+        bounded by one symbol-day rather than the whole day. Returns the
+        number of partitions written. Raises on any failure so the caller
+        can keep the day in PostgreSQL.
+        """
+        if not SnapshotArchive.available():
+            raise RuntimeError("pyarrow is not installed; snapshot archive unavailable")
+        start, end = SnapshotArchive.day_bounds(day)
+        written = 0
+        for dataset, spec in DATASETS.items():
+            # Named cursor on the caller's connection, inside its transaction.
+            with cursor.connection.cursor(name=f"archive_{dataset}") as stream:
+                stream.itersize = SnapshotArchive.EXPORT_BATCH_ROWS
+                stream.execute(spec["query"], (start, end))
+                columns: list[str] = []
+                symbol, rows = None, []
+                while True:
+                    batch = stream.fetchmany(SnapshotArchive.EXPORT_BATCH_ROWS)
+                    if batch and not columns:
+                        columns = [col[0] for col in stream.description]
+                    for row in batch:
+                        if row[0] != symbol and rows:
+                            SnapshotArchive._write_rows(dataset, symbol, day, rows, columns)
+                            written += 1
+                            rows = []
+                        symbol = row[0]
+                        rows.append(row)
+                    if not batch:
+                        break
+                if rows:
+                    SnapshotArchive._write_rows(dataset, symbol, day, rows, columns)
+                    written += 1
+        return written
+
+    @staticmethod
+    def _write_rows(dataset: str, symbol: str, day: date, rows: list[tuple], columns: list[str]) -> None:
+        # Every export query selects `symbol` first and orders by it.
+        SnapshotArchive.write_partition(dataset, symbol, day, SnapshotArchive._frame(rows, columns, dataset))
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+    @staticmethod
+    def partitions(dataset: str, symbol: str, start_date, end_date) -> list[Path]:
+        start, end = pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()
+        base = SnapshotArchive.root() / dataset / f"symbol={SnapshotArchive._symbol_slug(symbol)}"
+        if not base.is_dir():
+            return []
+        found = []
+        for entry in sorted(base.iterdir()):
+            if not entry.name.startswith("date="):
+                continue
+            try:
+                day = date.fromisoformat(entry.name[len("date="):])
+            except ValueError:
+                continue
+            part = entry / PART_NAME
+            if start <= day <= end and part.is_file():
+                found.append(part)
+        return found
+
+    @staticmethod
+    def read(dataset: str, symbol: str, start_date, end_date, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Archived rows for a symbol and inclusive date range; empty when the
+        archive is unavailable or holds no matching partitions.
+        """
+        if not SnapshotArchive.available():
+            return pd.DataFrame(columns=columns or [])
+        parts = SnapshotArchive.partitions(dataset, symbol, start_date, end_date)
+        if not parts:
+            return pd.DataFrame(columns=columns or [])
+        frames = [pd.read_parquet(part, engine="pyarrow", columns=columns) for part in parts]
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def _in_timezone(df: pd.DataFrame) -> pd.DataFrame:
+        tz = pytz.timezone(settings.TIMEZONE)
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.DatetimeTZDtype):
+                df[col] = df[col].dt.tz_convert(tz)
+        return df
+
+    @staticmethod
+    def merge(
+        dataset: str,
+        symbol: str,
+        start_date,
+        end_date,
+        live: pd.DataFrame,
+        columns: list[str],
+    ) -> pd.DataFrame:
+        """
+        Archive plus live rows for the range with the given columns, live
+        winning on duplicate keys, in time order. Returns `live` untouched
+        when nothing is archived for the range.
+        """
+        stored = [c for c in columns if c != "symbol"]
+        archived = SnapshotArchive.read(dataset, symbol, start_date, end_date, columns=stored)
+        if archived.empty:
+            return live
+        if "symbol" in columns:
+            archived["symbol"] = symbol
+        archived = SnapshotArchive._in_timezone(archived[columns])
+        if live.empty:
+            combined = archived
+        else:
+            live = SnapshotArchive._in_timezone(live[columns].copy())
+            combined = pd.concat([live, archived], ignore_index=True)
+            combined = combined.drop_duplicates(subset=list(DATASETS[dataset]["key"]), keep="first")
+        order = [c for c in ("snapshot_time", "option_type", "strike_price", "id") if c in combined.columns]
+        return combined.sort_values(order, kind="stable").reset_index(drop=True)
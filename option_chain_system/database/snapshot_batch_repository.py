@@ -0,0 +1,100 @@
+"""
+Exact snapshot addressing through the snapshot_batches headers.
+
+A lookup first resolves one snapshot (batch id + snapshot_time) with an
+index probe on uq_snapshot_batches_symbol_time, then loads exactly that
+batch's rows. Replays therefore never mix rows from neighbouring chains.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+
+DEFAULT_WINDOW = timedelta(minutes=5)
+
+
+def nearest_time_sql(table: str, columns: str) -> str:
+    """
+    Nearest row to a target within a window, as two index probes (latest at
+    or before, earliest after); ties go to the earlier row. Parameters:
+    (symbol, target, target - window, symbol, target, target + window, target).
+    """
+    return f"""
+    SELECT {columns}
+    FROM (
+        (SELECT {columns}
+         FROM {table}
+         WHERE symbol = %s AND snapshot_time <= %s AND snapshot_time >= %s
+         ORDER BY snapshot_time DESC
+         LIMIT 1)
+        UNION ALL
+        (SELECT {columns}
+         FROM {table}
+         WHERE symbol = %s AND snapshot_time > %s AND snapshot_time <= %s
+         ORDER BY snapshot_time ASC
+         LIMIT 1)
+    ) candidates
+    ORDER BY ABS(EXTRACT(EPOCH FROM (snapshot_time - %s))), snapshot_time
+    LIMIT 1
+    """
+
+
+def nearest_time_params(symbol: str, target_time: datetime, window: timedelta = DEFAULT_WINDOW) -> tuple:
+    return (symbol, target_time, target_time - window, symbol, target_time, target_time + window, target_time)
+
+
+class SnapshotBatchRepository:
+    NEAREST_QUERY = nearest_time_sql("snapshot_batches", "id, snapshot_time")
+
+    PREVIOUS_QUERY = """
+    SELECT id, snapshot_time
+    FROM snapshot_batches
+    WHERE symbol = %s
+      AND snapshot_time < %s
+    ORDER BY snapshot_time DESC
+    LIMIT 1
+    """
+
+    @staticmethod
+    def nearest_batch(
+        cursor,
+        symbol: str,
+        target_time: datetime,
+        window: timedelta = DEFAULT_WINDOW,
+    ) -> tuple[int, datetime] | None:
+        """
+        (batch_id, snapshot_time) of the chain closest to target_time, or None
+        if no chain was ingested within the window.
+        """
+        cursor.execute(SnapshotBatchRepository.NEAREST_QUERY, nearest_time_params(symbol, target_time, window))
+        row = cursor.fetchone()
+        return (int(row[0]), row[1]) if row else None
+
+    @staticmethod
+    def previous_batch(cursor, symbol: str, before: datetime) -> tuple[int, datetime] | None:
+        """
+        (batch_id, snapshot_time) of the latest chain strictly before `before`.
+        """
+        cursor.execute(SnapshotBatchRepository.PREVIOUS_QUERY, (symbol, before))
+        row = cursor.fetchone()
+        return (int(row[0]), row[1]) if row else None
+
+    @staticmethod
+    def batch_rows(cursor, batch: tuple[int, datetime], columns: list[str]) -> list[tuple]:
+        """
+        All option_chain_snapshot rows of one batch. snapshot_time is part of
+        the predicate so partitioned tables prune to a single child.
+        """
+        batch_id, snapshot_time = batch
+        cursor.execute(
+            f"""
+            SELECT {', '.join(columns)}
+            FROM option_chain_snapshot
+            WHERE batch_id = %s
+              AND snapshot_time = %s
+            ORDER BY option_type, strike_price
+            """,
+            (batch_id, snapshot_time),
+        )
+        return cursor.fetchall()
@@ -1,13 +1,15 @@
 """
 Snapshot Repository
 
-Handles bulk insert of option chain snapshot
+Handles bulk insert of option chain snapshot via COPY, one
+snapshot_batches header per ingested chain.
 """
 
-from typing import List
+import io
 import pandas as pd
-from psycopg2.extras import execute_values
+from analytics.option_geeks_engine import OptionGeeksEngine
 from database.db_connection import DatabaseConnection
+from database.partition_manager import pkey_pattern
 
 
 class SnapshotRepository:
@@ -16,7 +18,7 @@ class SnapshotRepository:
         msg = str(exc)
         return (
             getattr(exc, "pgcode", None) == "23505"
-            and "option_chain_snapshot_pkey" in msg
+            and pkey_pattern("option_chain_snapshot").search(msg) is not None
         )
 
     @staticmethod
@@ -31,49 +33,101 @@ class SnapshotRepository:
             """
         )
 
+    COPY_COLUMNS = [
+        "symbol",
+        "strike_price",
+        "option_type",
+        "open_interest",
+        "oi_change",
+        "volume",
+        "ltp",
+        "snapshot_time",
+        "batch_id",
+    ]
+    BIGINT_COLUMNS = ["open_interest", "oi_change", "volume"]
+
     @staticmethod
-    def bulk_insert_snapshot(df: pd.DataFrame) -> None:
+    def _to_copy_buffer(df: pd.DataFrame, batch_id: int | None = None) -> io.StringIO:
         """
-        Bulk insert option chain snapshot
+        Serialize snapshot rows as CSV for COPY; missing values become NULL.
         """
+        out = df.assign(batch_id=batch_id)[SnapshotRepository.COPY_COLUMNS].copy()
+        out["batch_id"] = out["batch_id"].astype("Int64")
+        for col in SnapshotRepository.BIGINT_COLUMNS:
+            # API counts arrive as floats; BIGINT columns reject "1200.0".
+            out[col] = pd.to_numeric(out[col], errors="coerce").round().astype("Int64")
 
-        if df.empty:
-            return
+        buffer = io.StringIO()
+        out.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f%z")
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    def _nearest_expiry(df: pd.DataFrame):
+        for col in ("expiry", "expiry_date", "expiryDate", "exd"):
+            if col in df.columns:
+                dates = [OptionGeeksEngine._parse_expiry(v) for v in df[col].dropna().unique()]  # noqa: SLF001
+                dates = [d for d in dates if d is not None]
+                if dates:
+                    return min(dates)
+        return None
 
-        insert_query = """
-        INSERT INTO option_chain_snapshot (
-            symbol,
-            strike_price,
-            option_type,
-            open_interest,
-            oi_change,
-            volume,
-            ltp,
-            snapshot_time
+    @staticmethod
+    def write_batch_header(cursor, df: pd.DataFrame, spot_price: float | None = None) -> int:
+        """
+        Upsert the snapshot_batches header for this chain and return its id.
+        """
+        cursor.execute(
+            """
+            INSERT INTO snapshot_batches (symbol, snapshot_time, row_count, spot_price, expiry_date)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (symbol, snapshot_time) DO UPDATE
+            SET row_count = snapshot_batches.row_count + EXCLUDED.row_count,
+                spot_price = COALESCE(EXCLUDED.spot_price, snapshot_batches.spot_price),
+                expiry_date = COALESCE(EXCLUDED.expiry_date, snapshot_batches.expiry_date)
+            RETURNING id
+            """,
+            (
+                str(df["symbol"].iloc[0]),
+                df["snapshot_time"].iloc[0],
+                len(df),
+                None if spot_price is None else float(spot_price),
+                SnapshotRepository._nearest_expiry(df),
+            ),
         )
-        VALUES %s
+        return int(cursor.fetchone()[0])
+
+    @staticmethod
+    def write_snapshot(cursor, df: pd.DataFrame, spot_price: float | None = None) -> int | None:
+        """
+        Write the batch header and stream the chain through COPY on an open
+        cursor; the caller commits. Returns the batch id.
         """
+        if df.empty:
+            return None
 
-        values: List[tuple] = list(
-            df[
-                [
-                    "symbol",
-                    "strike_price",
-                    "option_type",
-                    "open_interest",
-                    "oi_change",
-                    "volume",
-                    "ltp",
-                    "snapshot_time"
-                ]
-            ].itertuples(index=False, name=None)
+        batch_id = SnapshotRepository.write_batch_header(cursor, df, spot_price)
+        copy_query = (
+            f"COPY option_chain_snapshot ({', '.join(SnapshotRepository.COPY_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)"
         )
+        cursor.copy_expert(copy_query, SnapshotRepository._to_copy_buffer(df, batch_id))
+        return batch_id
+
+    @staticmethod
+    def bulk_insert_snapshot(df: pd.DataFrame, spot_price: float | None = None) -> None:
+        """
+        Bulk insert option chain snapshot
+        """
+
+        if df.empty:
+            return
 
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
 
         try:
-            execute_values(cursor, insert_query, values)
+            SnapshotRepository.write_snapshot(cursor, df, spot_price)
             conn.commit()
 
         except Exception as e:
@@ -83,7 +137,7 @@ class SnapshotRepository:
                     # Auto-heal SERIAL sequence drift and retry once.
                     SnapshotRepository._reset_id_sequence(cursor)
                     conn.commit()
-                    execute_values(cursor, insert_query, values)
+                    SnapshotRepository.write_snapshot(cursor, df, spot_price)
                     conn.commit()
                     return
                 except Exception as retry_exc:
@@ -10,7 +10,8 @@ from database.db_connection import DatabaseConnection
 class SummaryRepository:
 
     @staticmethod
-    def insert_summary(
+    def write_summary(
+        cursor,
         symbol: str,
         snapshot_time,
         spot_price: float,
@@ -24,6 +25,9 @@ class SummaryRepository:
         structure: str,
         trap_signal: str
     ) -> None:
+        """
+        Insert one summary row on an open cursor; the caller commits.
+        """
 
         insert_query = """
         INSERT INTO option_chain_summary (
@@ -45,26 +49,58 @@ class SummaryRepository:
         )
         """
 
+        cursor.execute(
+            insert_query,
+            (
+                symbol,
+                snapshot_time,
+                spot_price,
+                atm_strike,
+                total_ce_oi,
+                total_pe_oi,
+                pcr,
+                resistance,
+                support,
+                max_pain,
+                structure,
+                trap_signal
+            )
+        )
+
+    @staticmethod
+    def insert_summary(
+        symbol: str,
+        snapshot_time,
+        spot_price: float,
+        atm_strike: float,
+        total_ce_oi: float,
+        total_pe_oi: float,
+        pcr: float,
+        resistance: float,
+        support: float,
+        max_pain: float,
+        structure: str,
+        trap_signal: str
+    ) -> None:
+
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
 
         try:
-            cursor.execute(
-                insert_query,
-                (
-                    symbol,
-                    snapshot_time,
-                    spot_price,
-                    atm_strike,
-                    total_ce_oi,
-                    total_pe_oi,
-                    pcr,
-                    resistance,
-                    support,
-                    max_pain,
-                    structure,
-                    trap_signal
-                )
+            SummaryRepository.write_summary(
+                cursor,
+                symbol=symbol,
+                snapshot_time=snapshot_time,
+                spot_price=spot_price,
+                atm_strike=atm_strike,
+                total_ce_oi=total_ce_oi,
+                total_pe_oi=total_pe_oi,
+                pcr=pcr,
+                resistance=resistance,
+                support=support,
+                max_pain=max_pain,
+                structure=structure,
+                trap_signal=trap_signal
             )
             conn.commit()
 
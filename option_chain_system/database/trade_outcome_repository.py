@@ -4,52 +4,85 @@ Repository for trade outcome labeling and analytics.
 
 from __future__ import annotations
 
-from datetime import timedelta
+from datetime import datetime, timedelta
+from psycopg2.extras import execute_values
+import pytz
+from config.settings import settings
 from database.db_connection import DatabaseConnection
+from database.snapshot_archive import SnapshotArchive
 
 
 class TradeOutcomeRepository:
+    HORIZONS = (10, 30, 60)
+    PENDING_SIGNAL_FILTER = "s.symbol = %s AND s.snapshot_time >= NOW() - (%s || ' hours')::interval"
+
     @staticmethod
-    def _fetch_ltp_at_or_after(symbol: str, side: str, strike: float, target_time):
-        query = """
-        SELECT snapshot_time, ltp
-        FROM option_chain_snapshot
-        WHERE symbol = %s
-          AND option_type = %s
-          AND strike_price = %s
-          AND snapshot_time >= %s
-        ORDER BY snapshot_time ASC
-        LIMIT 1
+    def _fetch_unresolved_exits(cursor, signal_filter: str, params: tuple) -> list[tuple]:
         """
-        conn = DatabaseConnection.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(query, (symbol, side, strike, target_time))
-            row = cursor.fetchone()
-            return row if row else None
-        finally:
-            cursor.close()
-            DatabaseConnection.release_connection(conn)
+        One row per (signal, horizon) that has no outcome yet or is still OPEN,
+        with the first LTP at or after entry + horizon resolved in the same query.
+        """
+        cursor.execute(TradeOutcomeRepository._unresolved_exits_sql(signal_filter), params)
+        return cursor.fetchall()
 
     @staticmethod
-    def _upsert_outcome(
-        signal_id: int,
-        horizon_min: int,
-        exit_time,
-        exit_ltp: float | None,
-        return_pct: float | None,
-        pnl_points: float | None,
-        outcome_label: str,
-        hit_target: bool,
-        hit_stop: bool,
-        expectancy_component: float,
-    ) -> None:
+    def _unresolved_exits_sql(signal_filter: str) -> str:
+        # The lateral lookup is an index-only probe on idx_snapshot_contract_time.
+        horizons = ", ".join(f"({int(h)})" for h in TradeOutcomeRepository.HORIZONS)
+        query = f"""
+        SELECT
+            s.id, h.horizon_min, s.entry_ltp, s.stop_loss_pct, s.target_pct,
+            o.signal_id IS NULL AS missing, x.snapshot_time, x.ltp
+        FROM trade_signals s
+        CROSS JOIN (VALUES {horizons}) AS h(horizon_min)
+        LEFT JOIN trade_outcomes o
+          ON o.signal_id = s.id
+         AND o.horizon_min = h.horizon_min
+        LEFT JOIN LATERAL (
+            SELECT snap.snapshot_time, snap.ltp
+            FROM option_chain_snapshot snap
+            WHERE snap.symbol = s.symbol
+              AND snap.option_type = s.side
+              AND snap.strike_price = s.strike_price
+              AND snap.snapshot_time >= s.snapshot_time + make_interval(mins => h.horizon_min)
+            ORDER BY snap.snapshot_time ASC
+            LIMIT 1
+        ) x ON TRUE
+        WHERE {signal_filter}
+          AND s.entry_ltp > 0
+          AND (o.signal_id IS NULL OR o.outcome_label = 'OPEN')
+        """
+        return query
+
+    @staticmethod
+    def _label_unresolved(cursor, signal_filter: str, params: tuple) -> int:
+        rows = []
+        for signal_id, horizon, entry_ltp, stop_loss_pct, target_pct, missing, exit_time, exit_ltp in (
+            TradeOutcomeRepository._fetch_unresolved_exits(cursor, signal_filter, params)
+        ):
+            if exit_ltp is None and not missing:
+                continue  # Still OPEN with nothing new to record.
+            rows.append(
+                TradeOutcomeRepository._outcome_row(
+                    signal_id=int(signal_id),
+                    horizon=int(horizon),
+                    ltp_row=(exit_time, exit_ltp) if exit_ltp is not None else None,
+                    entry_ltp=float(entry_ltp),
+                    stop_loss_pct=float(stop_loss_pct or 25.0),
+                    target_pct=float(target_pct or 45.0),
+                )
+            )
+        TradeOutcomeRepository._upsert_outcomes(cursor, rows)
+        return len(rows)
+
+    @staticmethod
+    def _upsert_outcomes(cursor, rows: list[tuple]) -> None:
         query = """
         INSERT INTO trade_outcomes (
             signal_id, horizon_min, exit_time, exit_ltp, return_pct, pnl_points,
             outcome_label, hit_target, hit_stop, expectancy_component
         )
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+        VALUES %s
         ON CONFLICT (signal_id, horizon_min)
         DO UPDATE SET
             exit_time = EXCLUDED.exit_time,
@@ -61,24 +94,63 @@ class TradeOutcomeRepository:
             hit_stop = EXCLUDED.hit_stop,
             expectancy_component = EXCLUDED.expectancy_component
         """
+        if rows:
+            execute_values(cursor, query, rows)
+
+    @staticmethod
+    def _outcome_row(
+        signal_id: int,
+        horizon: int,
+        ltp_row,
+        entry_ltp: float,
+        stop_loss_pct: float,
+        target_pct: float,
+    ) -> tuple:
+        if not ltp_row:
+            return (signal_id, horizon, None, None, None, None, "OPEN", False, False, 0.0)
+
+        exit_time, exit_ltp = ltp_row
+        exit_ltp = float(exit_ltp)
+        pnl_points = exit_ltp - float(entry_ltp)
+        return_pct = (pnl_points / float(entry_ltp)) * 100
+        hit_target = return_pct >= target_pct
+        hit_stop = return_pct <= -abs(stop_loss_pct)
+
+        if hit_target:
+            label = "WIN"
+        elif hit_stop:
+            label = "LOSS"
+        elif abs(return_pct) < 1.0:
+            label = "FLAT"
+        else:
+            label = "WIN" if return_pct > 0 else "LOSS"
+
+        return (
+            signal_id,
+            horizon,
+            exit_time,
+            exit_ltp,
+            return_pct,
+            pnl_points,
+            label,
+            hit_target,
+            hit_stop,
+            return_pct / 100.0,
+        )
+
+    @staticmethod
+    def write_outcomes_for_signal(cursor, signal_id: int) -> int:
+        """
+        Label all horizons for one signal on an open cursor; the caller commits.
+        """
+        return TradeOutcomeRepository._label_unresolved(cursor, "s.id = %s", (signal_id,))
+
+    @staticmethod
+    def label_outcomes_for_signal(signal_id: int) -> None:
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(
-                query,
-                (
-                    signal_id,
-                    horizon_min,
-                    exit_time,
-                    exit_ltp,
-                    return_pct,
-                    pnl_points,
-                    outcome_label,
-                    hit_target,
-                    hit_stop,
-                    expectancy_component,
-                ),
-            )
+            TradeOutcomeRepository.write_outcomes_for_signal(cursor, signal_id)
             conn.commit()
         except Exception:
             conn.rollback()
@@ -86,67 +158,6 @@ class TradeOutcomeRepository:
             cursor.close()
             DatabaseConnection.release_connection(conn)
 
-    @staticmethod
-    def label_outcomes_for_signal(
-        signal_id: int,
-        symbol: str,
-        side: str,
-        strike: float,
-        entry_time,
-        entry_ltp: float | None,
-        stop_loss_pct: float,
-        target_pct: float,
-    ) -> None:
-        if not entry_ltp or entry_ltp <= 0:
-            return
-
-        for horizon in (10, 30, 60):
-            target_time = entry_time + timedelta(minutes=horizon)
-            row = TradeOutcomeRepository._fetch_ltp_at_or_after(symbol, side, strike, target_time)
-            if not row:
-                TradeOutcomeRepository._upsert_outcome(
-                    signal_id=signal_id,
-                    horizon_min=horizon,
-                    exit_time=None,
-                    exit_ltp=None,
-                    return_pct=None,
-                    pnl_points=None,
-                    outcome_label="OPEN",
-                    hit_target=False,
-                    hit_stop=False,
-                    expectancy_component=0.0,
-                )
-                continue
-
-            exit_time, exit_ltp = row
-            exit_ltp = float(exit_ltp)
-            pnl_points = exit_ltp - float(entry_ltp)
-            return_pct = (pnl_points / float(entry_ltp)) * 100
-            hit_target = return_pct >= target_pct
-            hit_stop = return_pct <= -abs(stop_loss_pct)
-
-            if hit_target:
-                label = "WIN"
-            elif hit_stop:
-                label = "LOSS"
-            elif abs(return_pct) < 1.0:
-                label = "FLAT"
-            else:
-                label = "WIN" if return_pct > 0 else "LOSS"
-
-            TradeOutcomeRepository._upsert_outcome(
-                signal_id=signal_id,
-                horizon_min=horizon,
-                exit_time=exit_time,
-                exit_ltp=exit_ltp,
-                return_pct=return_pct,
-                pnl_points=pnl_points,
-                outcome_label=label,
-                hit_target=hit_target,
-                hit_stop=hit_stop,
-                expectancy_component=return_pct / 100.0,
-            )
-
     @staticmethod
     def fetch_recent_performance(symbol: str, lookback_days: int = 20) -> dict:
         query = """
@@ -182,45 +193,67 @@ class TradeOutcomeRepository:
             DatabaseConnection.release_connection(conn)
 
     @staticmethod
-    def process_pending_signals(symbol: str, lookback_hours: int = 8) -> None:
-        query = """
-        SELECT id, symbol, snapshot_time, side, strike_price, entry_ltp, stop_loss_pct, target_pct
-        FROM trade_signals
-        WHERE symbol = %s
-          AND snapshot_time >= NOW() - (%s || ' hours')::interval
-        ORDER BY snapshot_time DESC
+    def write_pending_outcomes(cursor, symbol: str, lookback_hours: int = 8) -> int:
+        """
+        Label every unresolved horizon of recent `symbol` signals in one query
+        and one upsert on an open cursor; the caller commits.
         """
+        return TradeOutcomeRepository._label_unresolved(
+            cursor,
+            TradeOutcomeRepository.PENDING_SIGNAL_FILTER,
+            (symbol, lookback_hours),
+        )
+
+    @staticmethod
+    def process_pending_signals(symbol: str, lookback_hours: int = 8) -> None:
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(query, (symbol, lookback_hours))
-            rows = cursor.fetchall()
+            TradeOutcomeRepository.write_pending_outcomes(cursor, symbol, lookback_hours)
+            conn.commit()
         except Exception:
-            rows = []
+            conn.rollback()
         finally:
             cursor.close()
             DatabaseConnection.release_connection(conn)
 
-        for row in rows:
-            signal_id, sym, entry_time, side, strike, entry_ltp, stop_loss_pct, target_pct = row
-            TradeOutcomeRepository.label_outcomes_for_signal(
-                signal_id=int(signal_id),
-                symbol=sym,
-                side=side,
-                strike=float(strike),
-                entry_time=entry_time,
-                entry_ltp=float(entry_ltp or 0.0),
-                stop_loss_pct=float(stop_loss_pct or 25.0),
-                target_pct=float(target_pct or 45.0),
-            )
+    @staticmethod
+    def _archived_calibration_rows(symbol: str, lookback_days: int, live_ids: set[int]) -> list[tuple]:
+        """
+        (probability, outcome_label) rows for archived signals in the lookback
+        window that are no longer in PostgreSQL.
+        """
+        if not SnapshotArchive.available():
+            return []
+        now = datetime.now(pytz.timezone(settings.TIMEZONE))
+        start = now - timedelta(days=int(lookback_days))
+        signals = SnapshotArchive.read(
+            "trade_signals",
+            symbol,
+            start.date(),
+            now.date(),
+            columns=["id", "snapshot_time", "raw_probability", "calibrated_probability"],
+        )
+        outcomes = SnapshotArchive.read(
+            "trade_outcomes", symbol, start.date(), now.date(), columns=["signal_id", "horizon_min", "outcome_label"]
+        )
+        if signals.empty or outcomes.empty:
+            return []
+        outcomes = outcomes[(outcomes["horizon_min"] == 30) & outcomes["outcome_label"].isin(["WIN", "LOSS"])]
+        signals = signals[(signals["snapshot_time"] >= start) & ~signals["id"].isin(live_ids)]
+        merged = signals.merge(outcomes, left_on="id", right_on="signal_id", how="inner")
+        prob = merged["raw_probability"].fillna(merged["calibrated_probability"])
+        merged = merged.assign(prob=prob).dropna(subset=["prob"])
+        return list(zip(merged["prob"].astype(float), merged["outcome_label"]))
 
     @staticmethod
     def fetch_calibration_samples(symbol: str, lookback_days: int = 45) -> list[tuple[float, int]]:
         """
-        Returns (raw_probability_0_to_1, outcome_binary) samples for calibration.
+        Returns (raw_probability_0_to_1, outcome_binary) samples for calibration,
+        topped up from the snapshot archive for days cleanup has removed.
         """
         query = """
-        SELECT COALESCE(s.raw_probability, s.calibrated_probability), o.outcome_label
+        SELECT s.id, COALESCE(s.raw_probability, s.calibrated_probability), o.outcome_label
         FROM trade_outcomes o
         JOIN trade_signals s ON s.id = o.signal_id
         WHERE s.symbol = %s
@@ -234,6 +267,9 @@ class TradeOutcomeRepository:
         try:
             cursor.execute(query, (symbol, lookback_days))
             rows = cursor.fetchall()
+            live_ids = {int(row[0]) for row in rows}
+            rows = [row[1:] for row in rows]
+            rows += TradeOutcomeRepository._archived_calibration_rows(symbol, lookback_days, live_ids)
             samples: list[tuple[float, int]] = []
             for prob, label in rows:
                 p = float(prob or 0.5)
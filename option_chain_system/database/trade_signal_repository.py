@@ -9,7 +9,8 @@ from database.db_connection import DatabaseConnection
 
 class TradeSignalRepository:
     @staticmethod
-    def insert_signal(
+    def write_signal(
+        cursor,
         symbol: str,
         snapshot_time,
         side: str,
@@ -25,7 +26,10 @@ class TradeSignalRepository:
         target_pct: float,
         time_stop_min: int,
         execution_notes: str,
-    ) -> int | None:
+    ) -> int:
+        """
+        Insert a signal on an open cursor and return its id; the caller commits.
+        """
         query = """
         INSERT INTO trade_signals (
             symbol, snapshot_time, side, strike_price, entry_ltp, spot_price,
@@ -35,30 +39,67 @@ class TradeSignalRepository:
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         RETURNING id
         """
+        cursor.execute(
+            query,
+            (
+                symbol,
+                snapshot_time,
+                side,
+                strike_price,
+                entry_ltp,
+                spot_price,
+                regime,
+                signal_strength,
+                timing_score,
+                raw_probability,
+                calibrated_probability,
+                stop_loss_pct,
+                target_pct,
+                time_stop_min,
+                execution_notes,
+            ),
+        )
+        return int(cursor.fetchone()[0])
+
+    @staticmethod
+    def insert_signal(
+        symbol: str,
+        snapshot_time,
+        side: str,
+        strike_price: float,
+        entry_ltp: float | None,
+        spot_price: float,
+        regime: str,
+        signal_strength: float,
+        timing_score: float,
+        raw_probability: float,
+        calibrated_probability: float,
+        stop_loss_pct: float,
+        target_pct: float,
+        time_stop_min: int,
+        execution_notes: str,
+    ) -> int | None:
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(
-                query,
-                (
-                    symbol,
-                    snapshot_time,
-                    side,
-                    strike_price,
-                    entry_ltp,
-                    spot_price,
-                    regime,
-                    signal_strength,
-                    timing_score,
-                    raw_probability,
-                    calibrated_probability,
-                    stop_loss_pct,
-                    target_pct,
-                    time_stop_min,
-                    execution_notes,
-                ),
+            signal_id = TradeSignalRepository.write_signal(
+                cursor,
+                symbol=symbol,
+                snapshot_time=snapshot_time,
+                side=side,
+                strike_price=strike_price,
+                entry_ltp=entry_ltp,
+                spot_price=spot_price,
+                regime=regime,
+                signal_strength=signal_strength,
+                timing_score=timing_score,
+                raw_probability=raw_probability,
+                calibrated_probability=calibrated_probability,
+                stop_loss_pct=stop_loss_pct,
+                target_pct=target_pct,
+                time_stop_min=time_stop_min,
+                execution_notes=execution_notes,
             )
-            signal_id = cursor.fetchone()[0]
             conn.commit()
             return int(signal_id)
         except Exception:
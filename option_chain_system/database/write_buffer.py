@@ -0,0 +1,91 @@
+"""
+Unit-of-work write buffer for one symbol cycle.
+
+Repositories expose cursor-level write helpers; the pipeline queues them
+here and flushes everything on one pooled connection with a single commit.
+Each write runs under its own savepoint so optional writes (scalp score,
+signal labeling) can fail without discarding the snapshot and summary.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+from database.db_connection import DatabaseConnection
+
+
+@dataclass
+class PendingWrite:
+    name: str
+    op: Callable[[Any], Any]
+    required: bool = True
+    healer: Any = None
+
+
+class CycleWriteBuffer:
+    def __init__(self) -> None:
+        self._pending: list[PendingWrite] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, name: str, op: Callable[[Any], Any], required: bool = True, healer: Any = None) -> None:
+        """
+        Queue `op(cursor)`. `healer` is a repository class providing
+        `_is_id_duplicate` / `_reset_id_sequence` for SERIAL drift recovery.
+        """
+        self._pending.append(PendingWrite(name=name, op=op, required=required, healer=healer))
+
+    @staticmethod
+    def _run(cursor, write: PendingWrite):
+        cursor.execute("SAVEPOINT cycle_write")
+        try:
+            result = write.op(cursor)
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT cycle_write")
+            if write.healer is None or not write.healer._is_id_duplicate(e):  # noqa: SLF001
+                raise
+            # Auto-heal SERIAL sequence drift and retry once, still under the
+            # savepoint so a failed retry does not abort the transaction.
+            try:
+                write.healer._reset_id_sequence(cursor)  # noqa: SLF001
+                result = write.op(cursor)
+            except Exception:
+                cursor.execute("ROLLBACK TO SAVEPOINT cycle_write")
+                raise
+        cursor.execute("RELEASE SAVEPOINT cycle_write")
+        return result
+
+    def flush(self) -> dict[str, Any]:
+        """
+        Execute all queued writes in one transaction and return each op's
+        result by name. A failed required write rolls back the whole cycle.
+        """
+        if not self._pending:
+            return {}
+
+        pending, self._pending = self._pending, []
+        results: dict[str, Any] = {}
+        conn = DatabaseConnection.get_connection()
+        cursor = conn.cursor()
+        try:
+            for write in pending:
+                try:
+                    results[write.name] = CycleWriteBuffer._run(cursor, write)
+                except Exception as e:
+                    if write.required:
+                        raise RuntimeError(f"{write.name} write failed: {e}")
+                    print(f"{write.name} write skipped: {e}")
+                    results[write.name] = None
+            # COMMIT on an aborted transaction silently rolls back; fail loudly instead.
+            if conn.get_transaction_status() == TRANSACTION_STATUS_INERROR:
+                raise RuntimeError("Cycle transaction aborted; writes not committed")
+            conn.commit()
+            return results
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            DatabaseConnection.release_connection(conn)
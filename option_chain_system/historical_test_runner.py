@@ -7,6 +7,7 @@ import pandas as pd
 import pytz
 
 from analytics.advanced_analysis import AdvancedOptionAnalysis
+from analytics.baseline_oi_cache import BaselineOICache
 from analytics.basic_analysis import BasicOptionAnalysis
 from analytics.breakout_engine import BreakoutEngine
 from analytics.data_quality_engine import DataQualityEngine
@@ -26,6 +27,7 @@ from analytics.volume_engine import VolumeEngine
 from config.settings import settings
 from database.db_connection import DatabaseConnection
 from database.market_context_repository import MarketContextRepository
+from database.snapshot_batch_repository import SnapshotBatchRepository, nearest_time_params, nearest_time_sql
 from database.trade_outcome_repository import TradeOutcomeRepository
 from reporting.report_builder import ReportBuilder
 
@@ -33,68 +35,47 @@ from reporting.report_builder import ReportBuilder
 TIMEZONE = pytz.timezone("Asia/Kolkata")
 
 
-def _pick_side(market_bias_data: dict, geeks_data: dict) -> str:
-    score = int(market_bias_data.get("market_score", 0))
-    geeks_side = geeks_data.get("preferred_otm_side", "NO TRADE / WAIT")
-    if score >= 20 and "CE" in geeks_side:
-        return "CE"
-    if score <= -20 and "PE" in geeks_side:
-        return "PE"
-    if score >= 25:
-        return "CE"
-    if score <= -25:
-        return "PE"
-    return ""
-
-
 class HistoricalTestRunner:
     @staticmethod
     def fetch_previous_snapshot(symbol: str, target_time: datetime) -> pd.DataFrame:
-        query = """
-        SELECT strike_price, option_type, open_interest
-        FROM option_chain_snapshot
-        WHERE symbol = %s
-          AND snapshot_time < %s
-        ORDER BY snapshot_time DESC
-        LIMIT 400
+        """
+        Exactly the latest chain before target_time (one batch, one row per contract).
         """
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(query, (symbol, target_time))
-            rows = cursor.fetchall()
+            batch = SnapshotBatchRepository.previous_batch(cursor, symbol, target_time)
+            if batch is None:
+                return pd.DataFrame()
+            columns = ["strike_price", "option_type", "open_interest"]
+            rows = SnapshotBatchRepository.batch_rows(cursor, batch, columns)
             if not rows:
                 return pd.DataFrame()
-            df = pd.DataFrame(rows, columns=["strike_price", "option_type", "open_interest"])
+            df = pd.DataFrame(rows, columns=columns)
             df["strike_price"] = pd.to_numeric(df["strike_price"], errors="coerce")
             df["open_interest"] = pd.to_numeric(df["open_interest"], errors="coerce")
-            return df.dropna(subset=["strike_price", "open_interest"])
+            df = df.dropna(subset=["strike_price", "open_interest"])
+            return df.drop_duplicates(subset=["strike_price", "option_type"], keep="last")
         finally:
             cursor.close()
             DatabaseConnection.release_connection(conn)
 
     @staticmethod
     def fetch_snapshot(symbol: str, target_time: datetime) -> pd.DataFrame:
-        query = """
-        SELECT strike_price, option_type, open_interest, volume, ltp, snapshot_time
-        FROM option_chain_snapshot
-        WHERE symbol = %s
-          AND snapshot_time BETWEEN %s - INTERVAL '5 minutes'
-                                AND %s + INTERVAL '5 minutes'
-        ORDER BY ABS(EXTRACT(EPOCH FROM (snapshot_time - %s)))
-        LIMIT 500
+        """
+        The single chain nearest to target_time (within 5 minutes).
         """
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(query, (symbol, target_time, target_time, target_time))
-            rows = cursor.fetchall()
+            batch = SnapshotBatchRepository.nearest_batch(cursor, symbol, target_time)
+            if batch is None:
+                return pd.DataFrame()
+            columns = ["strike_price", "option_type", "open_interest", "volume", "ltp", "snapshot_time"]
+            rows = SnapshotBatchRepository.batch_rows(cursor, batch, columns)
             if not rows:
                 return pd.DataFrame()
-            df = pd.DataFrame(
-                rows,
-                columns=["strike_price", "option_type", "open_interest", "volume", "ltp", "snapshot_time"],
-            )
+            df = pd.DataFrame(rows, columns=columns)
             for col in ("strike_price", "open_interest", "volume", "ltp"):
                 df[col] = pd.to_numeric(df[col], errors="coerce")
             df["symbol"] = symbol
@@ -105,20 +86,19 @@ class HistoricalTestRunner:
 
     @staticmethod
     def fetch_summary(symbol: str, target_time: datetime) -> pd.DataFrame:
-        query = """
-        SELECT spot_price, atm_strike, total_ce_oi, total_pe_oi, pcr,
-               resistance, support, max_pain, structure, trap_signal, snapshot_time
-        FROM option_chain_summary
-        WHERE symbol = %s
-          AND snapshot_time BETWEEN %s - INTERVAL '5 minutes'
-                                AND %s + INTERVAL '5 minutes'
-        ORDER BY ABS(EXTRACT(EPOCH FROM (snapshot_time - %s)))
-        LIMIT 1
         """
+        The summary nearest to target_time; pass the chain's snapshot_time to
+        get the summary written with that chain.
+        """
+        query = nearest_time_sql(
+            "option_chain_summary",
+            "spot_price, atm_strike, total_ce_oi, total_pe_oi, pcr, "
+            "resistance, support, max_pain, structure, trap_signal, snapshot_time",
+        )
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(query, (symbol, target_time, target_time, target_time))
+            cursor.execute(query, nearest_time_params(symbol, target_time))
             row = cursor.fetchone()
             if not row:
                 return pd.DataFrame()
@@ -168,7 +148,7 @@ class HistoricalTestRunner:
         if df.empty or snapshot_time is None:
             raise ValueError("No snapshot data found near requested timestamp")
 
-        summary_df = HistoricalTestRunner.fetch_summary(symbol, target_time)
+        summary_df = HistoricalTestRunner.fetch_summary(symbol, snapshot_time)
         if summary_df.empty:
             raise ValueError("No summary data found near requested timestamp")
 
@@ -194,20 +174,7 @@ class HistoricalTestRunner:
         ce_df, pe_df = basic.split_ce_pe(df)
         total_ce, total_pe = basic.calculate_total_oi(ce_df, pe_df)
         pcr = basic.calculate_pcr(total_pe, total_ce)
-        baseline_df = MarketContextRepository.fetch_open_oi_by_strike(symbol=symbol, upto_time=snapshot_time)
-        baseline_ce_oi_by_strike = {}
-        baseline_pe_oi_by_strike = {}
-        if not baseline_df.empty:
-            base_ce_df = baseline_df[baseline_df["option_type"] == "CE"]
-            base_pe_df = baseline_df[baseline_df["option_type"] == "PE"]
-            baseline_ce_oi_by_strike = {
-                float(k): float(v)
-                for k, v in base_ce_df.groupby("strike_price", as_index=True)["open_interest"].sum().to_dict().items()
-            }
-            baseline_pe_oi_by_strike = {
-                float(k): float(v)
-                for k, v in base_pe_df.groupby("strike_price", as_index=True)["open_interest"].sum().to_dict().items()
-            }
+        baseline_ce_oi_by_strike, baseline_pe_oi_by_strike = BaselineOICache.get(symbol, snapshot_time)
 
         resistance, support, sr_window_data = advanced.oi_based_levels_atm_window(
             ce_df,
@@ -287,7 +254,7 @@ class HistoricalTestRunner:
         )
         intraday_data = intraday_engine.generate_outlook(spot, resistance, support, prob_data, breakout_signal)
 
-        side = _pick_side(market_bias_data, geeks_data)
+        side = MarketBiasEngine.pick_side(market_bias_data, geeks_data)
         dynamic_pick = {"strike": None, "entry_ltp": None, "score": 0.0, "reasons": ["No trade side selected."]}
         if side and timing_data["allow_trade"] and quality.is_usable:
             dynamic_pick = DynamicOTMSelector.select(
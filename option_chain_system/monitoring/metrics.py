@@ -0,0 +1,251 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A small registry of counters, gauges and histograms (with optional
+labels) shared by every thread in the process. `scheduler.py` serves it
+on METRICS_PORT and writes it to METRICS_TEXTFILE after each cycle;
+`serve_reports.py` serves its own metrics plus that file on `/metrics`,
+so one scrape of the report server covers both processes.
+
+No client library is required; only the exposition format is implemented.
+"""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import bisect
+import os
+import threading
+
+from config.settings import settings
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a millisecond DB wait up to a cycle overrunning its 10-minute window.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> ([per-bucket counts..., +Inf count], sum)
+        self._values: dict[tuple[str, ...], tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels)) or ([0], 0.0)
+            return sum(counts)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {running}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, labelnames=(), **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, tuple(labelnames), **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Pipeline (scheduler process)
+CYCLE_SECONDS = REGISTRY.histogram("oc_cycle_duration_seconds", "Wall time of one scheduler cycle over all symbols.")
+SYMBOL_CYCLES = REGISTRY.counter("oc_symbol_cycles_total", "Symbol cycles by outcome.", ("symbol", "status"))
+SYMBOL_SECONDS = REGISTRY.histogram("oc_symbol_cycle_seconds", "Wall time of one symbol cycle.", ("symbol",))
+STAGE_SECONDS = REGISTRY.histogram("oc_stage_seconds", "Wall time of one run_option_chain stage.", ("stage",))
+FYERS_SECONDS = REGISTRY.histogram("oc_fyers_request_seconds", "FYERS API call latency.", ("endpoint",))
+FYERS_ERRORS = REGISTRY.counter("oc_fyers_errors_total", "FYERS API calls that raised or returned an error.", ("endpoint",))
+FYERS_THROTTLED_SECONDS = REGISTRY.counter(
+    "oc_fyers_throttled_seconds_total", "Seconds FYERS calls waited on the request governor or backed off after a rate limit.", ("endpoint",)
+)
+FYERS_RATE_LIMITED = REGISTRY.counter("oc_fyers_rate_limited_total", "FYERS responses rejected with a rate-limit code.", ("endpoint",))
+PREFETCH_SECONDS = REGISTRY.histogram("oc_fetch_prefetch_seconds", "Wall time of one concurrent spot + chain prefetch over all symbols.")
+DB_POOL_WAIT = REGISTRY.histogram("oc_db_pool_wait_seconds", "Time spent waiting for a pooled DB connection.")
+DB_IN_USE = REGISTRY.gauge("oc_db_connections_in_use", "Pooled DB connections currently checked out.")
+REPORT_WRITE_SECONDS = REGISTRY.histogram("oc_report_write_seconds", "Time to write one web report and its manifest row.")
+SNAPSHOT_ROWS = REGISTRY.gauge("oc_snapshot_rows", "Rows in the latest option chain fetched per symbol.", ("symbol",))
+SNAPSHOT_ROWS_TOTAL = REGISTRY.counter("oc_snapshot_rows_total", "Option chain rows fetched per symbol.", ("symbol",))
+JOB_EVENTS = REGISTRY.counter(
+    "oc_scheduler_job_events_total", "APScheduler job events (executed, error, missed, max_instances).", ("job", "event")
+)
+JOB_COALESCED = REGISTRY.counter(
+    "oc_scheduler_runs_coalesced_total", "Overdue run times merged into one run by coalescing.", ("job",)
+)
+
+
+def textfile_path() -> Path:
+    path = Path(settings.METRICS_TEXTFILE)
+    return path if path.is_absolute() else Path(__file__).resolve().parents[1] / path
+
+
+def write_textfile(registry: MetricsRegistry = REGISTRY, path: Path | None = None) -> None:
+    """
+    Atomically replace the exposition file other processes serve.
+    """
+    path = path or textfile_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(registry.render(), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as exc:
+        print(f"Metrics textfile write failed: {exc}")
+
+
+def read_textfile(path: Path | None = None) -> str:
+    path = path or textfile_path()
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return ""
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        return
+
+
+def start_http_server(port: int, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Serve GET /metrics from a daemon thread.
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
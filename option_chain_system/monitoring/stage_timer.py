@@ -0,0 +1,196 @@
+"""
+Per-stage latency and DB query counts for one symbol cycle.
+
+`StageTimer.cycle(symbol)` opens a trace in a context variable, so
+concurrent symbol workers (one thread each) never see each other's
+stages. Inside it, `StageTimer.stage(name)` records wall time and the
+number of statements the pooled connections executed. When the cycle
+ends its trace is appended as one JSON line to STAGE_TIMING_LOG and fed
+into a rolling in-process window per stage.
+
+Stages may nest (a nested stage's time is also counted in its parent).
+Outside a cycle every call is a no-op.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import math
+import threading
+import time
+
+from config.settings import settings
+from monitoring import metrics
+
+
+class _CycleTrace:
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self.started = time.perf_counter()
+        self.stages: dict[str, dict] = {}
+        self.queries = 0
+
+
+_trace: ContextVar[_CycleTrace | None] = ContextVar("stage_timer_trace", default=None)
+
+TOTAL_STAGE = "cycle_total"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of `values` (0 for an empty list).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return float(ordered[min(rank, len(ordered)) - 1])
+
+
+class StageTimer:
+    # Rolling window of recent cycles kept per stage.
+    WINDOW = 500
+
+    _samples: dict[str, deque] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def log_path() -> Path:
+        path = Path(settings.STAGE_TIMING_LOG)
+        return path if path.is_absolute() else Path(__file__).resolve().parents[1] / path
+
+    @staticmethod
+    def count_query(n: int = 1) -> None:
+        """
+        Called by the pooled cursors for every statement they execute.
+        """
+        trace = _trace.get()
+        if trace is not None:
+            trace.queries += n
+
+    @staticmethod
+    @contextmanager
+    def stage(name: str):
+        trace = _trace.get()
+        if trace is None:
+            yield
+            return
+        started = time.perf_counter()
+        queries = trace.queries
+        try:
+            yield
+        finally:
+            entry = trace.stages.setdefault(name, {"ms": 0.0, "queries": 0})
+            entry["ms"] += (time.perf_counter() - started) * 1000.0
+            entry["queries"] += trace.queries - queries
+
+    @staticmethod
+    @contextmanager
+    def cycle(symbol: str):
+        """
+        Trace one symbol cycle; the record is written even if the cycle fails.
+        """
+        if not settings.ENABLE_STAGE_TIMING:
+            yield
+            return
+        trace = _CycleTrace(symbol)
+        token = _trace.set(trace)
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            _trace.reset(token)
+            StageTimer._finish(trace, status)
+
+    @staticmethod
+    def _finish(trace: _CycleTrace, status: str) -> None:
+        total_ms = (time.perf_counter() - trace.started) * 1000.0
+        stages = {name: {"ms": round(v["ms"], 3), "queries": v["queries"]} for name, v in trace.stages.items()}
+        stages[TOTAL_STAGE] = {"ms": round(total_ms, 3), "queries": trace.queries}
+        with StageTimer._lock:
+            for name, value in stages.items():
+                StageTimer._samples.setdefault(name, deque(maxlen=StageTimer.WINDOW)).append(value["ms"])
+        for name, value in stages.items():
+            metrics.STAGE_SECONDS.observe(value["ms"] / 1000.0, stage=name)
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "symbol": trace.symbol,
+            "status": status,
+            "stages": stages,
+        }
+        try:
+            path = StageTimer.log_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with StageTimer._lock, path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record) + "\n")
+        except OSError as exc:
+            print(f"Stage timing log write failed: {exc}")
+
+    @staticmethod
+    def summary(samples: dict[str, list[float]] | None = None) -> list[dict]:
+        """
+        Count and p50/p95/p99 (ms) per stage; defaults to the in-process window.
+        """
+        if samples is None:
+            with StageTimer._lock:
+                samples = {name: list(values) for name, values in StageTimer._samples.items()}
+        return [
+            {
+                "stage": name,
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for name, values in sorted(samples.items())
+            if values
+        ]
+
+    @staticmethod
+    def format_summary(rows: list[dict]) -> str:
+        lines = [f"{'stage':<20} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}"]
+        for row in rows:
+            lines.append(
+                f"{row['stage']:<20} {row['count']:>6} {row['p50']:>10.1f} {row['p95']:>10.1f} {row['p99']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def read_log(path: Path, symbol: str | None = None, last: int | None = None) -> dict[str, list[float]]:
+        """
+        Stage durations (ms) from a JSONL log, optionally for one symbol and
+        only the most recent `last` cycles.
+        """
+        records = []
+        with path.open(encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if symbol and record.get("symbol") != symbol:
+                    continue
+                records.append(record)
+        if last:
+            records = records[-last:]
+        samples: dict[str, list[float]] = {}
+        for record in records:
+            for name, value in record.get("stages", {}).items():
+                samples.setdefault(name, []).append(float(value["ms"]))
+        return samples
+
+    @staticmethod
+    def clear() -> None:
+        with StageTimer._lock:
+            StageTimer._samples.clear()
@@ -0,0 +1,117 @@
+"""
+Long-lived pipeline context shared by every symbol cycle in a process.
+
+Holds one authenticated FYERS fetcher (its requests session keeps HTTP
+connections alive between calls) and the stateless analytics engines, so
+setup cost is paid once per process rather than once per symbol per cycle.
+
+With ENABLE_ASYNC_FETCH the scheduler calls `prefetch(symbols)` before a
+cycle: the async fetcher pulls every symbol's spot and chain concurrently
+and each symbol cycle takes its result instead of fetching on its own.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Iterable
+
+from data_layer.data_fetcher import OptionChainFetcher
+from analytics.basic_analysis import BasicOptionAnalysis
+from analytics.advanced_analysis import AdvancedOptionAnalysis
+from analytics.interpretation_engine import InterpretationEngine
+from analytics.breakout_engine import BreakoutEngine
+from analytics.probability_engine import ProbabilityEngine
+from analytics.volume_engine import VolumeEngine
+from analytics.scalp_engine import OTMScalpEngine
+from analytics.intraday_engine import IntradayEngine
+from analytics.institutional_confidence_engine import InstitutionalConfidenceEngine
+from analytics.market_bias_engine import MarketBiasEngine
+from analytics.option_geeks_engine import OptionGeeksEngine
+from monitoring import metrics
+from reporting.report_builder import ReportBuilder
+
+
+class PipelineContext:
+    def __init__(self, fetcher: OptionChainFetcher | None = None, async_fetcher=None) -> None:
+        self._fetcher = fetcher
+        self._fetcher_lock = threading.Lock()
+        self._async_fetcher = async_fetcher
+        self._prefetched: dict = {}
+        self._prefetch_lock = threading.Lock()
+
+        self.basic = BasicOptionAnalysis()
+        self.advanced = AdvancedOptionAnalysis()
+        self.interpreter = InterpretationEngine()
+        self.breakout_engine = BreakoutEngine()
+        self.prob_engine = ProbabilityEngine()
+        self.volume_engine = VolumeEngine()
+        self.scalp_engine = OTMScalpEngine()
+        self.intraday_engine = IntradayEngine()
+        self.report_builder = ReportBuilder()
+        self.confidence_engine = InstitutionalConfidenceEngine()
+        self.market_bias_engine = MarketBiasEngine()
+        self.geeks_engine = OptionGeeksEngine()
+
+    @property
+    def fetcher(self) -> OptionChainFetcher:
+        """
+        Authenticated fetcher, created on first use and reused afterwards.
+        """
+        if self._fetcher is None:
+            with self._fetcher_lock:
+                if self._fetcher is None:
+                    self._fetcher = OptionChainFetcher()
+        return self._fetcher
+
+    @property
+    def async_fetcher(self):
+        """
+        data_layer.async_fetcher.AsyncOptionChainFetcher, created on first use.
+        """
+        if self._async_fetcher is None:
+            with self._fetcher_lock:
+                if self._async_fetcher is None:
+                    from data_layer.async_fetcher import AsyncOptionChainFetcher
+
+                    self._async_fetcher = AsyncOptionChainFetcher()
+        return self._async_fetcher
+
+    def prefetch(self, symbols: Iterable[str]) -> float:
+        """
+        Fetch spot and chain for every symbol concurrently; replaces any
+        results left over from the previous cycle. Returns elapsed seconds.
+        """
+        with self._prefetch_lock:
+            self._prefetched = {}
+        started = time.perf_counter()
+        results = self.async_fetcher.fetch_cycle(symbols)
+        with self._prefetch_lock:
+            self._prefetched = results
+        elapsed = time.perf_counter() - started
+        metrics.PREFETCH_SECONDS.observe(elapsed)
+        return elapsed
+
+    def take_prefetched(self, symbol: str):
+        """
+        The prefetched SymbolFetch for `symbol`, at most once; None if the
+        symbol was not prefetched this cycle.
+        """
+        with self._prefetch_lock:
+            return self._prefetched.pop(symbol, None)
+
+
+_default_context: PipelineContext | None = None
+_default_lock = threading.Lock()
+
+
+def default_context() -> PipelineContext:
+    """
+    Process-wide context for callers that do not manage their own.
+    """
+    global _default_context
+    if _default_context is None:
+        with _default_lock:
+            if _default_context is None:
+                _default_context = PipelineContext()
+    return _default_context
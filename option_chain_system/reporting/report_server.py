@@ -0,0 +1,410 @@
+"""
+Asyncio HTTP server for the report viewer.
+
+Serves `reports/web` with ETag/If-None-Match revalidation and gzip, a small
+JSON API over the report manifest, and a Server-Sent Events stream that
+announces every report `ReportWebStore.save_report` appends. New reports
+are detected by tailing `manifest.jsonl`, so the scheduler and the server
+can run as separate processes.
+
+Routes:
+- GET /api/symbols                 symbols with their latest report row
+- GET /api/reports[?symbol=...]    today's rows, newest first
+- GET /api/latest?symbol=...       latest row for one symbol
+- GET /api/events                  SSE stream, one `report` event per new row
+- GET /metrics                     server metrics plus the scheduler's metrics file
+- GET /<path>                      static files under the web root
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import time
+
+from monitoring import metrics
+from monitoring.metrics import MetricsRegistry
+from reporting.report_web_store import ReportWebStore
+
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+MIN_GZIP_BYTES = 1024
+READ_TIMEOUT_SECONDS = 15.0
+SSE_HEARTBEAT_SECONDS = 15.0
+
+API_ROUTES = ("/api/symbols", "/api/reports", "/api/latest", "/api/events", "/metrics")
+
+STATUS_TEXT = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+class ReportServer:
+    # Compressed bodies keyed by (path, etag); pages are immutable once written.
+    GZIP_CACHE_SIZE = 256
+
+    def __init__(self, root: Path | None = None, poll_interval: float = 1.0) -> None:
+        self.root = Path(root or ReportWebStore._base_dir()).resolve()  # noqa: SLF001
+        self.poll_interval = poll_interval
+        self._subscribers: set[asyncio.Queue] = set()
+        self._gzip_cache: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._manifest_offset = 0
+        self._manifest_inode: int | None = None
+        self._event_id = 0
+        self._server: asyncio.Server | None = None
+        self._tail_task: asyncio.Task | None = None
+        # Server-only metrics; pipeline metrics come from the scheduler's textfile.
+        self.metrics = MetricsRegistry()
+        self._requests = self.metrics.counter("oc_http_requests_total", "Report server requests.", ("route", "status"))
+        self._published = self.metrics.counter("oc_report_events_published_total", "Report rows announced over SSE.")
+        self._sse_clients = self.metrics.gauge("oc_sse_subscribers", "Connected SSE clients.")
+        self._scheduler_age = self.metrics.gauge(
+            "oc_scheduler_metrics_age_seconds", "Age of the scheduler metrics file (-1 if missing)."
+        )
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        self.root.mkdir(parents=True, exist_ok=True)
+        ReportWebStore.ingest_manifest_rows([], reload=True)
+        self._sync_manifest_position()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._tail_task = asyncio.create_task(self._tail_manifest())
+        return self._server
+
+    async def stop(self) -> None:
+        if self._tail_task:
+            self._tail_task.cancel()
+            try:
+                await self._tail_task
+            except asyncio.CancelledError:
+                pass
+        for queue in list(self._subscribers):
+            queue.put_nowait(None)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1] if self._server else 0
+
+    # ------------------------------------------------------------------
+    # Manifest tail -> SSE
+    # ------------------------------------------------------------------
+    def _manifest_path(self) -> Path:
+        return self.root / ReportWebStore.MANIFEST_NAME
+
+    def _sync_manifest_position(self) -> None:
+        try:
+            stat = os.stat(self._manifest_path())
+            self._manifest_offset, self._manifest_inode = stat.st_size, stat.st_ino
+        except FileNotFoundError:
+            self._manifest_offset, self._manifest_inode = 0, None
+
+    def _read_new_rows(self) -> list[dict]:
+        """
+        Rows appended since the last call. A replaced or truncated manifest
+        (maintenance compaction) reloads the catalog without announcing rows.
+        """
+        try:
+            stat = os.stat(self._manifest_path())
+        except FileNotFoundError:
+            return []
+        if stat.st_ino != self._manifest_inode or stat.st_size < self._manifest_offset:
+            ReportWebStore.ingest_manifest_rows([], reload=True)
+            self._manifest_offset, self._manifest_inode = stat.st_size, stat.st_ino
+            return []
+        if stat.st_size == self._manifest_offset:
+            return []
+
+        with open(self._manifest_path(), "rb") as handle:
+            handle.seek(self._manifest_offset)
+            chunk = handle.read(stat.st_size - self._manifest_offset)
+        # Only consume complete lines; a partial write is picked up next poll.
+        complete = chunk[: chunk.rfind(b"\n") + 1]
+        self._manifest_offset += len(complete)
+
+        rows = []
+        for line in complete.decode("utf-8", errors="ignore").splitlines():
+            try:
+                rows.append(json.loads(line))
+            except Exception:
+                continue
+        if rows:
+            ReportWebStore.ingest_manifest_rows(rows)
+        return rows
+
+    async def _tail_manifest(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                rows = self._read_new_rows()
+            except Exception as exc:
+                print(f"ReportServer manifest tail error: {exc}")
+                continue
+            for row in rows:
+                self._publish(row)
+
+    def _publish(self, row: dict) -> None:
+        self._published.inc()
+        self._event_id += 1
+        message = f"id: {self._event_id}\nevent: report\ndata: {json.dumps(row)}\n\n".encode("utf-8")
+        for queue in list(self._subscribers):
+            queue.put_nowait(message)
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), READ_TIMEOUT_SECONDS)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError):
+                    return
+                request = self._parse_request(head)
+                if request is None:
+                    await self._send(writer, 400, b"bad request", "text/plain", {}, keep_alive=False)
+                    return
+                method, target, headers = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                path = urlsplit(target).path
+                if method not in ("GET", "HEAD"):
+                    self._requests.inc(route=self._route(path), status="405")
+                    await self._send(writer, 405, b"method not allowed", "text/plain", {"Allow": "GET, HEAD"}, keep_alive)
+                elif path == "/api/events":
+                    self._requests.inc(route="/api/events", status="200")
+                    await self._stream_events(writer)
+                    return
+                else:
+                    status = await self._respond(writer, method, target, headers, keep_alive)
+                    self._requests.inc(route=self._route(path), status=str(status))
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.CancelledError):
+            return
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parse_request(head: bytes) -> tuple[str, str, dict] | None:
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _version = lines[0].split(" ", 2)
+        except ValueError:
+            return None
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    @staticmethod
+    def _route(path: str) -> str:
+        # Bounded label values: known endpoints by name, everything else grouped.
+        if path in API_ROUTES:
+            return path
+        return "/api/other" if path.startswith("/api/") else "static"
+
+    def metrics_text(self) -> str:
+        """
+        Server metrics followed by the scheduler's exposition file.
+        """
+        self._sse_clients.set(len(self._subscribers))
+        textfile = metrics.textfile_path()
+        try:
+            self._scheduler_age.set(round(time.time() - textfile.stat().st_mtime, 3))
+        except OSError:
+            self._scheduler_age.set(-1)
+        return self.metrics.render() + metrics.read_textfile(textfile)
+
+    async def _respond(self, writer, method: str, target: str, headers: dict, keep_alive: bool) -> int:
+        parts = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        if parts.path == "/metrics":
+            body = (await asyncio.to_thread(self.metrics_text)).encode("utf-8")
+            await self._send(
+                writer, 200, body, metrics.CONTENT_TYPE, {"Cache-Control": "no-store"}, keep_alive, head_only=method == "HEAD"
+            )
+            return 200
+        if parts.path.startswith("/api/"):
+            status, payload = self._api(parts.path, query)
+            body = json.dumps(payload).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            return await self._send_cached(writer, method, status, body, "application/json", etag, headers, keep_alive)
+
+        path = self._resolve_static(parts.path)
+        if path is None:
+            await self._send(writer, 404, b"not found", "text/plain", {}, keep_alive)
+            return 404
+        stat = path.stat()
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        variant = self._gzip_etag(etag) if self._wants_gzip(headers, content_type, stat.st_size) else etag
+        if self._not_modified(headers, variant):
+            await self._send(writer, 304, b"", None, {"ETag": variant, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}, keep_alive)
+            return 304
+        body = await asyncio.to_thread(path.read_bytes)
+        extra = {"Last-Modified": formatdate(stat.st_mtime, usegmt=True)}
+        return await self._send_cached(writer, method, 200, body, content_type, etag, headers, keep_alive, extra, str(path))
+
+    def _api(self, path: str, query: dict) -> tuple[int, dict]:
+        symbol = query.get("symbol")
+        if path == "/api/reports":
+            return 200, {"rows": ReportWebStore.catalog_rows(symbol=symbol)}
+        if path == "/api/symbols":
+            latest: dict[str, dict] = {}
+            for row in ReportWebStore.catalog_rows():
+                latest.setdefault(str(row.get("symbol", "UNKNOWN")), row)
+            return 200, {"symbols": [{"symbol": s, "latest": row} for s, row in latest.items()]}
+        if path == "/api/latest":
+            if not symbol:
+                return 400, {"error": "symbol query parameter is required"}
+            rows = ReportWebStore.catalog_rows(symbol=symbol)
+            if not rows:
+                return 404, {"error": f"no reports for {symbol}"}
+            return 200, {"row": rows[0]}
+        return 404, {"error": "unknown endpoint"}
+
+    def _resolve_static(self, url_path: str) -> Path | None:
+        relative = unquote(url_path).lstrip("/") or "index.html"
+        path = (self.root / relative).resolve()
+        if path.is_dir():
+            path = path / "index.html"
+        if not path.is_relative_to(self.root) or not path.is_file():
+            return None
+        return path
+
+    @staticmethod
+    def _not_modified(headers: dict, etag: str) -> bool:
+        candidates = [tag.strip() for tag in headers.get("if-none-match", "").split(",")]
+        return etag in candidates or "*" in candidates
+
+    async def _send_cached(
+        self,
+        writer,
+        method: str,
+        status: int,
+        body: bytes,
+        content_type: str,
+        etag: str,
+        headers: dict,
+        keep_alive: bool,
+        extra: dict | None = None,
+        cache_key: str | None = None,
+    ) -> int:
+        compress = self._wants_gzip(headers, content_type, len(body))
+        variant = self._gzip_etag(etag) if compress else etag
+        response_headers = {"ETag": variant, "Cache-Control": "no-cache", "Vary": "Accept-Encoding", **(extra or {})}
+        if status == 200 and self._not_modified(headers, variant):
+            await self._send(writer, 304, b"", None, response_headers, keep_alive)
+            return 304
+        if compress:
+            body = self._gzip(body, cache_key, etag)
+            response_headers["Content-Encoding"] = "gzip"
+        await self._send(writer, status, body, content_type, response_headers, keep_alive, head_only=method == "HEAD")
+        return status
+
+    @staticmethod
+    def _wants_gzip(headers: dict, content_type: str, size: int) -> bool:
+        return (
+            "gzip" in headers.get("accept-encoding", "")
+            and size >= MIN_GZIP_BYTES
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+
+    @staticmethod
+    def _gzip_etag(etag: str) -> str:
+        """
+        Strong ETag of the gzip variant; it must differ from the identity body's.
+        """
+        return etag[:-1] + '-gz"'
+
+    def _gzip(self, body: bytes, cache_key: str | None, etag: str) -> bytes:
+        if cache_key is None:
+            return gzip.compress(body, compresslevel=6)
+        key = (cache_key, etag)
+        cached = self._gzip_cache.get(key)
+        if cached is None:
+            cached = gzip.compress(body, compresslevel=6)
+            self._gzip_cache[key] = cached
+            if len(self._gzip_cache) > self.GZIP_CACHE_SIZE:
+                self._gzip_cache.popitem(last=False)
+        else:
+            self._gzip_cache.move_to_end(key)
+        return cached
+
+    @staticmethod
+    async def _send(
+        writer,
+        status: int,
+        body: bytes,
+        content_type: str | None,
+        headers: dict,
+        keep_alive: bool,
+        head_only: bool = False,
+    ) -> None:
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if body and not head_only and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+    async def _stream_events(self, writer) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"X-Accel-Buffering: no\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+            b"retry: 5000\n\n"
+        )
+        await writer.drain()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    message = b": ping\n\n"
+                if message is None:
+                    return
+                writer.write(message)
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, root: Path | None = None) -> None:
+    server = ReportServer(root=root)
+    await server.start(host, port)
+    print(f"Serving reports at http://{host}:{server.port}")
+    print(f"Root directory: {server.root}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
@@ -2,19 +2,42 @@
 
 from __future__ import annotations
 
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 import html
 import json
+import os
 import re
+import threading
+import time
 from zoneinfo import ZoneInfo
 
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only.
+    fcntl = None
+
 from database.db_connection import DatabaseConnection
 from config.settings import settings
+from monitoring import metrics
 from historical_test_runner import HistoricalTestRunner
 
 
 class ReportWebStore:
+    # Symbol workers save reports concurrently; manifest appends, compaction
+    # and index rendering touch shared files and must not interleave.
+    _index_lock = threading.Lock()
+    # The scheduler and serve_reports share the manifest, so appends and
+    # compaction also take an advisory lock on this sidecar file.
+    MANIFEST_LOCK_NAME = "manifest.jsonl.lock"
+
+    # Append-only JSON-lines catalog of report metadata, one row per page.
+    MANIFEST_NAME = "manifest.jsonl"
+    # Latest `WEB_HISTORY_LIMIT` manifest rows per symbol, loaded once per process.
+    _catalog: dict[str, deque] | None = None
+
     @staticmethod
     def _app_timezone() -> ZoneInfo:
         try:
@@ -106,13 +129,12 @@ class ReportWebStore:
 
     @classmethod
     def save_report(cls, symbol: str, subject: str, report_html: str) -> Path:
+        started = time.perf_counter()
         base = cls._base_dir()
         symbol_dir = base / "symbols"
         history_root = base / "history"
-        meta_dir = base / "meta"
         symbol_dir.mkdir(parents=True, exist_ok=True)
         history_root.mkdir(parents=True, exist_ok=True)
-        meta_dir.mkdir(parents=True, exist_ok=True)
 
         slug = cls._slugify_symbol(symbol)
         now_dt = datetime.now(tz=cls._app_timezone())
@@ -137,23 +159,143 @@ class ReportWebStore:
             "source": "test" if settings.TEST_MODE else "live",
             "mode": cls._runtime_mode_label(),
         }
-        (meta_dir / f"{slug}__{ts_key}.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
-        cls._prune_history_to_today(base=base)
-        cls._write_index()
+        with cls._index_lock:
+            cls._ensure_catalog(base)
+            cls._append_manifest(base, [meta])
+            cls._catalog_add(meta)
+            cls._write_index()
+        metrics.REPORT_WRITE_SECONDS.observe(time.perf_counter() - started)
         return report_path
 
     @classmethod
     def refresh_index(cls) -> None:
-        cls._write_index()
+        with cls._index_lock:
+            cls._ensure_catalog(cls._base_dir())
+            cls._write_index()
+
+    @classmethod
+    def maintain(cls) -> None:
+        """
+        Off-hot-path upkeep: backfill today's DB snapshots, prune old history
+        pages, compact the manifest and re-render the index. Run at startup
+        and periodically; save_report never does this work.
+        """
+        base = cls._base_dir()
+        with cls._index_lock:
+            cls._ensure_catalog(base)
+            known_paths = {row.get("path") for rows in cls._catalog.values() for row in rows}
+        backfilled = cls._backfill_from_database(max_rows=cls._history_limit(), known_paths=known_paths)
+
+        with cls._index_lock:
+            cls._prune_history_to_today(base=base)
+            # Held from read to replace so another process's append is not lost.
+            with cls._manifest_lock(base):
+                rows = cls._read_manifest(base) + backfilled
+                today_key = cls._today_key()
+                rows = [row for row in rows if cls._row_day_key(row) == today_key]
+                cls._catalog = {}
+                for row in sorted(rows, key=cls._row_sort_key):
+                    cls._catalog_add(row)
+                cls._rewrite_manifest(base, [row for symbol_rows in cls._catalog.values() for row in symbol_rows])
+            cls._write_index()
+
+    @staticmethod
+    def _history_limit() -> int:
+        return max(1, int(getattr(settings, "WEB_HISTORY_LIMIT", 20)))
+
+    @staticmethod
+    def _row_sort_key(row: dict) -> str:
+        return str(row.get("generated_at_iso", row.get("generated_at", "")))
+
+    @staticmethod
+    def _row_day_key(row: dict) -> str:
+        # history/<slug>/<YYYYmmdd_HHMMSS>.html
+        return Path(str(row.get("path", ""))).stem.split("_", 1)[0]
+
+    @classmethod
+    def _read_manifest(cls, base: Path) -> list[dict]:
+        rows: list[dict] = []
+        manifest = base / cls.MANIFEST_NAME
+        if manifest.exists():
+            for line in manifest.read_text(encoding="utf-8").splitlines():
+                try:
+                    rows.append(json.loads(line))
+                except Exception:
+                    continue
+        else:
+            # First run after upgrading from per-report meta JSON files.
+            for meta_file in sorted((base / "meta").glob("*.json")):
+                try:
+                    rows.append(json.loads(meta_file.read_text(encoding="utf-8")))
+                except Exception:
+                    continue
+        return rows
+
+    @classmethod
+    @contextmanager
+    def _manifest_lock(cls, base: Path):
+        """
+        Exclusive cross-process lock for manifest appends and rewrites.
+        """
+        base.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(base / cls.MANIFEST_LOCK_NAME, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    @classmethod
+    def _append_manifest(cls, base: Path, rows: list[dict]) -> None:
+        with cls._manifest_lock(base):
+            with open(base / cls.MANIFEST_NAME, "a", encoding="utf-8") as handle:
+                for row in rows:
+                    handle.write(json.dumps(row) + "\n")
+
+    @classmethod
+    def _rewrite_manifest(cls, base: Path, rows: list[dict]) -> None:
+        """
+        Replace the manifest; the caller holds `_manifest_lock`.
+        """
+        base.mkdir(parents=True, exist_ok=True)
+        tmp_path = base / f".{cls.MANIFEST_NAME}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            for row in sorted(rows, key=cls._row_sort_key):
+                handle.write(json.dumps(row) + "\n")
+        os.replace(tmp_path, base / cls.MANIFEST_NAME)
+
+    @classmethod
+    def _ensure_catalog(cls, base: Path) -> None:
+        if cls._catalog is not None:
+            return
+        cls._catalog = {}
+        for row in sorted(cls._read_manifest(base), key=cls._row_sort_key):
+            cls._catalog_add(row)
 
     @classmethod
-    def _backfill_from_database(cls, max_rows: int = 400) -> None:
+    def _catalog_add(cls, row: dict) -> None:
+        symbol = str(row.get("symbol", "UNKNOWN"))
+        rows = cls._catalog.setdefault(symbol, deque(maxlen=cls._history_limit()))
+        # Re-saves of the same page replace the older row.
+        for existing in [r for r in rows if r.get("path") == row.get("path")]:
+            rows.remove(existing)
+        rows.append(row)
+
+    @classmethod
+    def _backfill_from_database(cls, max_rows: int = 400, known_paths: set | None = None) -> list[dict]:
+        """
+        Build history pages for today's DB summaries not yet in the manifest
+        and return their manifest rows.
+        """
         base = cls._base_dir()
-        meta_dir = base / "meta"
         history_root = base / "history"
-        meta_dir.mkdir(parents=True, exist_ok=True)
         history_root.mkdir(parents=True, exist_ok=True)
         today_key = cls._today_key()
+        known_paths = known_paths or set()
+        backfilled: list[dict] = []
 
         query = """
             WITH ranked AS (
@@ -187,7 +329,7 @@ class ReportWebStore:
             rows = cursor.fetchall()
         except Exception as exc:
             print(f"ReportWebStore DB backfill skipped: {exc}")
-            return
+            return backfilled
         finally:
             if cursor:
                 cursor.close()
@@ -204,6 +346,8 @@ class ReportWebStore:
             ts_key = snapshot_local.strftime("%Y%m%d_%H%M%S")
             if snapshot_local.strftime("%Y%m%d") != today_key:
                 continue
+            if f"history/{slug}/{ts_key}.html" in known_paths:
+                continue
             ts_iso, ts_display = cls._format_timestamp(snapshot_local)
             history_dir = history_root / slug
             history_dir.mkdir(parents=True, exist_ok=True)
@@ -255,37 +399,44 @@ class ReportWebStore:
                 "source": "db",
                 "mode": cls._runtime_mode_label(),
             }
-            (meta_dir / f"{slug}__{ts_key}.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+            backfilled.append(meta)
+        return backfilled
 
     @classmethod
-    def _write_index(cls) -> None:
-        base = cls._base_dir()
-        meta_dir = base / "meta"
-        limit = max(1, int(getattr(settings, "WEB_HISTORY_LIMIT", 20)))
-        cls._backfill_from_database(max_rows=limit)
-        cls._prune_history_to_today(base=base)
-
-        rows: list[dict] = []
-        if meta_dir.exists():
-            for p in sorted(meta_dir.glob("*.json")):
-                try:
-                    rows.append(json.loads(p.read_text(encoding="utf-8")))
-                except Exception:
-                    continue
+    def catalog_rows(cls, symbol: str | None = None) -> list[dict]:
+        """
+        Today's catalog rows, newest first, optionally for one symbol.
+        """
+        with cls._index_lock:
+            cls._ensure_catalog(cls._base_dir())
+            rows = cls._labeled_rows()
+        if symbol is not None:
+            rows = [row for row in rows if row.get("symbol") == symbol]
+        return rows
 
-        rows.sort(key=lambda x: x.get("generated_at_iso", x.get("generated_at", "")), reverse=True)
+    @classmethod
+    def ingest_manifest_rows(cls, rows: list[dict], reload: bool = False) -> None:
+        """
+        Merge rows appended to the manifest by another process (e.g. the
+        scheduler) into this process's catalog; `reload` re-reads it whole.
+        """
+        with cls._index_lock:
+            if reload:
+                cls._catalog = None
+            cls._ensure_catalog(cls._base_dir())
+            for row in rows:
+                cls._catalog_add(row)
 
-        # Keep latest `limit` rows per symbol in payload.
-        counts: dict[str, int] = {}
-        filtered_rows: list[dict] = []
-        for row in rows:
-            symbol = str(row.get("symbol", "UNKNOWN"))
-            c = counts.get(symbol, 0)
-            if c >= limit:
-                continue
-            counts[symbol] = c + 1
-            filtered_rows.append(row)
-        rows = filtered_rows
+    @classmethod
+    def _labeled_rows(cls) -> list[dict]:
+        today_key = cls._today_key()
+        rows = [
+            dict(row)
+            for symbol_rows in (cls._catalog or {}).values()
+            for row in symbol_rows
+            if cls._row_day_key(row) == today_key
+        ]
+        rows.sort(key=cls._row_sort_key, reverse=True)
 
         # Ensure selector semantics: only latest row per symbol is shown as live,
         # all older rows are labeled db.
@@ -300,7 +451,16 @@ class ReportWebStore:
             else:
                 row["source"] = "db"
                 row["mode"] = cls._runtime_mode_label()
+        return rows
 
+    @classmethod
+    def _write_index(cls) -> None:
+        """
+        Render index.html from the in-memory catalog (latest rows per symbol);
+        rows from earlier days are hidden until `maintain` compacts them away.
+        """
+        base = cls._base_dir()
+        rows = cls._labeled_rows()
         rows_json = json.dumps(rows)
         default_path = rows[0]["path"] if rows else ""
         mode_label = cls._runtime_mode_label()
@@ -393,7 +553,9 @@ class ReportWebStore:
     </div>
   </div>
   <script>
-    const rows = {rows_json};
+    // Embedded rows keep the page usable as static files; report_server.py
+    // refreshes them from the JSON API and pushes new reports over SSE.
+    let rows = {rows_json};
     const symbolEl = document.getElementById("symbolSelect");
     const timeEl = document.getElementById("timeSelect");
     const frame = document.getElementById("reportFrame");
@@ -419,21 +581,24 @@ class ReportWebStore:
 
     function fillSymbols() {{
       if (!symbolEl) return;
+      const current = symbolEl.value;
       const symbols = uniqueSymbols();
+      const selected = symbols.includes(current) ? current : symbols[0];
       symbolEl.innerHTML = symbols.length
-        ? symbols.map((s, i) => `<option value="${{s}}"${{i===0 ? " selected" : ""}}>${{s}}</option>`).join("")
+        ? symbols.map(s => `<option value="${{s}}"${{s===selected ? " selected" : ""}}>${{s}}</option>`).join("")
         : "<option value=''>No symbols</option>";
     }}
 
-    function fillTimes() {{
+    function fillTimes(keepPath) {{
       if (!symbolEl || !timeEl) return;
       const symbol = symbolEl.value;
       const filtered = rows.filter(r => (r.symbol || "UNKNOWN") === symbol);
       filtered.sort((a, b) => ((a.generated_at_iso || a.generated_at || "") < (b.generated_at_iso || b.generated_at || "") ? 1 : -1));
+      const selected = filtered.some(r => r.path === keepPath) ? keepPath : (filtered.length ? filtered[0].path : "");
       timeEl.innerHTML = filtered.length
-        ? filtered.map((r, i) => `<option value="${{r.path}}"${{i===0 ? " selected" : ""}}>${{r.generated_at_display || r.generated_at}} (${{r.mode || "LIVE"}}/${{r.source || "n/a"}})</option>`).join("")
+        ? filtered.map(r => `<option value="${{r.path}}"${{r.path===selected ? " selected" : ""}}>${{r.generated_at_display || r.generated_at}} (${{r.mode || "LIVE"}}/${{r.source || "n/a"}})</option>`).join("")
         : "<option value=''>No time points</option>";
-      if (frame) {{
+      if (frame && frame.getAttribute("src") !== (timeEl.value || "about:blank")) {{
         frame.src = timeEl.value || "about:blank";
       }}
     }}
@@ -445,6 +610,7 @@ class ReportWebStore:
       fillTimes();
       const AUTO_REFRESH_MS = 120000;
       let lastManualInteractionAt = Date.now();
+      let pushConnected = false;
 
       const markManualInteraction = () => {{
         lastManualInteractionAt = Date.now();
@@ -459,15 +625,45 @@ class ReportWebStore:
         frame.src = timeEl.value || "about:blank";
       }});
 
+      async function reloadRows(newRow) {{
+        const viewingLatest = timeEl.selectedIndex <= 0;
+        const res = await fetch("api/reports", {{ cache: "no-cache" }});
+        if (!res.ok) return;
+        rows = (await res.json()).rows || [];
+        fillSymbols();
+        const follow = newRow && viewingLatest && newRow.symbol === symbolEl.value;
+        fillTimes(follow ? newRow.path : timeEl.value);
+      }}
+
+      if (window.EventSource && location.protocol.startsWith("http")) {{
+        const events = new EventSource("api/events");
+        events.addEventListener("open", () => {{ pushConnected = true; }});
+        events.addEventListener("report", e => {{
+          reloadRows(JSON.parse(e.data)).catch(() => {{}});
+        }});
+        events.addEventListener("error", () => {{
+          pushConnected = events.readyState === EventSource.OPEN;
+        }});
+      }}
+
+      // Polling fallback for static hosting or when the event stream is down;
+      // the server answers unchanged pages with 304.
       setInterval(() => {{
-        if (Date.now() - lastManualInteractionAt < AUTO_REFRESH_MS) {{
+        if (pushConnected || Date.now() - lastManualInteractionAt < AUTO_REFRESH_MS) {{
           return;
         }}
         if (timeEl.value && !timeEl.value.endsWith("about:blank")) {{
-          const q = "t=" + Date.now();
-          frame.src = timeEl.value + (timeEl.value.includes("?") ? "&" : "?") + q;
+          try {{
+            frame.contentWindow.location.reload();
+          }} catch (err) {{
+            const q = "t=" + Date.now();
+            frame.src = timeEl.value + (timeEl.value.includes("?") ? "&" : "?") + q;
+          }}
         }}
       }}, AUTO_REFRESH_MS);
+    }} else if (window.EventSource && location.protocol.startsWith("http")) {{
+      // Empty viewer: reload once the first report lands.
+      new EventSource("api/events").addEventListener("report", () => location.reload());
     }}
   </script>
 </body>
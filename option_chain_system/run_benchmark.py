@@ -0,0 +1,58 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from benchmarking.engine_benchmark import DEFAULT_STRIKES, EngineBenchmark
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analytics engines on synthetic chains (no FYERS, no DB).")
+    parser.add_argument("--strikes", default=",".join(str(n) for n in DEFAULT_STRIKES), help="Comma-separated chain sizes")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per engine (pipeline runs a fifth as many)")
+    parser.add_argument("--steps", type=int, default=12, help="Snapshots in the synthetic session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", default="", help="Comma-separated subset (default all)")
+    parser.add_argument("--history", default=None, help="JSONL history (default logs/benchmark_history.jsonl)")
+    parser.add_argument("--no-save", action="store_true", help="Do not append this run to the history")
+    parser.add_argument("--baseline", default=None, help="JSON record to compare against (default last history run)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="p50 slowdown counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when any engine regressed")
+    parser.add_argument("--json", action="store_true", help="Print the run record as JSON")
+    args = parser.parse_args()
+
+    history = Path(args.history) if args.history else EngineBenchmark.history_path()
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    else:
+        previous = EngineBenchmark.load_history(history)
+        baseline = previous[-1] if previous else None
+
+    record = EngineBenchmark.run(
+        sizes=[int(n) for n in args.strikes.split(",") if n.strip()],
+        repeats=args.repeats,
+        steps=args.steps,
+        seed=args.seed,
+        engines=[e.strip() for e in args.engines.split(",") if e.strip()] or None,
+    )
+    if not args.no_save:
+        EngineBenchmark.append_history(record, history)
+
+    comparison = EngineBenchmark.compare(record, baseline, args.tolerance) if baseline else []
+    if args.json:
+        print(json.dumps({"record": record, "comparison": comparison}, indent=2))
+    else:
+        print("\nEngine Benchmark (synthetic chains)")
+        print("-----------------------------------")
+        print(EngineBenchmark.format_results(record))
+        if comparison:
+            print(f"\nAgainst run of {baseline.get('ts')} (tolerance {args.tolerance:.0%}):")
+            print(EngineBenchmark.format_comparison(comparison))
+        if not args.no_save:
+            print(f"\nSaved to {history}")
+
+    if args.fail_on_regression and any(r["regression"] for r in comparison):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
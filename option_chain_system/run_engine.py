@@ -6,27 +6,24 @@ Flow:
 2) Data quality and optional enhanced models
 3) Optional signal persistence/outcome labeling
 4) Report generation and web persistence
+
+Fetcher and engine instances come from a long-lived PipelineContext; spot
+and chain come from its cycle prefetch when the scheduler ran one.
 """
 
-from data_layer.data_fetcher import OptionChainFetcher
-from analytics.basic_analysis import BasicOptionAnalysis
-from analytics.advanced_analysis import AdvancedOptionAnalysis
-from analytics.interpretation_engine import InterpretationEngine
-from analytics.breakout_engine import BreakoutEngine
-from analytics.probability_engine import ProbabilityEngine
+from __future__ import annotations
+
+import pandas as pd
 from analytics.probability_calibration_engine import ProbabilityCalibrationEngine
-from analytics.volume_engine import VolumeEngine
-from analytics.scalp_engine import OTMScalpEngine
-from analytics.intraday_engine import IntradayEngine
 from analytics.intraday_oi_engine import IntradayOIDeltaEngine
-from analytics.institutional_confidence_engine import InstitutionalConfidenceEngine
-from analytics.market_bias_engine import MarketBiasEngine
-from analytics.option_geeks_engine import OptionGeeksEngine
+from analytics.snapshot_cache import SnapshotCache
+from analytics.baseline_oi_cache import BaselineOICache
 from analytics.data_quality_engine import DataQualityEngine
 from analytics.market_regime_engine import MarketRegimeEngine
 from analytics.otm_timing_engine_v2 import OTMTimingEngineV2
 from analytics.dynamic_otm_selector import DynamicOTMSelector
-from reporting.report_builder import ReportBuilder
+from analytics.implied_volatility_engine import ImpliedVolatilityEngine
+from analytics.option_geeks_engine import OptionGeeksEngine
 from reporting.report_web_store import ReportWebStore
 from database.snapshot_repository import SnapshotRepository
 from database.summary_repository import SummaryRepository
@@ -34,21 +31,11 @@ from database.scalp_repository import ScalpRepository
 from database.market_context_repository import MarketContextRepository
 from database.trade_signal_repository import TradeSignalRepository
 from database.trade_outcome_repository import TradeOutcomeRepository
+from database.write_buffer import CycleWriteBuffer
 from config.settings import settings
-
-
-def _pick_side(market_bias_data: dict, geeks_data: dict) -> str:
-    score = int(market_bias_data.get("market_score", 0))
-    geeks_side = geeks_data.get("preferred_otm_side", "NO TRADE / WAIT")
-    if score >= 20 and "CE" in geeks_side:
-        return "CE"
-    if score <= -20 and "PE" in geeks_side:
-        return "PE"
-    if score >= 25:
-        return "CE"
-    if score <= -25:
-        return "PE"
-    return ""
+from monitoring import metrics
+from monitoring.stage_timer import StageTimer
+from pipeline_context import PipelineContext, default_context
 
 
 def _fallback_tracking_pick(df, spot: float, side: str, distance_percent: float = 2.0) -> dict:
@@ -75,106 +62,137 @@ def _fallback_tracking_pick(df, spot: float, side: str, distance_percent: float
     }
 
 
-def run_option_chain(symbol: str) -> None:
-    fetcher = OptionChainFetcher()
-    basic = BasicOptionAnalysis()
-    advanced = AdvancedOptionAnalysis()
-    interpreter = InterpretationEngine()
-    breakout_engine = BreakoutEngine()
-    prob_engine = ProbabilityEngine()
-    volume_engine = VolumeEngine()
-    scalp_engine = OTMScalpEngine()
-    intraday_engine = IntradayEngine()
-    report_builder = ReportBuilder()
-    confidence_engine = InstitutionalConfidenceEngine()
-    market_bias_engine = MarketBiasEngine()
-    geeks_engine = OptionGeeksEngine()
+def _with_pending_summary(history: pd.DataFrame, summary_row: dict, limit: int) -> pd.DataFrame:
+    # The current summary is still in the write buffer, so append it in memory.
+    columns = ["snapshot_time", "spot_price", "pcr", "resistance", "support", "max_pain"]
+    current = pd.DataFrame([{c: summary_row[c] for c in columns}])
+    if history.empty:
+        return current
+    merged = pd.concat([history[columns], current], ignore_index=True)
+    merged = merged.drop_duplicates(subset=["snapshot_time"], keep="last")
+    return merged.sort_values("snapshot_time").tail(limit).reset_index(drop=True)
+
+
+def run_option_chain(symbol: str, context: PipelineContext | None = None) -> None:
+    with StageTimer.cycle(symbol):
+        _run_option_chain(symbol, context or default_context())
+
+
+def _run_option_chain(symbol: str, context: PipelineContext) -> None:
+    fetcher = context.fetcher
+    basic = context.basic
+    advanced = context.advanced
+    interpreter = context.interpreter
+    breakout_engine = context.breakout_engine
+    prob_engine = context.prob_engine
+    volume_engine = context.volume_engine
+    scalp_engine = context.scalp_engine
+    intraday_engine = context.intraday_engine
+    report_builder = context.report_builder
+    confidence_engine = context.confidence_engine
+    market_bias_engine = context.market_bias_engine
+    geeks_engine = context.geeks_engine
 
     print(f"\nProcessing {symbol}\n")
-    spot = fetcher.fetch_spot_price(symbol)
-    df = fetcher.fetch_option_chain(symbol)
+    prefetched = context.take_prefetched(symbol)
+    if prefetched is not None:
+        spot, df = prefetched.unwrap()
+    else:
+        with StageTimer.stage("fetch_spot"):
+            spot = fetcher.fetch_spot_price(symbol)
+        with StageTimer.stage("fetch_chain"):
+            df = fetcher.fetch_option_chain(symbol)
 
     if df.empty:
         print(f"Skipping {symbol} due to no expiry data.\n")
         return
 
     snapshot_time = df["snapshot_time"].iloc[0]
-    if settings.ENABLE_GUARDRAILS:
-        quality = DataQualityEngine.assess(symbol=symbol, df=df, spot=spot, snapshot_time=snapshot_time)
-    else:
-        quality = type(
-            "Quality",
-            (),
-            {
-                "is_usable": True,
-                "stale_data": False,
-                "missing_strikes": False,
-                "anomaly_flags": [],
-                "warnings": [],
-            },
-        )()
+    metrics.SNAPSHOT_ROWS.set(len(df), symbol=symbol)
+    metrics.SNAPSHOT_ROWS_TOTAL.inc(len(df), symbol=symbol)
+    SnapshotCache.put(symbol, snapshot_time, df)
+    with StageTimer.stage("quality"):
+        if settings.ENABLE_GUARDRAILS:
+            quality = DataQualityEngine.assess(symbol=symbol, df=df, spot=spot, snapshot_time=snapshot_time)
+        else:
+            quality = type(
+                "Quality",
+                (),
+                {
+                    "is_usable": True,
+                    "stale_data": False,
+                    "missing_strikes": False,
+                    "anomaly_flags": [],
+                    "warnings": [],
+                },
+            )()
 
     print(
         f"Data Quality | usable={quality.is_usable}, stale={quality.stale_data}, "
         f"missing_strikes={quality.missing_strikes}, anomalies={len(quality.anomaly_flags)}"
     )
 
-    atm = basic.detect_atm_strike(df, spot)
-    ce_df, pe_df = basic.split_ce_pe(df)
-    total_ce, total_pe = basic.calculate_total_oi(ce_df, pe_df)
-    pcr = basic.calculate_pcr(total_pe, total_ce)
-    baseline_df = MarketContextRepository.fetch_open_oi_by_strike(symbol=symbol, upto_time=snapshot_time)
-    baseline_ce_oi_by_strike = {}
-    baseline_pe_oi_by_strike = {}
-    if not baseline_df.empty:
-        base_ce_df = baseline_df[baseline_df["option_type"] == "CE"]
-        base_pe_df = baseline_df[baseline_df["option_type"] == "PE"]
-        baseline_ce_oi_by_strike = {
-            float(k): float(v)
-            for k, v in base_ce_df.groupby("strike_price", as_index=True)["open_interest"].sum().to_dict().items()
-        }
-        baseline_pe_oi_by_strike = {
-            float(k): float(v)
-            for k, v in base_pe_df.groupby("strike_price", as_index=True)["open_interest"].sum().to_dict().items()
-        }
-    resistance, support, sr_window_data = advanced.oi_based_levels_atm_window(
-        ce_df,
-        pe_df,
-        atm,
-        baseline_ce_oi_by_strike=baseline_ce_oi_by_strike,
-        baseline_pe_oi_by_strike=baseline_pe_oi_by_strike,
-    )
-    max_pain = advanced.calculate_max_pain(df)
+    if settings.ENABLE_IV_SMILE:
+        # Solved decimal vols fill rows the vendor `iv` column lacks; vendor values win.
+        with StageTimer.stage("iv_smile"):
+            df[OptionGeeksEngine.SOLVED_IV_COLUMN] = ImpliedVolatilityEngine.smile_for_chain(
+                df, spot, snapshot_time=snapshot_time, symbol=symbol
+            )
+            print(f"IV Smile | solved={int(df[OptionGeeksEngine.SOLVED_IV_COLUMN].notna().sum())}/{len(df)} rows")
+
+    with StageTimer.stage("levels"):
+        atm = basic.detect_atm_strike(df, spot)
+        ce_df, pe_df = basic.split_ce_pe(df)
+        total_ce, total_pe = basic.calculate_total_oi(ce_df, pe_df)
+        pcr = basic.calculate_pcr(total_pe, total_ce)
+        baseline_ce_oi_by_strike, baseline_pe_oi_by_strike = BaselineOICache.get(symbol, snapshot_time)
+        resistance, support, sr_window_data = advanced.oi_based_levels_atm_window(
+            ce_df,
+            pe_df,
+            atm,
+            baseline_ce_oi_by_strike=baseline_ce_oi_by_strike,
+            baseline_pe_oi_by_strike=baseline_pe_oi_by_strike,
+        )
+    with StageTimer.stage("max_pain"):
+        max_pain = advanced.calculate_max_pain(df)
     structure = interpreter.detect_writing(ce_df, pe_df)
     trap = interpreter.detect_trap(spot, resistance, support)
     volume_data = volume_engine.detect_volume_spike(df, atm)
     breakout_signal = breakout_engine.detect_breakout(spot, resistance, support)
     covering_signal = breakout_engine.detect_short_covering(ce_df, pe_df)
 
+    # All inserts for this cycle are queued and committed together before the report is built.
+    writes = CycleWriteBuffer()
+    summary_row = {
+        "symbol": symbol,
+        "snapshot_time": snapshot_time,
+        "spot_price": spot,
+        "atm_strike": atm,
+        "total_ce_oi": total_ce,
+        "total_pe_oi": total_pe,
+        "pcr": pcr,
+        "resistance": resistance,
+        "support": support,
+        "max_pain": max_pain,
+        "structure": structure,
+        "trap_signal": trap,
+    }
     if not settings.TEST_MODE:
-        SnapshotRepository.bulk_insert_snapshot(df)
-        SummaryRepository.insert_summary(
-            symbol=symbol,
-            snapshot_time=snapshot_time,
-            spot_price=spot,
-            atm_strike=atm,
-            total_ce_oi=total_ce,
-            total_pe_oi=total_pe,
-            pcr=pcr,
-            resistance=resistance,
-            support=support,
-            max_pain=max_pain,
-            structure=structure,
-            trap_signal=trap,
+        writes.add(
+            "Snapshot",
+            lambda cursor: SnapshotRepository.write_snapshot(cursor, df, spot_price=spot),
+            healer=SnapshotRepository,
         )
+        writes.add("Summary", lambda cursor: SummaryRepository.write_summary(cursor, **summary_row))
     else:
         print("TEST MODE: Skipping snapshot/summary inserts.")
 
-    oi_delta_data = IntradayOIDeltaEngine.calculate_oi_delta(
-        symbol=symbol,
-        snapshot_time=snapshot_time,
-        spot=spot,
-    )
+    with StageTimer.stage("oi_delta"):
+        oi_delta_data = IntradayOIDeltaEngine.calculate_oi_delta(
+            symbol=symbol,
+            snapshot_time=snapshot_time,
+            spot=spot,
+        )
 
     regime_data = {
         "label": "UNKNOWN",
@@ -184,8 +202,11 @@ def run_option_chain(symbol: str) -> None:
         "why_not_now": [],
     }
     if settings.ENABLE_REGIME_V2:
-        summary_history = MarketContextRepository.fetch_recent_summaries(symbol, snapshot_time, limit=5)
-        regime_data = MarketRegimeEngine.detect(summary_history, df, oi_delta_data)
+        with StageTimer.stage("regime"):
+            summary_history = MarketContextRepository.fetch_recent_summaries(symbol, snapshot_time, limit=5)
+            if not settings.TEST_MODE:
+                summary_history = _with_pending_summary(summary_history, summary_row, limit=5)
+            regime_data = MarketRegimeEngine.detect(summary_history, df, oi_delta_data)
     print(
         "Regime V2 | "
         f"enabled={settings.ENABLE_REGIME_V2}, "
@@ -218,14 +239,15 @@ def run_option_chain(symbol: str) -> None:
         scalp_data=scalp_data,
     )
 
-    geeks_data = geeks_engine.analyze(
-        df=df,
-        spot=spot,
-        atm=atm,
-        breakout_signal=breakout_signal,
-        snapshot_time=snapshot_time,
-        profile="aggressive",
-    )
+    with StageTimer.stage("greeks"):
+        geeks_data = geeks_engine.analyze(
+            df=df,
+            spot=spot,
+            atm=atm,
+            breakout_signal=breakout_signal,
+            snapshot_time=snapshot_time,
+            profile="aggressive",
+        )
 
     timing_data = {
         "timing_score_v2": int(geeks_data.get("otm_timing_score", 0)),
@@ -240,16 +262,17 @@ def run_option_chain(symbol: str) -> None:
         "invalidation_pct": 0.25,
     }
     if settings.ENABLE_TIMING_V2:
-        timing_data = OTMTimingEngineV2.score(
-            geeks_data=geeks_data,
-            regime_data=regime_data,
-            quality_data={
-                "stale_data": quality.stale_data,
-                "missing_strikes": quality.missing_strikes,
-                "anomaly_flags": quality.anomaly_flags,
-            },
-            market_bias_data=market_bias_data,
-        )
+        with StageTimer.stage("timing"):
+            timing_data = OTMTimingEngineV2.score(
+                geeks_data=geeks_data,
+                regime_data=regime_data,
+                quality_data={
+                    "stale_data": quality.stale_data,
+                    "missing_strikes": quality.missing_strikes,
+                    "anomaly_flags": quality.anomaly_flags,
+                },
+                market_bias_data=market_bias_data,
+            )
     print(
         "Timing V2 | "
         f"enabled={settings.ENABLE_TIMING_V2}, "
@@ -266,12 +289,13 @@ def run_option_chain(symbol: str) -> None:
         "sample_size": 0,
     }
     if settings.ENABLE_CALIBRATION:
-        calibration_samples = TradeOutcomeRepository.fetch_calibration_samples(symbol, lookback_days=45)
-        cal = ProbabilityCalibrationEngine.calibrate(
-            raw_probability=timing_data["calibration_input_probability"],
-            samples=calibration_samples,
-            min_samples=settings.CALIBRATION_MIN_SAMPLES,
-        )
+        with StageTimer.stage("calibration"):
+            calibration_samples = TradeOutcomeRepository.fetch_calibration_samples(symbol, lookback_days=45)
+            cal = ProbabilityCalibrationEngine.calibrate(
+                raw_probability=timing_data["calibration_input_probability"],
+                samples=calibration_samples,
+                min_samples=settings.CALIBRATION_MIN_SAMPLES,
+            )
     print(
         "Calibration | "
         f"enabled={settings.ENABLE_CALIBRATION}, "
@@ -302,16 +326,20 @@ def run_option_chain(symbol: str) -> None:
     )
 
     if not settings.TEST_MODE:
-        ScalpRepository.insert_scalp_score(
-            symbol=symbol,
-            snapshot_time=snapshot_time,
-            spot_price=spot,
-            scalp_data=scalp_data,
+        writes.add(
+            "Scalp score",
+            lambda cursor: ScalpRepository.write_scalp_score(cursor, symbol, snapshot_time, spot, scalp_data),
+            required=False,
+            healer=ScalpRepository,
         )
         if settings.ENABLE_OUTCOME_TRACKING:
-            TradeOutcomeRepository.process_pending_signals(symbol)
+            def _label_outcomes(cursor):
+                with StageTimer.stage("outcome_labeling"):
+                    return TradeOutcomeRepository.write_pending_outcomes(cursor, symbol)
+
+            writes.add("Pending outcomes", _label_outcomes, required=False)
 
-    side = _pick_side(market_bias_data, geeks_data)
+    side = market_bias_engine.pick_side(market_bias_data, geeks_data)
     dynamic_pick = {"strike": None, "entry_ltp": None, "score": 0.0, "reasons": ["No trade side selected."]}
     signal_id = None
     stop_loss_pct = 25.0
@@ -355,38 +383,42 @@ def run_option_chain(symbol: str) -> None:
             and dynamic_pick["strike"] is not None
             and not settings.TEST_MODE
         ):
-            signal_id = TradeSignalRepository.insert_signal(
-                symbol=symbol,
-                snapshot_time=snapshot_time,
-                side=side,
-                strike_price=float(dynamic_pick["strike"]),
-                entry_ltp=float(dynamic_pick["entry_ltp"] or 0.0),
-                spot_price=spot,
-                regime=regime_data["label"],
-                signal_strength=float(market_bias_data.get("market_score", 0)),
-                timing_score=float(timing_data["timing_score_v2"]),
-                raw_probability=float(timing_data["calibration_input_probability"]),
-                calibrated_probability=float(cal["calibrated_probability"]),
-                stop_loss_pct=stop_loss_pct,
-                target_pct=target_pct,
-                time_stop_min=time_stop_min,
-                execution_notes="; ".join(dynamic_pick.get("reasons", [])),
-            )
-            if signal_id:
-                TradeOutcomeRepository.label_outcomes_for_signal(
-                    signal_id=signal_id,
+            def _write_signal(cursor) -> int:
+                new_id = TradeSignalRepository.write_signal(
+                    cursor,
                     symbol=symbol,
+                    snapshot_time=snapshot_time,
                     side=side,
-                    strike=float(dynamic_pick["strike"]),
-                    entry_time=snapshot_time,
+                    strike_price=float(dynamic_pick["strike"]),
                     entry_ltp=float(dynamic_pick["entry_ltp"] or 0.0),
+                    spot_price=spot,
+                    regime=regime_data["label"],
+                    signal_strength=float(market_bias_data.get("market_score", 0)),
+                    timing_score=float(timing_data["timing_score_v2"]),
+                    raw_probability=float(timing_data["calibration_input_probability"]),
+                    calibrated_probability=float(cal["calibrated_probability"]),
                     stop_loss_pct=stop_loss_pct,
                     target_pct=target_pct,
+                    time_stop_min=time_stop_min,
+                    execution_notes="; ".join(dynamic_pick.get("reasons", [])),
                 )
+                TradeOutcomeRepository.write_outcomes_for_signal(cursor, new_id)
+                return new_id
+
+            writes.add("Trade signal", _write_signal, required=False)
+
+    if len(writes):
+        with StageTimer.stage("db_writes"):
+            write_results = writes.flush()
+        signal_id = write_results.get("Trade signal")
+        if "Snapshot" in write_results:
+            # Only a committed chain may seed the day's baseline; a restart reloads the same one.
+            BaselineOICache.observe(symbol, snapshot_time, df)
 
     performance_data = {"trades": 0, "hit_rate": 0.0, "expectancy": 0.0, "avg_return_pct": 0.0}
     if settings.ENABLE_OUTCOME_TRACKING:
-        performance_data = TradeOutcomeRepository.fetch_recent_performance(symbol=symbol, lookback_days=2)
+        with StageTimer.stage("performance"):
+            performance_data = TradeOutcomeRepository.fetch_recent_performance(symbol=symbol, lookback_days=2)
 
     pcr_note = (
         "Low PCR bearish" if pcr < 0.8 else
@@ -399,51 +431,53 @@ def run_option_chain(symbol: str) -> None:
     has_valid_strike = dynamic_pick.get("strike") is not None
     final_allow_trade = bool(timing_data["allow_trade"] and quality.is_usable and final_side in ("CE", "PE") and has_valid_strike)
 
-    report_html = report_builder.build_html_report(
-        symbol,
-        spot,
-        atm,
-        resistance,
-        support,
-        max_pain,
-        pcr,
-        prob_data,
-        scalp_data,
-        intraday_data,
-        oi_delta_data,
-        pcr_note,
-        maxpain_note,
-        confidence_data,
-        market_bias_data=market_bias_data,
-        geeks_data=geeks_data,
-        regime_data=regime_data,
-        timing_data=timing_data,
-        dynamic_pick=dynamic_pick,
-        calibration_data=cal,
-        quality_data={
-            "is_usable": quality.is_usable,
-            "stale_data": quality.stale_data,
-            "missing_strikes": quality.missing_strikes,
-            "anomaly_flags": quality.anomaly_flags,
-            "warnings": quality.warnings,
-        },
-        performance_data=performance_data,
-        execution_data={
-            "side": final_side,
-            "signal_id": signal_id,
-            "stop_loss_pct": stop_loss_pct,
-            "target_pct": target_pct,
-            "time_stop_min": time_stop_min,
-            "allow_trade": final_allow_trade,
-            "invalidation_pct": timing_data["invalidation_pct"],
-            "expected_move_pct": timing_data["expected_move_pct"],
-        },
-        sr_window_data=sr_window_data,
-    )
+    with StageTimer.stage("report_build"):
+        report_html = report_builder.build_html_report(
+            symbol,
+            spot,
+            atm,
+            resistance,
+            support,
+            max_pain,
+            pcr,
+            prob_data,
+            scalp_data,
+            intraday_data,
+            oi_delta_data,
+            pcr_note,
+            maxpain_note,
+            confidence_data,
+            market_bias_data=market_bias_data,
+            geeks_data=geeks_data,
+            regime_data=regime_data,
+            timing_data=timing_data,
+            dynamic_pick=dynamic_pick,
+            calibration_data=cal,
+            quality_data={
+                "is_usable": quality.is_usable,
+                "stale_data": quality.stale_data,
+                "missing_strikes": quality.missing_strikes,
+                "anomaly_flags": quality.anomaly_flags,
+                "warnings": quality.warnings,
+            },
+            performance_data=performance_data,
+            execution_data={
+                "side": final_side,
+                "signal_id": signal_id,
+                "stop_loss_pct": stop_loss_pct,
+                "target_pct": target_pct,
+                "time_stop_min": time_stop_min,
+                "allow_trade": final_allow_trade,
+                "invalidation_pct": timing_data["invalidation_pct"],
+                "expected_move_pct": timing_data["expected_move_pct"],
+            },
+            sr_window_data=sr_window_data,
+        )
 
     subject_line = f"{'[TEST MODE] ' if settings.TEST_MODE else ''}10-Min Option Chain Report - {symbol}"
     try:
-        saved_path = ReportWebStore.save_report(symbol=symbol, subject=subject_line, report_html=report_html)
+        with StageTimer.stage("web_save"):
+            saved_path = ReportWebStore.save_report(symbol=symbol, subject=subject_line, report_html=report_html)
         print(f"Web report saved: {saved_path}")
     except Exception as exc:
         print(f"Web report save failed: {exc}")
@@ -1,6 +1,58 @@
 import argparse
 import json
 from backtesting.walk_forward_backtester import WalkForwardBacktester, BacktestConfig
+from backtesting.parameter_sweep import ParameterSweep, build_grid
+from backtesting.pipeline_replay import PipelineReplay
+
+
+def _parse_values(raw: str, cast=float) -> list:
+    """
+    Accept "a,b,c" or an inclusive "start:stop:step" range.
+    """
+    if ":" in raw:
+        start, stop, step = (float(x) for x in raw.split(":"))
+        values = []
+        current = start
+        while current <= stop + 1e-9:
+            values.append(cast(round(current, 6)))
+            current += step
+        return values
+    return [cast(x) for x in raw.split(",") if x.strip()]
+
+
+def _run_sweep(args) -> None:
+    symbols = [s.strip() for s in (args.symbols or args.symbol).split(",") if s.strip()]
+    ranges = [r.split(":") for r in (args.ranges or f"{args.start_date}:{args.end_date}").split(",") if r.strip()]
+    books = [
+        {"symbol": symbol, "start_date": start, "end_date": end}
+        for symbol in symbols
+        for start, end in ranges
+    ]
+    grid = build_grid(
+        slippage_pct=_parse_values(args.slippage_grid or str(args.slippage_pct)),
+        txn_cost_pct=_parse_values(args.txn_cost_grid or str(args.txn_cost_pct)),
+        stop_loss_pct=_parse_values(args.stop_grid or str(args.stop_loss_pct)),
+        target_pct=_parse_values(args.target_grid or str(args.target_pct)),
+        time_stop_min=_parse_values(args.time_stop_grid or str(args.time_stop_min), cast=int),
+    )
+    results = ParameterSweep.run(books, grid, max_workers=args.workers)
+
+    if args.as_json:
+        print(json.dumps(results.head(args.top).to_dict("records"), indent=2, default=str))
+        return
+
+    print("\nParameter Sweep Result")
+    print("----------------------")
+    print(f"Books: {len(books)} | Grid: {len(grid)} configs | Rows: {len(results)}")
+    if results.empty:
+        print("No results.")
+        return
+    columns = [
+        "symbol", "start_date", "end_date", "trades", "hit_rate", "avg_net_return_pct",
+        "expectancy", "max_drawdown_pct", "slippage_pct", "txn_cost_pct",
+        "default_stop_loss_pct", "default_target_pct", "default_time_stop_min",
+    ]
+    print(results[columns].head(args.top).to_string(index=False))
 
 
 def main():
@@ -14,8 +66,27 @@ def main():
     parser.add_argument("--target-pct", type=float, default=45.0)
     parser.add_argument("--time-stop-min", type=int, default=30)
     parser.add_argument("--as-json", action="store_true", help="Print machine-readable JSON output")
+    parser.add_argument("--sweep", action="store_true", help="Evaluate a parameter grid instead of one config")
+    parser.add_argument("--symbols", default="", help="Sweep: comma-separated symbols (default --symbol)")
+    parser.add_argument("--ranges", default="", help="Sweep: comma-separated start:end date ranges")
+    parser.add_argument("--slippage-grid", default="", help='Sweep: "a,b,c" or "start:stop:step"')
+    parser.add_argument("--txn-cost-grid", default="")
+    parser.add_argument("--stop-grid", default="")
+    parser.add_argument("--target-grid", default="")
+    parser.add_argument("--time-stop-grid", default="")
+    parser.add_argument("--workers", type=int, default=None, help="Sweep: process pool size")
+    parser.add_argument("--top", type=int, default=20, help="Sweep: rows to print")
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Generate signals by replaying the full pipeline over stored snapshots",
+    )
     args = parser.parse_args()
 
+    if args.sweep:
+        _run_sweep(args)
+        return
+
     cfg = BacktestConfig(
         slippage_pct=args.slippage_pct,
         txn_cost_pct=args.txn_cost_pct,
@@ -23,7 +94,8 @@ def main():
         default_target_pct=args.target_pct,
         default_time_stop_min=args.time_stop_min,
     )
-    result = WalkForwardBacktester.run(
+    runner = PipelineReplay if args.replay else WalkForwardBacktester
+    result = runner.run(
         symbol=args.symbol,
         start_date=args.start_date,
         end_date=args.end_date,
@@ -38,6 +110,8 @@ def main():
     print("----------------------------")
     print(f"Symbol: {result['symbol']}")
     print(f"Range: {result['start_date']} -> {result['end_date']}")
+    if args.replay:
+        print(f"Replayed Snapshots: {result['snapshots']} | Signals: {result['signals']}")
     print(f"Trades: {result['trades']}")
     print(f"Hit Rate: {result['hit_rate']:.2%}")
     print(f"Avg Net Return: {result['avg_net_return_pct']:.3f}%")
@@ -2,20 +2,59 @@
 Smart Scheduler
 - TEST_MODE -> Every 1 minute
 - PRODUCTION -> Every 10 minutes (9:10 AM - 3:30 PM IST)
+- Symbols in a cycle run concurrently on a bounded worker pool
+- ENABLE_ASYNC_FETCH prefetches every symbol's spot + chain in one concurrent burst
 """
 
+from apscheduler.events import (
+    EVENT_JOB_ADDED,
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+)
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime
+import functools
+import queue
+import threading
+import time
 import pytz
 from run_engine import run_option_chain
+from pipeline_context import PipelineContext
 from config.symbols import SYMBOLS
 from config.settings import settings
 from database.cleanup_manager import CleanupManager
+from monitoring import metrics
+from monitoring.stage_timer import StageTimer
+from reporting.report_web_store import ReportWebStore
 
 
 TIMEZONE = pytz.timezone("Asia/Kolkata")
 
+# Created once per process; every cycle reuses its client and engines.
+PIPELINE_CONTEXT = PipelineContext()
+
+# Symbol -> worker thread, kept until the thread exits, including threads a
+# timed-out cycle abandoned. They still hold DB connections and still write.
+_LIVE_SYMBOL_THREADS: dict[str, threading.Thread] = {}
+_LIVE_LOCK = threading.Lock()
+
+# Job id -> fire time the job is next due, so a submission can count the
+# overdue fire times coalescing folded into it.
+_NEXT_RUN_TIMES: dict[str, datetime] = {}
+# Bound on fire times walked per submission (a cron trigger over a long outage).
+MAX_COALESCED_WALK = 10000
+
+JOB_EVENT_NAMES = {
+    EVENT_JOB_EXECUTED: "executed",
+    EVENT_JOB_ERROR: "error",
+    EVENT_JOB_MISSED: "missed",
+    EVENT_JOB_MAX_INSTANCES: "max_instances",
+}
+
 
 def _effective_symbols() -> list[str]:
     if settings.TEST_MODE and settings.TEST_SYMBOLS:
@@ -34,33 +73,279 @@ def print_feature_flags() -> None:
     print(f"ENABLE_REGIME_V2={settings.ENABLE_REGIME_V2}")
     print(f"ENABLE_DYNAMIC_OTM={settings.ENABLE_DYNAMIC_OTM}")
     print(f"ENABLE_CALIBRATION={settings.ENABLE_CALIBRATION}")
+    print(f"ENABLE_IV_SMILE={settings.ENABLE_IV_SMILE}")
     print(f"CALIBRATION_MIN_SAMPLES={settings.CALIBRATION_MIN_SAMPLES}")
-    print(f"OPTION_CHAIN_STRIKE_COUNT={settings.OPTION_CHAIN_STRIKE_COUNT}\n")
+    print(f"CYCLE_MAX_WORKERS={settings.CYCLE_MAX_WORKERS}")
+    print(f"SYMBOL_TIMEOUT_SECONDS={settings.SYMBOL_TIMEOUT_SECONDS}")
+    print(f"OPTION_CHAIN_STRIKE_COUNT={settings.OPTION_CHAIN_STRIKE_COUNT}")
+    print(f"ENABLE_ASYNC_FETCH={settings.ENABLE_ASYNC_FETCH}")
+    print(f"FYERS_RATE_PER_SECOND={settings.FYERS_RATE_PER_SECOND} FYERS_RATE_PER_MINUTE={settings.FYERS_RATE_PER_MINUTE}")
+    print(f"ENABLE_SNAPSHOT_ARCHIVE={settings.ENABLE_SNAPSHOT_ARCHIVE}")
+    print(f"ENABLE_STAGE_TIMING={settings.ENABLE_STAGE_TIMING}")
+    print(f"METRICS_PORT={settings.METRICS_PORT or 'disabled'}\n")
     print(f"TEST_INTERVAL_MINUTES={settings.TEST_INTERVAL_MINUTES}")
     print(f"TEST_SYMBOLS={settings.TEST_SYMBOLS if settings.TEST_SYMBOLS else 'ALL_DEFAULT'}")
     print(f"EFFECTIVE_SYMBOLS={_effective_symbols()}\n")
 
 
+def _run_symbol(symbol: str) -> dict:
+    print(f"Processing {symbol}...\n")
+    started = time.perf_counter()
+    try:
+        run_option_chain(symbol, context=PIPELINE_CONTEXT)
+        status, error = "ok", ""
+    except Exception as exc:
+        status, error = "failed", str(exc)
+        print(f"Symbol cycle failed for {symbol}: {exc}")
+    return {
+        "symbol": symbol,
+        "status": status,
+        "seconds": time.perf_counter() - started,
+        "error": error,
+    }
+
+
+def _live_symbol_threads() -> dict[str, threading.Thread]:
+    with _LIVE_LOCK:
+        for symbol, thread in list(_LIVE_SYMBOL_THREADS.items()):
+            if not thread.is_alive():
+                del _LIVE_SYMBOL_THREADS[symbol]
+        return dict(_LIVE_SYMBOL_THREADS)
+
+
+def run_cycle(symbols: list[str], max_workers: int, timeout_seconds: float) -> list[dict]:
+    """
+    Run one cycle with at most `max_workers` symbols in flight.
+
+    Each symbol is isolated: failures are captured in its result row, and a
+    symbol running longer than `timeout_seconds` is reported as a timeout and
+    abandoned so the cycle can finish. Python threads cannot be killed, so an
+    abandoned worker finishes in the background and its late result is
+    discarded. Until it exits it keeps its worker slot (in this and later
+    cycles), and its symbol is reported as `still_running` instead of being
+    started a second time. Symbols that get no slot before the cycle deadline
+    are reported as timeouts.
+    """
+    completed: queue.Queue = queue.Queue()
+    waiting = list(dict.fromkeys(symbols))
+    running: dict[str, float] = {}
+    results: dict[str, dict] = {}
+    deadline = time.perf_counter() + timeout_seconds
+
+    def _worker(symbol: str) -> None:
+        try:
+            completed.put(_run_symbol(symbol))
+        finally:
+            with _LIVE_LOCK:
+                if _LIVE_SYMBOL_THREADS.get(symbol) is threading.current_thread():
+                    del _LIVE_SYMBOL_THREADS[symbol]
+
+    def _launch(symbol: str) -> None:
+        running[symbol] = time.perf_counter()
+        thread = threading.Thread(target=_worker, args=(symbol,), name=f"cycle-{symbol}", daemon=True)
+        with _LIVE_LOCK:
+            _LIVE_SYMBOL_THREADS[symbol] = thread
+        thread.start()
+
+    while waiting or running:
+        live = _live_symbol_threads()
+        abandoned = sum(1 for symbol in live if symbol not in running)
+        while waiting and len(running) + abandoned < max(1, max_workers):
+            symbol = waiting.pop(0)
+            if symbol in live:
+                results[symbol] = {
+                    "symbol": symbol,
+                    "status": "still_running",
+                    "seconds": 0.0,
+                    "error": "previous run has not finished",
+                }
+                print(f"Skipping {symbol}: its previous run is still in progress")
+                continue
+            _launch(symbol)
+
+        try:
+            result = completed.get(timeout=0.5)
+        except queue.Empty:
+            result = None
+        if result is not None and result["symbol"] in running:
+            running.pop(result["symbol"])
+            results[result["symbol"]] = result
+
+        now = time.perf_counter()
+        for symbol, began in list(running.items()):
+            if now - began > timeout_seconds:
+                running.pop(symbol)
+                results[symbol] = {
+                    "symbol": symbol,
+                    "status": "timeout",
+                    "seconds": now - began,
+                    "error": f"exceeded {timeout_seconds:.0f}s",
+                }
+                print(f"Symbol cycle timed out for {symbol} after {now - began:.1f}s")
+
+        if waiting and not running and now > deadline:
+            # Every slot is held by abandoned runs from earlier cycles.
+            for symbol in waiting:
+                results[symbol] = {
+                    "symbol": symbol,
+                    "status": "timeout",
+                    "seconds": 0.0,
+                    "error": "no free worker slot; earlier runs still in progress",
+                }
+            waiting = []
+
+    return [results[s] for s in dict.fromkeys(symbols)]
+
+
+def prefetch_cycle(symbols: list[str]) -> None:
+    """
+    Fetch all symbols up front; if the prefetch itself fails, each symbol
+    falls back to fetching on its own inside run_option_chain.
+    """
+    try:
+        seconds = PIPELINE_CONTEXT.prefetch(symbols)
+        print(f"Prefetched {len(symbols)} symbol(s) in {seconds:.2f}s\n")
+    except Exception as exc:
+        print(f"Async prefetch failed, symbols will fetch individually: {exc}\n")
+
+
+def print_cycle_report(results: list[dict], wall_seconds: float) -> None:
+    print("\nCycle Report")
+    print("------------")
+    for r in results:
+        suffix = f" | {r['error']}" if r["error"] else ""
+        print(f"{r['symbol']:<24} {r['status']:<13} {r['seconds']:>7.2f}s{suffix}")
+    counts = {
+        status: sum(1 for r in results if r["status"] == status)
+        for status in ("ok", "failed", "timeout", "still_running")
+    }
+    slowest = max((r["seconds"] for r in results), default=0.0)
+    serial = sum(r["seconds"] for r in results)
+    print(
+        f"Wall clock: {wall_seconds:.2f}s | slowest symbol: {slowest:.2f}s | "
+        f"serial sum: {serial:.2f}s | ok={counts['ok']} failed={counts['failed']} timeout={counts['timeout']} "
+        f"still_running={counts['still_running']}"
+    )
+
+
+def record_cycle_metrics(results: list[dict], wall_seconds: float) -> None:
+    metrics.CYCLE_SECONDS.observe(wall_seconds)
+    for r in results:
+        metrics.SYMBOL_CYCLES.inc(symbol=r["symbol"], status=r["status"])
+        metrics.SYMBOL_SECONDS.observe(r["seconds"], symbol=r["symbol"])
+    metrics.write_textfile()
+
+
+def coalesced_runs(trigger, due: datetime, run_time: datetime) -> int:
+    """
+    Fire times of `trigger` from `due` up to, not including, `run_time`.
+    """
+    merged, fire = 0, due
+    while fire is not None and fire < run_time and merged < MAX_COALESCED_WALK:
+        merged += 1
+        fire = trigger.get_next_fire_time(fire, fire)
+    return merged
+
+
+def _track_due_run(event, scheduler) -> None:
+    """
+    Keep `_NEXT_RUN_TIMES` current and count the runs merged into a
+    submission. A coalescing job is submitted with only its latest run time,
+    so merged runs are the trigger's fire times between when the job was
+    last due and the run that was submitted.
+    """
+    job = scheduler.get_job(event.job_id) if scheduler is not None else None
+    if job is None:
+        _NEXT_RUN_TIMES.pop(event.job_id, None)
+        return
+    if event.code == EVENT_JOB_ADDED:
+        if job.next_run_time is not None:
+            _NEXT_RUN_TIMES[event.job_id] = job.next_run_time
+        return
+
+    run_time = event.scheduled_run_times[-1]
+    due = _NEXT_RUN_TIMES.get(event.job_id)
+    if event.code == EVENT_JOB_SUBMITTED and due is not None:
+        merged = coalesced_runs(job.trigger, due, run_time)
+        if merged > 0:
+            metrics.JOB_COALESCED.inc(merged, job=event.job_id)
+    _NEXT_RUN_TIMES[event.job_id] = job.trigger.get_next_fire_time(run_time, run_time)
+
+
+def on_job_event(event, scheduler=None) -> None:
+    """
+    APScheduler listener: executed/error/missed/max-instances counts and
+    run times merged by coalescing, per job id. Coalesce counting needs
+    `scheduler` to look up each job's trigger.
+    """
+    if event.code in (EVENT_JOB_ADDED, EVENT_JOB_SUBMITTED, EVENT_JOB_MAX_INSTANCES):
+        _track_due_run(event, scheduler)
+    name = JOB_EVENT_NAMES.get(event.code)
+    if name:
+        metrics.JOB_EVENTS.inc(job=event.job_id, event=name)
+        if name != "executed":
+            metrics.write_textfile()
+
+
+def print_stage_report() -> None:
+    rows = StageTimer.summary()
+    if not rows:
+        return
+    print("\nStage Latency (rolling, all symbols)")
+    print("------------------------------------")
+    print(StageTimer.format_summary(rows))
+
+
 def job():
     now = datetime.now(TIMEZONE)
     print("\n===========================================")
     print(f"Running Market Cycle at {now}")
     print("===========================================\n")
-    for symbol in _effective_symbols():
-        print(f"Processing {symbol}...\n")
-        run_option_chain(symbol)
+    started = time.perf_counter()
+    symbols = _effective_symbols()
+    if settings.ENABLE_ASYNC_FETCH:
+        prefetch_cycle(symbols)
+    results = run_cycle(
+        symbols,
+        max_workers=settings.CYCLE_MAX_WORKERS,
+        timeout_seconds=settings.SYMBOL_TIMEOUT_SECONDS,
+    )
+    wall_seconds = time.perf_counter() - started
+    print_cycle_report(results, wall_seconds)
+    record_cycle_metrics(results, wall_seconds)
+    print_stage_report()
     print("\nCycle Completed\n")
 
 
 if __name__ == "__main__":
     scheduler = BlockingScheduler(timezone=TIMEZONE)
     print_feature_flags()
+    scheduler.add_listener(
+        functools.partial(on_job_event, scheduler=scheduler),
+        EVENT_JOB_ADDED | EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES,
+    )
+    if settings.METRICS_PORT:
+        metrics.start_http_server(settings.METRICS_PORT)
+        print(f"Metrics: http://127.0.0.1:{settings.METRICS_PORT}/metrics\n")
+
+    # Report backfill/pruning runs beside the cycles, never inside save_report.
+    threading.Thread(target=ReportWebStore.maintain, name="report-maintenance", daemon=True).start()
+    scheduler.add_job(
+        ReportWebStore.maintain,
+        "interval",
+        id="report_maintenance",
+        minutes=30,
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=60,
+    )
 
     if settings.TEST_MODE:
         interval = settings.TEST_INTERVAL_MINUTES
         scheduler.add_job(
             job,
             "interval",
+            id="test_cycle",
             minutes=interval,
             max_instances=1,
             coalesce=True,
@@ -72,21 +357,25 @@ if __name__ == "__main__":
         scheduler.add_job(
             job,
             CronTrigger(day_of_week="mon-fri", hour="9", minute="10,20,30,40,50"),
+            id="cycle_open",
             misfire_grace_time=30,
         )
         scheduler.add_job(
             job,
             CronTrigger(day_of_week="mon-fri", hour="10-14", minute="0,10,20,30,40,50"),
+            id="cycle_session",
             misfire_grace_time=30,
         )
         scheduler.add_job(
             job,
             CronTrigger(day_of_week="mon-fri", hour="15", minute="0,10,20,30"),
+            id="cycle_close",
             misfire_grace_time=30,
         )
         scheduler.add_job(
             CleanupManager.cleanup_old_data,
             CronTrigger(day_of_week="mon-fri", hour="9", minute="25"),
+            id="cleanup",
             misfire_grace_time=60,
         )
         print("PRODUCTION MODE ENABLED")
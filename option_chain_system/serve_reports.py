@@ -1,12 +1,12 @@
-"""Serve generated HTML reports over HTTP."""
+"""Serve generated HTML reports and the report API over HTTP."""
 
 from __future__ import annotations
 
 import argparse
-from functools import partial
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
 from pathlib import Path
 
+from reporting.report_server import serve
 from reporting.report_web_store import ReportWebStore
 
 
@@ -18,13 +18,12 @@ def main() -> None:
 
     base_dir = Path(__file__).resolve().parent / "reports" / "web"
     base_dir.mkdir(parents=True, exist_ok=True)
-    ReportWebStore.refresh_index()
+    ReportWebStore.maintain()
 
-    handler = partial(SimpleHTTPRequestHandler, directory=str(base_dir))
-    server = ThreadingHTTPServer((args.host, args.port), handler)
-    print(f"Serving reports at http://{args.host}:{args.port}")
-    print(f"Root directory: {base_dir}")
-    server.serve_forever()
+    try:
+        asyncio.run(serve(args.host, args.port, root=base_dir))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
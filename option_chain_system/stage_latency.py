@@ -0,0 +1,40 @@
+"""
+Print p50/p95/p99 per run_option_chain stage from the stage timing log.
+
+    python stage_latency.py
+    python stage_latency.py --symbol NSE:NIFTY50-INDEX --last 200
+"""
+
+import argparse
+import json
+from pathlib import Path
+from monitoring.stage_timer import StageTimer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency percentiles from the stage timing log.")
+    parser.add_argument("--log", default=None, help="JSONL log path (default: STAGE_TIMING_LOG).")
+    parser.add_argument("--symbol", default=None, help="Only cycles for this symbol.")
+    parser.add_argument("--last", type=int, default=None, help="Only the most recent N cycles.")
+    parser.add_argument("--json", dest="as_json", action="store_true", help="Print JSON instead of a table.")
+    args = parser.parse_args()
+
+    path = Path(args.log) if args.log else StageTimer.log_path()
+    if not path.exists():
+        print(f"No stage timing log at {path}")
+        return
+    rows = StageTimer.summary(StageTimer.read_log(path, symbol=args.symbol, last=args.last))
+
+    if args.as_json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"\nStage Latency | {path}")
+    print("-------------")
+    if not rows:
+        print("No cycles recorded.")
+        return
+    print(StageTimer.format_summary(rows))
+
+
+if __name__ == "__main__":
+    main()
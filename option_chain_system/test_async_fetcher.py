@@ -0,0 +1,158 @@
+import unittest
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    from aiohttp import web
+    from benchmarking.stub_fyers import AsyncStubFyersModel
+    from benchmarking.synthetic_chain import ChainProfile, SyntheticChainGenerator
+    from data_layer.async_fetcher import AsyncFyersClient, AsyncOptionChainFetcher
+    from data_layer.rate_limiter import RequestGovernor
+    from pipeline_context import PipelineContext
+except Exception:
+    AsyncOptionChainFetcher = None
+
+SYMBOLS = ["NSE:NIFTY50-INDEX", "NSE:NIFTYBANK-INDEX", "BSE:SENSEX-INDEX"]
+
+
+def _stub(latency_ms: float = 0.0) -> "AsyncStubFyersModel":
+    return AsyncStubFyersModel(
+        [SyntheticChainGenerator(ChainProfile(symbol=s, strikes=40)) for s in SYMBOLS],
+        latency_ms=latency_ms,
+    )
+
+
+def _unlimited() -> "RequestGovernor":
+    return RequestGovernor(per_second=0, per_minute=0)
+
+
+@unittest.skipIf(AsyncOptionChainFetcher is None, "async fetcher dependencies unavailable")
+class TestAsyncOptionChainFetcher(unittest.TestCase):
+    def test_cycle_is_one_batched_quote_and_concurrent_chains(self):
+        stub = _stub(latency_ms=150)
+        fetcher = AsyncOptionChainFetcher(client=stub, governor=_unlimited())
+        try:
+            started = time.perf_counter()
+            results = fetcher.fetch_cycle(SYMBOLS, strike_count=10)
+            elapsed = time.perf_counter() - started
+        finally:
+            fetcher.close()
+
+        self.assertEqual(dict(stub.calls), {"quotes": 1, "optionchain": 3})
+        # Six serial calls would take 0.9s; concurrently it is about one round trip.
+        self.assertLess(elapsed, 0.45)
+        for symbol in SYMBOLS:
+            spot, df = results[symbol].unwrap()
+            self.assertEqual(spot, round(stub.stub.generators[symbol].spot, 2))
+            self.assertEqual(df["strike_price"].nunique(), 21)
+            self.assertEqual(set(df["symbol"]), {symbol})
+
+    def test_unknown_symbol_fails_alone(self):
+        fetcher = AsyncOptionChainFetcher(client=_stub(), governor=_unlimited())
+        try:
+            results = fetcher.fetch_cycle(SYMBOLS[:1] + ["NSE:UNKNOWN-INDEX"])
+        finally:
+            fetcher.close()
+
+        self.assertIsNone(results[SYMBOLS[0]].error)
+        with self.assertRaises(RuntimeError):
+            results["NSE:UNKNOWN-INDEX"].unwrap()
+
+    def test_prefetched_result_is_taken_once(self):
+        context = PipelineContext(fetcher=object(), async_fetcher=AsyncOptionChainFetcher(client=_stub(), governor=_unlimited()))
+        try:
+            context.prefetch(SYMBOLS)
+        finally:
+            context.async_fetcher.close()
+
+        self.assertIsNotNone(context.take_prefetched(SYMBOLS[0]))
+        self.assertIsNone(context.take_prefetched(SYMBOLS[0]))
+
+    def test_rate_limited_chain_is_retried_through_the_governor(self):
+        stub = _stub()
+        answer = stub.stub.optionchain
+        rejected = []
+
+        def _optionchain(data):
+            if not rejected:
+                rejected.append(data["symbol"])
+                return {"s": "error", "code": 429, "message": "request limit reached"}
+            return answer(data)
+
+        stub.stub.optionchain = _optionchain
+        governor = RequestGovernor(per_second=0, per_minute=0, max_retries=1, backoff_seconds=0.01)
+        fetcher = AsyncOptionChainFetcher(client=stub, governor=governor)
+        try:
+            results = fetcher.fetch_cycle(SYMBOLS[:1])
+        finally:
+            fetcher.close()
+
+        self.assertEqual(rejected, SYMBOLS[:1])
+        self.assertFalse(results[SYMBOLS[0]].unwrap()[1].empty)
+
+
+@unittest.skipIf(AsyncOptionChainFetcher is None, "async fetcher dependencies unavailable")
+class TestAsyncFyersClient(unittest.TestCase):
+    def _serve(self, handler, client: "AsyncFyersClient"):
+        async def _run():
+            app = web.Application()
+            app.router.add_get("/data/quotes", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+            client.BASE_URL = f"http://127.0.0.1:{port}/data"
+            try:
+                return await client.quotes({"symbols": SYMBOLS[0]})
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        return asyncio.run(_run())
+
+    def test_retries_server_errors_with_backoff(self):
+        seen = []
+
+        async def handler(request):
+            seen.append(request.headers.get("Authorization"))
+            if len(seen) < 3:
+                return web.Response(status=503)
+            return web.json_response({"s": "ok", "d": []})
+
+        governor = RequestGovernor(per_second=1, per_minute=0)
+        governor.acquire("drain")
+        client = AsyncFyersClient(
+            "APP-100", "token", timeout_seconds=2, max_retries=2, backoff_seconds=0.01, governor=governor
+        )
+        started = time.perf_counter()
+        self.assertEqual(self._serve(handler, client), {"s": "ok", "d": []})
+        self.assertEqual(seen, ["APP-100:token"] * 3)
+        # Each of the two retries waited for a token at 1/s.
+        self.assertGreater(time.perf_counter() - started, 1.5)
+
+    def test_gives_up_after_max_retries(self):
+        async def handler(request):
+            return web.Response(status=502)
+
+        client = AsyncFyersClient("APP-100", "token", timeout_seconds=2, max_retries=1, backoff_seconds=0.01, governor=_unlimited())
+        with self.assertRaises(RuntimeError):
+            self._serve(handler, client)
+
+    def test_error_payloads_are_returned_not_retried(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(1)
+            return web.json_response({"s": "error", "code": -300, "message": "invalid symbol"}, status=400)
+
+        client = AsyncFyersClient("APP-100", "token", timeout_seconds=2, max_retries=2, backoff_seconds=0.01, governor=_unlimited())
+        self.assertEqual(self._serve(handler, client)["code"], -300)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import pandas as pd
+    import numpy as np
+    from backtesting.walk_forward_backtester import WalkForwardBacktester, BacktestConfig
+    from backtesting.parameter_sweep import ParameterSweep, build_grid
+except Exception:
+    WalkForwardBacktester = None
+
+
+def _reference_trade(signal: dict, path: list[float], cfg) -> dict:
+    # Original per-signal loop, kept as the equivalence oracle.
+    entry_ltp = float(signal["entry_ltp"] or 0.0)
+    if entry_ltp <= 0 or not path:
+        return {"status": "skip"}
+    executed_entry = entry_ltp * (1 + cfg.slippage_pct / 100.0)
+    stop_level = executed_entry * (1 - abs(float(signal["stop_loss_pct"] or cfg.default_stop_loss_pct)) / 100.0)
+    target_level = executed_entry * (1 + abs(float(signal["target_pct"] or cfg.default_target_pct)) / 100.0)
+    exit_ltp, exit_reason = path[-1], "TIME_STOP"
+    for ltp in path:
+        if ltp <= stop_level:
+            exit_ltp, exit_reason = ltp, "STOP_LOSS"
+            break
+        if ltp >= target_level:
+            exit_ltp, exit_reason = ltp, "TARGET"
+            break
+    executed_exit = exit_ltp * (1 - cfg.slippage_pct / 100.0)
+    gross = (executed_exit - executed_entry) / executed_entry * 100.0
+    return {"status": "done", "exit_reason": exit_reason, "net_return_pct": gross - cfg.txn_cost_pct}
+
+
+def _random_book(seed: int, count: int = 60):
+    rng = random.Random(seed)
+    start = datetime(2026, 2, 2, 9, 30)
+    signals, paths = [], {}
+    for i in range(count):
+        entry = rng.choice([0.0, 40.0, 80.0, 120.0]) if i % 9 == 0 else rng.uniform(20, 150)
+        signals.append(
+            {
+                "id": i,
+                "symbol": "NSE:NIFTY50-INDEX",
+                "snapshot_time": start + timedelta(minutes=15 * i),
+                "side": rng.choice(["CE", "PE"]),
+                "strike_price": 22000.0 + 50 * rng.randint(-5, 5),
+                "entry_ltp": entry,
+                "stop_loss_pct": rng.choice([None, 20.0, 25.0]),
+                "target_pct": rng.choice([None, 30.0, 45.0]),
+                "time_stop_min": rng.choice([None, 30]),
+            }
+        )
+        steps = 0 if i % 11 == 0 else rng.randint(1, 10)
+        ltp, path = entry or 50.0, []
+        for _ in range(steps):
+            ltp = max(0.05, ltp * (1 + rng.gauss(0, 0.12)))
+            path.append(round(ltp, 2))
+        paths[i] = path
+    return pd.DataFrame(signals), paths
+
+
+@unittest.skipIf(WalkForwardBacktester is None, "backtest dependencies unavailable")
+class TestVectorizedBacktest(unittest.TestCase):
+    def test_matches_per_signal_reference(self):
+        cfg = BacktestConfig()
+        for seed in range(3):
+            signals, paths = _random_book(seed)
+
+            def fake_paths(trades):
+                rows = []
+                for idx in trades["trade_idx"]:
+                    entry_time = signals.iloc[idx]["snapshot_time"]
+                    for step, ltp in enumerate(paths[idx]):
+                        rows.append({"trade_idx": idx, "snapshot_time": entry_time + timedelta(minutes=3 * step), "ltp": ltp})
+                return pd.DataFrame(rows, columns=["trade_idx", "snapshot_time", "ltp"])
+
+            with patch.object(WalkForwardBacktester, "_fetch_ltp_paths", side_effect=fake_paths) as fetch:
+                simulated = WalkForwardBacktester.simulate_trades(signals, cfg)
+            fetch.assert_called_once()
+
+            for idx, signal in enumerate(signals.to_dict("records")):
+                signal = {k: (None if pd.isna(v) else v) for k, v in signal.items()}
+                expected = _reference_trade(signal, paths[idx], cfg)
+                got = simulated.iloc[idx]
+                self.assertEqual(got["status"], expected["status"])
+                if expected["status"] == "done":
+                    self.assertEqual(got["exit_reason"], expected["exit_reason"])
+                    self.assertAlmostEqual(got["net_return_pct"], expected["net_return_pct"], places=9)
+
+    def test_sweep_matches_single_config_runs(self):
+        signals, paths = _random_book(5, count=40)
+        trade_array = np.column_stack(
+            [
+                np.zeros(len(signals)),
+                np.arange(len(signals), dtype=float),
+                signals["entry_ltp"].to_numpy(dtype=float),
+                pd.to_numeric(signals["stop_loss_pct"]).to_numpy(dtype=float),
+                pd.to_numeric(signals["target_pct"]).to_numpy(dtype=float),
+                pd.to_numeric(signals["time_stop_min"]).to_numpy(dtype=float),
+            ]
+        )
+        path_array = np.array(
+            [[idx, 3.0 * step, ltp] for idx in range(len(signals)) for step, ltp in enumerate(paths[idx])]
+        )
+        book = {"symbol": "NSE:NIFTY50-INDEX", "start_date": "2026-02-02", "end_date": "2026-02-03"}
+        grid = build_grid([0.35], [0.10], [15.0, 25.0], [30.0, 45.0], [12, 30])
+
+        results = ParameterSweep.evaluate(trade_array, path_array, [book], grid, max_workers=2)
+
+        self.assertEqual(len(results), len(grid))
+        self.assertTrue(results["expectancy"].is_monotonic_decreasing)
+        for cfg in grid:
+            def fake_paths(trades, cfg=cfg):
+                rows = [
+                    {"trade_idx": idx, "snapshot_time": signals.iloc[idx]["snapshot_time"] + timedelta(minutes=3 * step), "ltp": ltp}
+                    for idx in trades["trade_idx"]
+                    for step, ltp in enumerate(paths[idx])
+                    if 3 * step <= cfg.default_time_stop_min
+                ]
+                return pd.DataFrame(rows, columns=["trade_idx", "snapshot_time", "ltp"])
+
+            with patch.object(WalkForwardBacktester, "_fetch_ltp_paths", side_effect=fake_paths):
+                expected = WalkForwardBacktester.summarize(
+                    book["symbol"], book["start_date"], book["end_date"], WalkForwardBacktester.simulate_trades(signals, cfg)
+                )
+            row = results[
+                (results["default_stop_loss_pct"] == cfg.default_stop_loss_pct)
+                & (results["default_target_pct"] == cfg.default_target_pct)
+                & (results["default_time_stop_min"] == cfg.default_time_stop_min)
+            ].iloc[0]
+            for key in ("trades", "hit_rate", "avg_net_return_pct", "max_drawdown_pct"):
+                self.assertAlmostEqual(float(row[key]), float(expected[key]), places=6)
+
+
+    def test_sweep_without_paths_reports_no_trades(self):
+        signals, _ = _random_book(6, count=10)
+        book = {"symbol": "NSE:NIFTY50-INDEX", "start_date": "2026-02-02", "end_date": "2026-02-03"}
+        no_paths = pd.DataFrame(columns=["trade_idx", "snapshot_time", "ltp"])
+
+        with patch("backtesting.parameter_sweep.MarketContextRepository.fetch_signals_for_range", return_value=signals), patch.object(
+            WalkForwardBacktester, "_fetch_ltp_paths", return_value=no_paths
+        ):
+            trade_array, path_array = ParameterSweep.load_books([book], max_time_stop_min=30)
+
+        self.assertEqual(trade_array.shape, (len(signals), 6))
+        self.assertEqual(path_array.shape, (0, 3))
+        results = ParameterSweep.evaluate(trade_array, path_array, [book], build_grid([0.35], [0.10], [25.0], [45.0], [30]), max_workers=1)
+        self.assertEqual(results["trades"].tolist(), [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
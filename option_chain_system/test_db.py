@@ -12,7 +12,7 @@ except Exception:
 
 @unittest.skipIf(DatabaseConnection is None, "db dependencies unavailable")
 class TestDatabaseConnection(unittest.TestCase):
-    @patch("database.db_connection.psycopg2.pool.SimpleConnectionPool")
+    @patch("database.db_connection.psycopg2.pool.ThreadedConnectionPool")
     def test_initialize_pool_once(self, mock_pool):
         DatabaseConnection._connection_pool = None
         fake_pool = MagicMock()
@@ -0,0 +1,69 @@
+import unittest
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import pandas as pd
+    from analytics.advanced_analysis import AdvancedOptionAnalysis
+except Exception:
+    pd = None
+    AdvancedOptionAnalysis = None
+
+
+def _reference_max_pain(df):
+    # Original nested-loop implementation, kept as the equivalence oracle.
+    strikes = sorted(df["strike_price"].unique())
+    data = []
+    for strike in strikes:
+        total_loss = 0
+        for _, row in df.iterrows():
+            if row["option_type"] == "CE":
+                intrinsic = max(0, strike - row["strike_price"])
+            else:
+                intrinsic = max(0, row["strike_price"] - strike)
+            total_loss += intrinsic * row["open_interest"]
+        data.append((strike, total_loss))
+    return float(min(data, key=lambda x: x[1])[0]), [loss for _, loss in data]
+
+
+def _random_chain(seed: int, strike_count: int, step: int = 50):
+    rng = random.Random(seed)
+    base = 22000
+    rows = []
+    for i in range(strike_count):
+        strike = base + i * step
+        for opt in ("CE", "PE"):
+            rows.append(
+                {
+                    "strike_price": float(strike),
+                    "option_type": opt,
+                    "open_interest": float(rng.randint(0, 5_000_000)),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+@unittest.skipIf(pd is None or AdvancedOptionAnalysis is None, "pandas or analytics dependencies unavailable")
+class TestMaxPain(unittest.TestCase):
+    def test_matches_reference_implementation(self):
+        for seed in range(5):
+            df = _random_chain(seed, strike_count=41)
+            expected_strike, expected_curve = _reference_max_pain(df)
+            curve = AdvancedOptionAnalysis.calculate_pain_curve(df)
+            self.assertEqual(AdvancedOptionAnalysis.calculate_max_pain(df), expected_strike)
+            self.assertEqual(curve["total_pain"].tolist(), expected_curve)
+
+    def test_tie_resolves_to_lowest_strike(self):
+        df = pd.DataFrame(
+            [
+                {"strike_price": 100.0, "option_type": "CE", "open_interest": 10.0},
+                {"strike_price": 200.0, "option_type": "PE", "open_interest": 10.0},
+            ]
+        )
+        self.assertEqual(AdvancedOptionAnalysis.calculate_max_pain(df), _reference_max_pain(df)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
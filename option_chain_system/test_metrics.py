@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import functools
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    from monitoring import metrics
+    from monitoring.metrics import MetricsRegistry
+    import scheduler as scheduler_module
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.interval import IntervalTrigger
+except Exception:
+    metrics = None
+
+
+@unittest.skipIf(metrics is None, "metrics dependencies unavailable")
+class TestMetricsRegistry(unittest.TestCase):
+    def test_exposition_format(self):
+        registry = MetricsRegistry()
+        calls = registry.counter("demo_calls_total", "Calls.", ("endpoint",))
+        latency = registry.histogram("demo_seconds", "Latency.", buckets=(0.1, 1.0))
+        calls.inc(endpoint='quo"tes')
+        calls.inc(2, endpoint='quo"tes')
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+
+        lines = registry.render().splitlines()
+
+        self.assertIn("# TYPE demo_calls_total counter", lines)
+        self.assertIn('demo_calls_total{endpoint="quo\\"tes"} 3', lines)
+        self.assertIn('demo_seconds_bucket{le="0.1"} 2', lines)
+        self.assertIn('demo_seconds_bucket{le="1"} 3', lines)
+        self.assertIn('demo_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn("demo_seconds_sum 3.65", lines)
+        self.assertIn("demo_seconds_count 4", lines)
+
+    def test_labels_and_types_are_checked(self):
+        registry = MetricsRegistry()
+        gauge = registry.gauge("demo_in_use", "In use.")
+        gauge.inc()
+        gauge.dec()
+        self.assertEqual(gauge.value(), 0.0)
+        with self.assertRaises(ValueError):
+            registry.counter("demo_in_use", "Clash.")
+        with self.assertRaises(ValueError):
+            registry.counter("demo_total", "Labelled.", ("symbol",)).inc(stage="x")
+
+    def test_textfile_round_trip(self):
+        registry = MetricsRegistry()
+        registry.gauge("demo_rows", "Rows.", ("symbol",)).set(80, symbol="NSE:NIFTY50-INDEX")
+        path = Path(tempfile.mkdtemp()) / "scheduler.prom"
+
+        metrics.write_textfile(registry, path)
+
+        self.assertEqual(metrics.read_textfile(path), registry.render())
+        self.assertEqual(metrics.read_textfile(path.with_name("missing.prom")), "")
+
+
+@unittest.skipIf(metrics is None, "metrics dependencies unavailable")
+class TestSchedulerMetrics(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(metrics, "write_textfile")
+        self.write = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cycle_results_counted_per_symbol_and_status(self):
+        before = metrics.SYMBOL_CYCLES.value(symbol="TEST:A", status="timeout")
+        results = [
+            {"symbol": "TEST:A", "status": "timeout", "seconds": 240.0, "error": "exceeded"},
+            {"symbol": "TEST:B", "status": "ok", "seconds": 4.0, "error": ""},
+        ]
+
+        scheduler_module.record_cycle_metrics(results, 241.0)
+
+        self.assertEqual(metrics.SYMBOL_CYCLES.value(symbol="TEST:A", status="timeout"), before + 1)
+        self.assertGreaterEqual(metrics.SYMBOL_SECONDS.count(symbol="TEST:B"), 1)
+        self.write.assert_called_once()
+
+    def test_job_listener_counts_misfires(self):
+        missed = metrics.JOB_EVENTS.value(job="test_job", event="missed")
+
+        scheduler_module.on_job_event(SimpleNamespace(code=scheduler_module.EVENT_JOB_MISSED, job_id="test_job"))
+
+        self.assertEqual(metrics.JOB_EVENTS.value(job="test_job", event="missed"), missed + 1)
+
+    def test_overdue_runs_of_a_real_job_are_counted_as_coalesced(self):
+        scheduler = BackgroundScheduler(timezone=scheduler_module.TIMEZONE)
+        scheduler.add_listener(
+            functools.partial(scheduler_module.on_job_event, scheduler=scheduler),
+            scheduler_module.EVENT_JOB_ADDED | scheduler_module.EVENT_JOB_SUBMITTED | scheduler_module.EVENT_JOB_MISSED,
+        )
+        ran = threading.Event()
+        now = datetime.now(scheduler_module.TIMEZONE)
+        before = metrics.JOB_COALESCED.value(job="test_coalesce")
+        # Four fire times are overdue; coalescing submits only the last one.
+        scheduler.add_job(
+            ran.set,
+            IntervalTrigger(minutes=1, timezone=scheduler_module.TIMEZONE),
+            id="test_coalesce",
+            next_run_time=now - timedelta(seconds=210),
+            coalesce=True,
+            misfire_grace_time=None,
+        )
+        scheduler.start()
+        try:
+            self.assertTrue(ran.wait(5))
+        finally:
+            scheduler.shutdown(wait=True)
+
+        self.assertEqual(metrics.JOB_COALESCED.value(job="test_coalesce"), before + 3)
+
+if __name__ == "__main__":
+    unittest.main()
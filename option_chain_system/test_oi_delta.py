@@ -1,14 +1,29 @@
 import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta
 import os
 import sys
 
 sys.path.append(os.path.dirname(__file__))
 try:
+    import pandas as pd
+    import pytz
     from analytics.intraday_oi_engine import IntradayOIDeltaEngine
+    from analytics.snapshot_cache import SnapshotCache
+    from analytics.baseline_oi_cache import BaselineOICache
+    from database.market_context_repository import MarketContextRepository
 except Exception:
     IntradayOIDeltaEngine = None
 
 
+def _oi_chain(ce_oi: float, pe_oi: float):
+    rows = []
+    for strike in range(21850, 22200, 50):
+        rows.append({"strike_price": float(strike), "option_type": "CE", "open_interest": ce_oi})
+        rows.append({"strike_price": float(strike), "option_type": "PE", "open_interest": pe_oi})
+    return pd.DataFrame(rows)
+
+
 @unittest.skipIf(IntradayOIDeltaEngine is None, "oi delta dependencies unavailable")
 class TestIntradayOIDeltaEngine(unittest.TestCase):
     def test_default_response_shape(self):
@@ -20,5 +35,90 @@ class TestIntradayOIDeltaEngine(unittest.TestCase):
         self.assertEqual(response["bearish_probability"], 50)
 
 
+@unittest.skipIf(IntradayOIDeltaEngine is None, "oi delta dependencies unavailable")
+class TestSnapshotCache(unittest.TestCase):
+    def setUp(self):
+        SnapshotCache.clear()
+        self.start = pytz.timezone("Asia/Kolkata").localize(datetime(2026, 2, 18, 10, 0))
+
+    def tearDown(self):
+        SnapshotCache.clear()
+
+    def test_ring_evicts_oldest(self):
+        for i in range(SnapshotCache.MAX_SNAPSHOTS + 2):
+            SnapshotCache.put("NSE:NIFTY50-INDEX", self.start + timedelta(minutes=3 * i), _oi_chain(1000, 1000))
+        times = SnapshotCache.recent_times("NSE:NIFTY50-INDEX", self.start + timedelta(hours=1), limit=10)
+        self.assertEqual(len(times), SnapshotCache.MAX_SNAPSHOTS)
+        self.assertEqual(times[0], self.start + timedelta(minutes=3 * (SnapshotCache.MAX_SNAPSHOTS + 1)))
+
+    def test_oi_delta_served_from_cache(self):
+        symbol = "NSE:NIFTY50-INDEX"
+        for i, (ce, pe) in enumerate([(1000, 1000), (1100, 1000), (1300, 900)]):
+            SnapshotCache.put(symbol, self.start + timedelta(minutes=3 * i), _oi_chain(ce, pe))
+
+        with patch.object(IntradayOIDeltaEngine, "_fetch_snapshot_times", side_effect=AssertionError("db hit")), patch.object(
+            IntradayOIDeltaEngine, "fetch_snapshot_by_time", side_effect=AssertionError("db hit")
+        ):
+            result = IntradayOIDeltaEngine.calculate_oi_delta(symbol, self.start + timedelta(minutes=6), spot=22010.0)
+
+        self.assertEqual(result["ce_delta"], 7 * 200)
+        self.assertEqual(result["pe_delta"], -7 * 100)
+        self.assertEqual(result["classification"], "Call Writing Dominant")
+        self.assertNotEqual(result["acceleration_direction"], "N/A")
+
+    def test_falls_back_to_db_after_restart(self):
+        symbol = "NSE:NIFTY50-INDEX"
+        current = self.start + timedelta(minutes=3)
+        SnapshotCache.put(symbol, current, _oi_chain(1100, 1000))
+
+        with patch.object(IntradayOIDeltaEngine, "_fetch_snapshot_times", return_value=[current, self.start]), patch.object(
+            IntradayOIDeltaEngine, "fetch_snapshot_by_time", return_value=_oi_chain(1000, 1000)
+        ) as fetch:
+            result = IntradayOIDeltaEngine.calculate_oi_delta(symbol, current, spot=22010.0)
+
+        fetch.assert_called_once_with(symbol, self.start)
+        self.assertEqual(result["ce_delta"], 7 * 100)
+
+
+
+@unittest.skipIf(IntradayOIDeltaEngine is None, "oi delta dependencies unavailable")
+class TestBaselineOICache(unittest.TestCase):
+    SYMBOL = "NSE:NIFTY50-INDEX"
+
+    def setUp(self):
+        BaselineOICache.clear()
+        self.open = pytz.timezone("Asia/Kolkata").localize(datetime(2026, 2, 18, 9, 15))
+
+    def tearDown(self):
+        BaselineOICache.clear()
+
+    def _baseline_rows(self, snapshot_time):
+        return _oi_chain(1000, 2000).assign(baseline_snapshot_time=snapshot_time)
+
+    def test_loaded_once_per_day_and_replaced_on_day_roll(self):
+        with patch.object(
+            MarketContextRepository, "fetch_open_oi_by_strike", return_value=self._baseline_rows(self.open)
+        ) as fetch:
+            for minutes in (3, 6, 9):
+                ce, pe = BaselineOICache.get(self.SYMBOL, self.open + timedelta(minutes=minutes))
+            self.assertEqual(fetch.call_count, 1)
+            self.assertEqual(ce[22000.0], 1000.0)
+            self.assertEqual(pe[22000.0], 2000.0)
+
+            BaselineOICache.get(self.SYMBOL, self.open + timedelta(days=1, minutes=3))
+            self.assertEqual(fetch.call_count, 2)
+
+    def test_first_chain_of_day_seeds_empty_baseline(self):
+        with patch.object(MarketContextRepository, "fetch_open_oi_by_strike", return_value=pd.DataFrame()):
+            ce, pe = BaselineOICache.get(self.SYMBOL, self.open)
+        self.assertEqual((len(ce), len(pe)), (0, 0))
+
+        BaselineOICache.observe(self.SYMBOL, self.open, _oi_chain(1500, 2500))
+        with patch.object(MarketContextRepository, "fetch_open_oi_by_strike", side_effect=AssertionError("db hit")):
+            ce, pe = BaselineOICache.get(self.SYMBOL, self.open + timedelta(minutes=3))
+        self.assertEqual(ce[21850.0], 1500.0)
+        self.assertEqual(pe[22150.0], 2500.0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+from datetime import datetime
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import numpy as np
+    import pandas as pd
+    from analytics.option_geeks_engine import OptionGeeksEngine
+    from analytics.dynamic_otm_selector import DynamicOTMSelector
+    from analytics.implied_volatility_engine import ImpliedVolatilityEngine
+except Exception:
+    np = None
+    OptionGeeksEngine = None
+
+
+def _chain(spot: float = 22000.0, step: int = 50, count: int = 20):
+    rows = []
+    for i in range(-count, count + 1):
+        strike = spot + i * step
+        for opt in ("CE", "PE"):
+            intrinsic = max(0.0, spot - strike) if opt == "CE" else max(0.0, strike - spot)
+            rows.append(
+                {
+                    "strike_price": strike,
+                    "option_type": opt,
+                    "open_interest": 100000 + 1000 * abs(i),
+                    "volume": 5000 + 100 * (count - abs(i)),
+                    "ltp": intrinsic + max(2.0, 120.0 - 4.0 * abs(i)),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+@unittest.skipIf(OptionGeeksEngine is None, "numpy/pandas or analytics dependencies unavailable")
+class TestVectorizedGreeks(unittest.TestCase):
+    def test_matches_scalar_kernel(self):
+        strikes = np.arange(20000.0, 24050.0, 50.0)
+        for is_call in (True, False):
+            vec = OptionGeeksEngine._bs_greeks_vectorized(  # noqa: SLF001
+                spot=22010.0,
+                strikes=strikes,
+                time_years=4 / 365.0,
+                sigma=0.16,
+                is_call=np.full(len(strikes), is_call),
+            )
+            for i, strike in enumerate(strikes):
+                scalar = OptionGeeksEngine._bs_greeks(  # noqa: SLF001
+                    spot=22010.0,
+                    strike=float(strike),
+                    time_years=4 / 365.0,
+                    sigma=0.16,
+                    option_type="CE" if is_call else "PE",
+                )
+                for key in ("delta", "gamma", "theta", "vega"):
+                    self.assertAlmostEqual(float(vec[key][i]), scalar[key], delta=1e-6 * max(1.0, abs(scalar[key])))
+
+    def test_analyze_and_select_run_on_chain(self):
+        df = _chain()
+        result = OptionGeeksEngine.analyze(
+            df=df,
+            spot=22000.0,
+            atm=22000.0,
+            breakout_signal="Bullish Breakout",
+            snapshot_time=datetime(2026, 2, 20, 10, 0),
+        )
+        self.assertIn("delta_exposure", result["metrics"])
+
+        pick = DynamicOTMSelector.select(
+            df=df,
+            spot=22000.0,
+            atm=22000.0,
+            side="CE",
+            breakout_signal="Bullish Breakout",
+            regime="TREND",
+            snapshot_time=datetime(2026, 2, 20, 10, 0),
+        )
+        self.assertIsNotNone(pick["strike"])
+        self.assertGreaterEqual(pick["strike"], 22000.0)
+
+
+@unittest.skipIf(OptionGeeksEngine is None, "numpy/pandas or analytics dependencies unavailable")
+class TestImpliedVolatility(unittest.TestCase):
+    def test_recovers_smile_from_prices(self):
+        spot = 22000.0
+        strikes = np.arange(21000.0, 23050.0, 50.0)
+        true_sigma = 0.13 + 0.5 * ((strikes - spot) / spot) ** 2
+        for is_call in (True, False):
+            calls = np.full(len(strikes), is_call)
+            prices, _ = ImpliedVolatilityEngine._bs_price_and_vega(  # noqa: SLF001
+                spot, strikes, np.full(len(strikes), 7 / 365.0), true_sigma, calls, 0.05
+            )
+            solved = ImpliedVolatilityEngine.solve(spot, strikes, prices, 7 / 365.0, calls)
+            ok = np.isfinite(solved)
+            self.assertGreater(ok.sum(), len(strikes) // 2)
+            np.testing.assert_allclose(solved[ok], true_sigma[ok], atol=1e-3)
+
+    def test_rejects_prices_outside_arbitrage_bounds(self):
+        solved = ImpliedVolatilityEngine.solve(
+            spot=22000.0,
+            strikes=np.array([21000.0, 23000.0]),
+            prices=np.array([500.0, 25000.0]),
+            time_years=7 / 365.0,
+            is_call=np.array([True, True]),
+        )
+        self.assertTrue(np.isnan(solved).all())
+
+    def test_smile_feeds_greeks_and_warm_starts(self):
+        df = _chain()
+        df["symbol"] = "TEST:IV"
+        snapshot_time = datetime(2026, 2, 20, 10, 0)
+        df["iv_solved"] = ImpliedVolatilityEngine.smile_for_chain(df, 22000.0, snapshot_time=snapshot_time)
+        self.assertTrue(df["iv_solved"].notna().any())
+        self.assertIn("TEST:IV", ImpliedVolatilityEngine._surfaces)  # noqa: SLF001
+
+        again = ImpliedVolatilityEngine.smile_for_chain(df, 22000.0, snapshot_time=snapshot_time)
+        np.testing.assert_allclose(again, df["iv_solved"].to_numpy(), atol=1e-3, equal_nan=True)
+
+        result = OptionGeeksEngine.analyze(
+            df=df,
+            spot=22000.0,
+            atm=22000.0,
+            breakout_signal="Bullish Breakout",
+            snapshot_time=snapshot_time,
+        )
+        self.assertIn("sigma_proxy", result["metrics"])
+
+    def test_solved_iv_fills_only_missing_vendor_rows(self):
+        df = pd.DataFrame(
+            {
+                "iv": [15.0, np.nan, np.nan, 0.2],
+                "iv_solved": [0.5, 1.8, np.nan, np.nan],
+            }
+        )
+        # Vendor percent converted; a solved 1.8 stays a decimal vol.
+        np.testing.assert_allclose(OptionGeeksEngine._row_sigma(df, 0.3), [0.15, 1.8, 0.3, 0.2])  # noqa: SLF001
+
+
+if __name__ == "__main__":
+    unittest.main()
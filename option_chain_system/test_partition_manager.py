@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from datetime import date
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import pandas as pd
+    from database.cleanup_manager import CleanupManager
+    from database.partition_manager import PartitionManager, pkey_pattern
+except Exception:
+    PartitionManager = None
+
+
+@unittest.skipIf(PartitionManager is None, "partition dependencies unavailable")
+class TestPartitionManager(unittest.TestCase):
+    def test_weekly_partitions_start_on_monday(self):
+        cursor = MagicMock()
+        with patch.object(PartitionManager, "partitions", return_value=[]):
+            created = PartitionManager.ensure_partitions(
+                cursor, "option_chain_snapshot", date(2026, 2, 18), date(2026, 3, 1), 7
+            )
+
+        self.assertEqual(created, ["option_chain_snapshot_p20260216", "option_chain_snapshot_p20260223"])
+        lower, upper = cursor.execute.call_args_list[0].args[1]
+        self.assertEqual((lower.date(), upper.date(), lower.hour), (date(2026, 2, 16), date(2026, 2, 23), 0))
+
+    def test_only_fully_aged_partitions_are_dropped(self):
+        cursor = MagicMock()
+        bounds = [
+            (f"option_chain_snapshot_p202602{d:02d}", pd.Timestamp(f"2026-02-{d:02d} 00:00+05:30"),
+             pd.Timestamp(f"2026-02-{d + 1:02d} 00:00+05:30"))
+            for d in (16, 17, 18)
+        ]
+        with patch.object(PartitionManager, "partitions", return_value=bounds):
+            dropped = PartitionManager.drop_partitions_before(
+                cursor, "option_chain_snapshot", pd.Timestamp("2026-02-17 15:30+05:30")
+            )
+
+        self.assertEqual(dropped, ["option_chain_snapshot_p20260216"])
+        cursor.execute.assert_called_once_with("DROP TABLE IF EXISTS option_chain_snapshot_p20260216")
+
+    def test_pkey_pattern_matches_partition_keys(self):
+        pattern = pkey_pattern("option_chain_snapshot")
+        self.assertIsNotNone(pattern.search('unique constraint "option_chain_snapshot_pkey"'))
+        self.assertIsNotNone(pattern.search('unique constraint "option_chain_snapshot_p20260218_pkey"'))
+        self.assertIsNone(pattern.search('unique constraint "option_chain_summary_pkey"'))
+
+    def test_cleanup_drops_partitions_before_deleting(self):
+        cursor = MagicMock()
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        with patch("database.cleanup_manager.DatabaseConnection") as db, patch.object(
+            PartitionManager, "partitioned_tables", return_value={"option_chain_snapshot"}
+        ), patch.object(PartitionManager, "drop_partitions_before", return_value=["p"]) as drop, patch.object(
+            PartitionManager, "maintain", return_value=[]
+        ) as maintain:
+            db.get_connection.return_value = conn
+            CleanupManager.cleanup_old_data()
+
+        self.assertEqual([call.args[1] for call in drop.call_args_list], ["option_chain_snapshot"])
+        maintain.assert_called_once_with(cursor)
+        deletes = [call.args[0] for call in cursor.execute.call_args_list if "DELETE" in call.args[0]]
+        self.assertEqual(len(deletes), 6)
+        conn.commit.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import numpy as np
+    import pandas as pd
+    import pytz
+    from analytics.implied_volatility_engine import ImpliedVolatilityEngine
+    from backtesting.pipeline_replay import PipelineReplay, SIGNAL_COLUMNS
+    from backtesting.walk_forward_backtester import BacktestConfig
+except Exception:
+    PipelineReplay = None
+
+SYMBOL = "NSE:NIFTY50-INDEX"
+
+
+def _synthetic_day(seed: int = 0, steps: int = 38, drift: float = 12.0):
+    # Trending spot with put writing and call unwinding, chains priced off Black-Scholes.
+    rng = np.random.default_rng(seed)
+    start = pytz.timezone("Asia/Kolkata").localize(datetime(2026, 2, 18, 9, 15))
+    strikes = np.arange(21000.0, 23050.0, 50.0)
+    ce_oi = rng.uniform(5e4, 2e5, len(strikes))
+    pe_oi = rng.uniform(5e4, 2e5, len(strikes))
+    spot = 22000.0
+    chains, spots = [], []
+    for i in range(steps):
+        snapshot_time = start + timedelta(minutes=10 * i)
+        spot += drift + rng.normal(0, 15)
+        ce_oi = np.maximum(0, ce_oi + rng.normal(-2000, 3000, len(strikes)))
+        pe_oi = np.maximum(0, pe_oi + rng.normal(4000, 3000, len(strikes)))
+        for option_type, oi in (("CE", ce_oi), ("PE", pe_oi)):
+            prices, _ = ImpliedVolatilityEngine._bs_price_and_vega(  # noqa: SLF001
+                spot, strikes, 5 / 365, np.full(len(strikes), 0.15), option_type == "CE", 0.05
+            )
+            chains.append(
+                pd.DataFrame(
+                    {
+                        "snapshot_time": snapshot_time,
+                        "strike_price": strikes,
+                        "option_type": option_type,
+                        "open_interest": np.round(oi),
+                        "oi_change": 0.0,
+                        "volume": rng.integers(100, 50000, len(strikes)).astype(float),
+                        "ltp": np.maximum(0.05, np.round(prices, 2)),
+                    }
+                )
+            )
+        spots.append({"snapshot_time": snapshot_time, "spot_price": spot})
+    snapshots = pd.concat(chains, ignore_index=True).assign(symbol=SYMBOL)
+    return snapshots, pd.DataFrame(spots)
+
+
+@unittest.skipIf(PipelineReplay is None, "replay dependencies unavailable")
+class TestPipelineReplay(unittest.TestCase):
+    def setUp(self):
+        self.snapshots, self.spots = _synthetic_day()
+
+    @patch("analytics.intraday_oi_engine.DatabaseConnection")
+    @patch("database.market_context_repository.DatabaseConnection")
+    def test_replay_runs_from_memory(self, *dbs):
+        for db in dbs:
+            db.get_connection.side_effect = AssertionError("db hit")
+
+        signals = PipelineReplay.replay(SYMBOL, self.snapshots, self.spots)
+
+        self.assertEqual(list(signals.columns), SIGNAL_COLUMNS)
+        self.assertGreater(len(signals), 0)
+        self.assertTrue(signals["snapshot_time"].is_monotonic_increasing)
+        self.assertTrue((signals["entry_ltp"] > 0).all())
+
+    def test_signals_do_not_depend_on_later_snapshots(self):
+        full = PipelineReplay.replay(SYMBOL, self.snapshots, self.spots)
+        cutoff = full["snapshot_time"].iloc[0]
+        partial = PipelineReplay.replay(SYMBOL, self.snapshots[self.snapshots["snapshot_time"] <= cutoff], self.spots)
+
+        expected = full[full["snapshot_time"] <= cutoff].reset_index(drop=True)
+        pd.testing.assert_frame_equal(partial, expected)
+
+    def test_run_backtests_replayed_signals(self):
+        with patch.object(PipelineReplay, "load", return_value=(self.snapshots, self.spots)) as load:
+            result = PipelineReplay.run(SYMBOL, "2026-02-18", "2026-02-18", BacktestConfig())
+
+        load.assert_called_once_with(SYMBOL, "2026-02-18", "2026-02-18")
+        self.assertEqual(result["snapshots"], 38)
+        self.assertGreater(result["signals"], 0)
+        self.assertEqual(result["trades"], result["signals"])
+
+    def test_ltp_paths_stay_inside_trade_window(self):
+        entry = self.snapshots["snapshot_time"].iloc[0]
+        trades = pd.DataFrame(
+            {
+                "trade_idx": [0],
+                "side": ["CE"],
+                "strike_price": [22100.0],
+                "snapshot_time": [entry],
+                "until_time": [entry + timedelta(minutes=30)],
+            }
+        )
+        paths = PipelineReplay.ltp_paths(trades, self.snapshots)
+
+        self.assertEqual(len(paths), 4)
+        self.assertEqual(paths["snapshot_time"].iloc[0], entry)
+        self.assertTrue(paths["snapshot_time"].is_monotonic_increasing)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from datetime import datetime
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import pytz
+    from database.market_context_repository import MarketContextRepository
+    from database.query_audit import QueryAudit, _INDEX_TARGET_RE
+except Exception:
+    QueryAudit = None
+
+
+def _explain(plan: dict, ms: float = 1.0) -> list:
+    return [{"Plan": plan, "Execution Time": ms}]
+
+
+@unittest.skipIf(QueryAudit is None, "query audit dependencies unavailable")
+class TestQueryAudit(unittest.TestCase):
+    def test_plan_problems_are_reported(self):
+        good = _explain({"Node Type": "Nested Loop", "Plans": [
+            {"Node Type": "Function Scan"},
+            {"Node Type": "Index Only Scan", "Index Name": "idx_snapshot_contract_time",
+             "Relation Name": "option_chain_snapshot"},
+        ]})
+        bad = _explain({"Node Type": "Hash Join", "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "option_chain_snapshot"},
+        ]})
+
+        self.assertEqual(QueryAudit.summarize_plan("paths", good, "idx_snapshot_contract_time")["problems"], [])
+        self.assertEqual(
+            QueryAudit.summarize_plan("paths", bad, "idx_snapshot_contract_time")["problems"],
+            ["seq scan on option_chain_snapshot", "idx_snapshot_contract_time not used"],
+        )
+
+    def test_timing_regression_needs_factor_and_floor(self):
+        rows = [
+            {"name": "a", "execution_ms": 3.0, "problems": []},
+            {"name": "b", "execution_ms": 30.0, "problems": []},
+            {"name": "c", "execution_ms": 30.0, "problems": []},
+        ]
+        QueryAudit.compare(rows, {"a": 1.0, "b": 10.0, "c": 20.0})
+
+        self.assertEqual([bool(row["problems"]) for row in rows], [False, True, False])
+
+    def test_index_definitions_retarget_session_tables(self):
+        indexdef = "CREATE INDEX idx_snapshot_symbol_time ON ONLY public.option_chain_snapshot USING btree (symbol)"
+        self.assertEqual(
+            _INDEX_TARGET_RE.sub(r"ON \1", indexdef, count=1),
+            "CREATE INDEX idx_snapshot_symbol_time ON option_chain_snapshot USING btree (symbol)",
+        )
+
+    @patch("database.market_context_repository.DatabaseConnection")
+    def test_open_oi_window_is_a_plain_time_range(self, db):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        db.get_connection.return_value.cursor.return_value = cursor
+        upto = pytz.utc.localize(datetime(2026, 2, 18, 6, 0))
+
+        MarketContextRepository.fetch_open_oi_by_strike("NSE:NIFTY50-INDEX", upto)
+
+        sql, params = cursor.execute.call_args.args
+        self.assertNotIn("AT TIME ZONE", sql)
+        opened = params[1].astimezone(pytz.timezone("Asia/Kolkata"))
+        self.assertEqual((opened.date(), opened.hour, opened.minute), (upto.date(), 9, 15))
+        self.assertEqual(params[2], upto)
+
+
+if __name__ == "__main__":
+    unittest.main()
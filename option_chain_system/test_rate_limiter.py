@@ -0,0 +1,121 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    from data_layer.rate_limiter import RequestGovernor, TokenBucket
+    from monitoring import metrics
+except Exception:
+    RequestGovernor = None
+
+RATE_LIMITED = {"s": "error", "code": 429, "message": "request limit reached"}
+
+
+@unittest.skipIf(RequestGovernor is None, "rate limiter dependencies unavailable")
+class TestTokenBucket(unittest.TestCase):
+    def test_per_minute_bucket_refills_slowly(self):
+        bucket = TokenBucket(rate=3 / 60.0, capacity=3, now=0.0)
+        bucket.tokens -= 3
+
+        bucket.refill(10.0)
+        self.assertAlmostEqual(bucket.wait_time(), 10.0)
+        bucket.refill(1000.0)
+        self.assertEqual(bucket.tokens, 3)
+
+
+@unittest.skipIf(RequestGovernor is None, "rate limiter dependencies unavailable")
+class TestRequestGovernor(unittest.TestCase):
+    def test_burst_beyond_budget_is_throttled(self):
+        governor = RequestGovernor(per_second=5, per_minute=0)
+        before = metrics.FYERS_THROTTLED_SECONDS.value(endpoint="test_burst")
+
+        started = time.perf_counter()
+        for _ in range(8):
+            governor.acquire("test_burst")
+        elapsed = time.perf_counter() - started
+
+        # Five tokens up front, then one every 0.2s.
+        self.assertGreater(elapsed, 0.5)
+        self.assertLess(elapsed, 1.2)
+        self.assertGreater(metrics.FYERS_THROTTLED_SECONDS.value(endpoint="test_burst"), before + 0.5)
+
+    def test_spot_quotes_jump_queued_chains(self):
+        governor = RequestGovernor(per_second=4, per_minute=0)
+        for _ in range(4):
+            governor.acquire("drain")
+        order = []
+
+        def _take(name, priority):
+            governor.acquire(name, priority)
+            order.append(name)
+
+        threads = [threading.Thread(target=_take, args=(f"chain{i}", RequestGovernor.PRIORITY_CHAIN)) for i in range(2)]
+        for t in threads:
+            t.start()
+            time.sleep(0.01)
+        threads.append(threading.Thread(target=_take, args=("spot", RequestGovernor.PRIORITY_SPOT)))
+        threads[-1].start()
+        for t in threads:
+            t.join(timeout=5)
+
+        self.assertEqual(order, ["spot", "chain0", "chain1"])
+
+    def test_rate_limited_calls_retry_then_give_up(self):
+        governor = RequestGovernor(per_second=0, per_minute=0, max_retries=2, backoff_seconds=0.01)
+        responses = [RATE_LIMITED, RATE_LIMITED, {"s": "ok"}]
+        before = metrics.FYERS_RATE_LIMITED.value(endpoint="test_retry")
+
+        self.assertEqual(governor.call("test_retry", RequestGovernor.PRIORITY_SPOT, lambda: responses.pop(0)), {"s": "ok"})
+        self.assertEqual(metrics.FYERS_RATE_LIMITED.value(endpoint="test_retry"), before + 2)
+
+        calls = []
+        result = governor.call("test_retry", RequestGovernor.PRIORITY_SPOT, lambda: calls.append(1) or RATE_LIMITED)
+        self.assertEqual(result, RATE_LIMITED)
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        governor = RequestGovernor(per_second=0, per_minute=0, max_retries=3, backoff_seconds=0.01)
+        calls = []
+        invalid = {"s": "error", "code": -300, "message": "invalid symbol"}
+
+        self.assertEqual(governor.call("test_invalid", RequestGovernor.PRIORITY_CHAIN, lambda: calls.append(1) or invalid), invalid)
+        self.assertEqual(len(calls), 1)
+
+    def test_async_callers_share_the_budget(self):
+        governor = RequestGovernor(per_second=2, per_minute=0)
+        governor.acquire("drain")
+        governor.acquire("drain")
+
+        async def _request():
+            return {"s": "ok"}
+
+        async def _run():
+            return await asyncio.gather(
+                *(governor.call_async("test_async", RequestGovernor.PRIORITY_CHAIN, _request) for _ in range(2))
+            )
+
+        started = time.perf_counter()
+        self.assertEqual(asyncio.run(_run()), [{"s": "ok"}, {"s": "ok"}])
+        self.assertGreater(time.perf_counter() - started, 0.8)
+
+    def test_cancelled_async_waiter_leaves_the_queue(self):
+        governor = RequestGovernor(per_second=1, per_minute=0)
+        governor.acquire("drain")
+
+        async def _run():
+            task = asyncio.ensure_future(governor.acquire_async("test_cancel"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(_run())
+        self.assertEqual(governor._waiting, [])  # noqa: SLF001
+
+
+if __name__ == "__main__":
+    unittest.main()
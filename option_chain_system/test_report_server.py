@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+import asyncio
+import gzip
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    from reporting.report_server import ReportServer
+    from reporting.report_web_store import ReportWebStore
+except Exception:
+    ReportServer = None
+
+
+async def _request(port: int, path: str, headers: dict | None = None) -> tuple[int, dict, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"GET {path} HTTP/1.1", "Host: localhost", "Connection: close"]
+    lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode().split("\r\n")
+    response_headers = {k.lower(): v.strip() for k, v in (line.split(":", 1) for line in header_lines)}
+    return int(status_line.split()[1]), response_headers, body
+
+
+@unittest.skipIf(ReportServer is None, "report server dependencies unavailable")
+class TestReportServer(unittest.TestCase):
+    def setUp(self):
+        self.base = Path(tempfile.mkdtemp())
+        patcher = patch.object(ReportWebStore, "_base_dir", return_value=self.base)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        ReportWebStore._catalog = None  # noqa: SLF001
+        self.addCleanup(setattr, ReportWebStore, "_catalog", None)
+        ReportWebStore.save_report("NSE:NIFTY50-INDEX", "Report A", "<p>" + "chain row " * 400 + "</p>")
+
+    def _run(self, scenario):
+        async def main():
+            server = ReportServer(root=self.base, poll_interval=0.05)
+            await server.start("127.0.0.1", 0)
+            try:
+                return await scenario(server.port)
+            finally:
+                await server.stop()
+
+        return asyncio.run(main())
+
+    def test_etag_revalidation_and_gzip(self):
+        async def scenario(port):
+            first = await _request(port, "/index.html", {"Accept-Encoding": "gzip"})
+            second = await _request(port, "/index.html", {"Accept-Encoding": "gzip", "If-None-Match": first[1]["etag"]})
+            identity = await _request(port, "/index.html", {"If-None-Match": first[1]["etag"]})
+            return first, second, identity
+
+        (status, headers, body), (status_304, _, body_304), identity = self._run(scenario)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-encoding"], "gzip")
+        # The gzip body carries its own ETag, so it never revalidates an identity request.
+        self.assertTrue(headers["etag"].endswith('-gz"'))
+        self.assertEqual(identity[0], 200)
+        self.assertNotEqual(identity[1]["etag"], headers["etag"])
+        self.assertIn(b"Option Chain Report Viewer", gzip.decompress(body))
+        self.assertEqual(status_304, 304)
+        self.assertEqual(body_304, b"")
+
+    def test_api_lists_rows_and_rejects_traversal(self):
+        async def scenario(port):
+            return (
+                await _request(port, "/api/latest?symbol=NSE:NIFTY50-INDEX"),
+                await _request(port, "/api/latest?symbol=UNKNOWN"),
+                await _request(port, "/../../etc/passwd"),
+            )
+
+        latest, missing, traversal = self._run(scenario)
+        self.assertEqual(latest[0], 200)
+        self.assertEqual(json.loads(latest[2])["row"]["subject"], "Report A")
+        self.assertEqual(missing[0], 404)
+        self.assertEqual(traversal[0], 404)
+
+    def test_metrics_include_scheduler_textfile(self):
+        textfile = self.base / "scheduler.prom"
+        textfile.write_text("# TYPE oc_cycle_duration_seconds histogram\noc_cycle_duration_seconds_count 7\n")
+
+        async def scenario(port):
+            await _request(port, "/api/latest?symbol=UNKNOWN")
+            return await _request(port, "/metrics")
+
+        with patch("monitoring.metrics.textfile_path", return_value=textfile):
+            status, headers, body = self._run(scenario)
+        text = body.decode()
+        self.assertEqual(status, 200)
+        self.assertTrue(headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('oc_http_requests_total{route="/api/latest",status="404"} 1', text)
+        self.assertIn("oc_cycle_duration_seconds_count 7", text)
+
+    def test_event_stream_announces_new_reports(self):
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /api/events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            preamble = await reader.readuntil(b"retry: 5000\n\n")
+            await asyncio.to_thread(ReportWebStore.save_report, "NSE:NIFTYBANK-INDEX", "Report B", "<p>b</p>")
+            event = await asyncio.wait_for(reader.readuntil(b"\n\n"), 5)
+            writer.close()
+            rows = await _request(port, "/api/reports")
+            return preamble, event, rows
+
+        preamble, event, (status, _, body) = self._run(scenario)
+        self.assertIn(b"X-Accel-Buffering: no", preamble)
+        self.assertIn(b"event: report", event)
+        self.assertIn(b"Report B", event)
+        self.assertCountEqual([row["subject"] for row in json.loads(body)["rows"]], ["Report A", "Report B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    from reporting.report_web_store import ReportWebStore, fcntl
+except Exception:
+    ReportWebStore = None
+
+
+@unittest.skipIf(ReportWebStore is None, "report store dependencies unavailable")
+class TestReportManifest(unittest.TestCase):
+    def setUp(self):
+        self.base = Path(tempfile.mkdtemp())
+        patcher = patch.object(ReportWebStore, "_base_dir", return_value=self.base)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        ReportWebStore._catalog = None  # noqa: SLF001
+        self.addCleanup(setattr, ReportWebStore, "_catalog", None)
+
+    def _manifest(self) -> list[dict]:
+        lines = (self.base / ReportWebStore.MANIFEST_NAME).read_text(encoding="utf-8").splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_save_appends_without_backfill_or_pruning(self):
+        with patch.object(ReportWebStore, "_backfill_from_database", side_effect=AssertionError("backfill")), patch.object(
+            ReportWebStore, "_prune_history_to_today", side_effect=AssertionError("prune")
+        ):
+            ReportWebStore.save_report("NSE:NIFTY50-INDEX", "Report A", "<p>a</p>")
+            ReportWebStore.save_report("NSE:NIFTYBANK-INDEX", "Report B", "<p>b</p>")
+
+        self.assertEqual([row["subject"] for row in self._manifest()], ["Report A", "Report B"])
+        index = (self.base / "index.html").read_text(encoding="utf-8")
+        self.assertIn("NSE:NIFTY50-INDEX", index)
+        self.assertIn("NSE:NIFTYBANK-INDEX", index)
+
+    def test_maintain_compacts_to_today_and_limit(self):
+        today = ReportWebStore._today_key()  # noqa: SLF001
+        stale = {"symbol": "NSE:NIFTY50-INDEX", "path": "history/NSE_NIFTY50-INDEX/20200101_100000.html",
+                 "generated_at_iso": "2020-01-01T10:00:00+05:30"}
+        fresh = [
+            {"symbol": "NSE:NIFTY50-INDEX", "path": f"history/NSE_NIFTY50-INDEX/{today}_1000{i:02d}.html",
+             "generated_at_iso": f"{today}T10:00:{i:02d}"}
+            for i in range(4)
+        ]
+        ReportWebStore._append_manifest(self.base, [stale] + fresh + [fresh[0]])  # noqa: SLF001
+
+        with patch.object(ReportWebStore, "_backfill_from_database", return_value=[]) as backfill, patch.object(
+            ReportWebStore, "_history_limit", return_value=3
+        ):
+            ReportWebStore.maintain()
+
+        backfill.assert_called_once()
+        self.assertEqual([row["path"] for row in self._manifest()], [row["path"] for row in fresh[1:]])
+
+
+    @unittest.skipIf(ReportWebStore is None or fcntl is None, "advisory file locks unavailable")
+    def test_append_from_another_process_during_compaction_is_kept(self):
+        today = ReportWebStore._today_key()  # noqa: SLF001
+        first = {"symbol": "NSE:NIFTY50-INDEX", "path": f"history/NSE_NIFTY50-INDEX/{today}_100000.html",
+                 "generated_at_iso": f"{today}T10:00:00"}
+        late = {"symbol": "NSE:NIFTYBANK-INDEX", "path": f"history/NSE_NIFTYBANK-INDEX/{today}_100500.html",
+                "generated_at_iso": f"{today}T10:05:00"}
+        ReportWebStore._append_manifest(self.base, [first])  # noqa: SLF001
+        read_manifest = ReportWebStore._read_manifest  # noqa: SLF001
+        reads, writers = [], []
+
+        def _read_then_append_elsewhere(base):
+            rows = read_manifest(base)
+            reads.append(1)
+            if len(reads) == 1:
+                return rows  # catalog load, before compaction
+            # Another process saves a report between compaction's read and replace.
+            writer = multiprocessing.get_context("fork").Process(
+                target=ReportWebStore._append_manifest, args=(self.base, [late])  # noqa: SLF001
+            )
+            writer.start()
+            writer.join(timeout=0.5)
+            writers.append(writer)
+            return rows
+
+        with patch.object(ReportWebStore, "_backfill_from_database", return_value=[]), patch.object(
+            ReportWebStore, "_read_manifest", side_effect=_read_then_append_elsewhere
+        ):
+            ReportWebStore.maintain()
+        writers[0].join(timeout=10)
+
+        self.assertEqual(writers[0].exitcode, 0)
+        self.assertEqual([row["path"] for row in self._manifest()], [first["path"], late["path"]])
+        self.assertEqual([p.name for p in self.base.glob("*.tmp")], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
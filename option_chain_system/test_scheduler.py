@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import scheduler as scheduler_module
+except Exception:
+    scheduler_module = None
+
+
+@unittest.skipIf(scheduler_module is None, "scheduler dependencies unavailable")
+class TestRunCycle(unittest.TestCase):
+    def tearDown(self):
+        # Abandoned workers from one test must not hold slots in the next.
+        for thread in list(scheduler_module._LIVE_SYMBOL_THREADS.values()):  # noqa: SLF001
+            thread.join(timeout=10)
+
+    def test_isolates_failures_and_timeouts(self):
+        release = threading.Event()
+
+        def fake_run(symbol, context=None):
+            if symbol == "BAD":
+                raise RuntimeError("boom")
+            if symbol == "SLOW":
+                release.wait(10)
+
+        with patch.object(scheduler_module, "run_option_chain", side_effect=fake_run):
+            results = scheduler_module.run_cycle(["OK", "BAD", "SLOW"], max_workers=3, timeout_seconds=1)
+            release.set()
+
+        by_symbol = {r["symbol"]: r for r in results}
+        self.assertEqual([r["symbol"] for r in results], ["OK", "BAD", "SLOW"])
+        self.assertEqual(by_symbol["OK"]["status"], "ok")
+        self.assertEqual(by_symbol["BAD"]["status"], "failed")
+        self.assertIn("boom", by_symbol["BAD"]["error"])
+        self.assertEqual(by_symbol["SLOW"]["status"], "timeout")
+
+    def test_abandoned_run_blocks_its_symbol_and_holds_a_slot(self):
+        release = threading.Event()
+        lock = threading.Lock()
+        calls, active, peak = [], set(), []
+
+        def fake_run(symbol, context=None):
+            calls.append(symbol)
+            if symbol == "HUNG":
+                release.wait(10)
+                return
+            with lock:
+                active.add(symbol)
+                peak.append(len(active))
+            time.sleep(0.3)
+            with lock:
+                active.discard(symbol)
+
+        with patch.object(scheduler_module, "run_option_chain", side_effect=fake_run):
+            first = scheduler_module.run_cycle(["HUNG"], max_workers=2, timeout_seconds=1)
+            second = scheduler_module.run_cycle(["HUNG", "A", "B"], max_workers=2, timeout_seconds=30)
+            release.set()
+
+        self.assertEqual(first[0]["status"], "timeout")
+        by_symbol = {r["symbol"]: r for r in second}
+        self.assertEqual(by_symbol["HUNG"]["status"], "still_running")
+        self.assertEqual(calls.count("HUNG"), 1)
+        self.assertEqual(by_symbol["A"]["status"], "ok")
+        self.assertEqual(by_symbol["B"]["status"], "ok")
+        # The hung run keeps one of two slots, so A and B never overlap.
+        self.assertEqual(max(peak), 1)
+
+    def test_symbols_run_concurrently(self):
+        # Each worker waits for all three to arrive; a serial pool breaks the barrier.
+        barrier = threading.Barrier(3, timeout=10)
+
+        with patch.object(scheduler_module, "run_option_chain", side_effect=lambda s, context=None: barrier.wait()):
+            results = scheduler_module.run_cycle(["A", "B", "C"], max_workers=3, timeout_seconds=30)
+
+        self.assertEqual([r["status"] for r in results], ["ok", "ok", "ok"])
+        self.assertFalse(barrier.broken)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from datetime import date, datetime
+from pathlib import Path
+import importlib.util
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import pandas as pd
+    import pytz
+    from config.settings import settings
+    from database.cleanup_manager import CleanupManager
+    from database.snapshot_archive import SnapshotArchive
+except Exception:
+    SnapshotArchive = None
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+SYMBOL = "NSE:NIFTY50-INDEX"
+
+
+@unittest.skipIf(SnapshotArchive is None, "archive dependencies unavailable")
+class TestArchiveBeforeCleanup(unittest.TestCase):
+    def _cleanup(self, export_day):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(date(2026, 2, 2),)]
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        with patch("database.cleanup_manager.DatabaseConnection") as db, patch.object(
+            settings, "ENABLE_SNAPSHOT_ARCHIVE", True
+        ), patch.object(SnapshotArchive, "export_day", side_effect=export_day):
+            db.get_connection.return_value = conn
+            CleanupManager.cleanup_old_data()
+        conn.commit.assert_called_once()
+        return [call.args for call in cursor.execute.call_args_list if "DELETE" in call.args[0]]
+
+    def test_failed_export_keeps_archived_tables(self):
+        deletes = self._cleanup(RuntimeError("disk full"))
+
+        self.assertEqual([sql for sql, _ in deletes], ["DELETE FROM scalp_score_tracking WHERE snapshot_time < %s"])
+
+    def test_export_then_delete_whole_days(self):
+        deletes = self._cleanup(lambda cursor, day: 4)
+
+        self.assertEqual(len(deletes), 6)
+        cutoff = deletes[0][1][0]
+        local = cutoff.astimezone(pytz.timezone(settings.TIMEZONE))
+        self.assertEqual((local.hour, local.minute), (0, 0))
+
+
+@unittest.skipIf(SnapshotArchive is None, "archive dependencies unavailable")
+class TestExportDayStreaming(unittest.TestCase):
+    def test_rows_stream_in_batches_and_flush_per_symbol(self):
+        rows = [("A", 1.0), ("A", 2.0), ("A", 3.0), ("B", 4.0), ("C", 5.0)]
+        stream = MagicMock()
+        stream.__enter__.return_value = stream
+        stream.description = [("symbol",), ("ltp",)]
+        batches = {}
+
+        def _execute(sql, params):
+            batches["pending"] = [rows[i:i + 2] for i in range(0, len(rows), 2)] + [[]]
+
+        stream.execute.side_effect = _execute
+        stream.fetchmany.side_effect = lambda size: batches["pending"].pop(0)
+        cursor = MagicMock()
+        cursor.connection.cursor.return_value = stream
+        written = []
+
+        datasets = {"option_chain_summary": {"query": "SELECT", "numeric": ("ltp",), "key": ("ltp",)}}
+        with patch("database.snapshot_archive.DATASETS", datasets), patch.object(
+            SnapshotArchive, "available", return_value=True
+        ), patch.object(
+            SnapshotArchive, "EXPORT_BATCH_ROWS", 2
+        ), patch.object(
+            SnapshotArchive, "write_partition", side_effect=lambda dataset, symbol, day, df: written.append((dataset, symbol, len(df)))
+        ):
+            count = SnapshotArchive.export_day(cursor, date(2026, 2, 2))
+
+        cursor.fetchall.assert_not_called()
+        self.assertIn("name", cursor.connection.cursor.call_args.kwargs)
+        self.assertEqual(count, 3)
+        self.assertEqual(written, [("option_chain_summary", "A", 3), ("option_chain_summary", "B", 1), ("option_chain_summary", "C", 1)])
+
+
+@unittest.skipIf(SnapshotArchive is None or not HAS_PYARROW, "pyarrow unavailable")
+class TestSnapshotArchiveRoundTrip(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(SnapshotArchive, "root", return_value=Path(tempfile.mkdtemp()))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _chain(day: int, ltp: float) -> pd.DataFrame:
+        tz = pytz.timezone(settings.TIMEZONE)
+        return pd.DataFrame(
+            {
+                "snapshot_time": [tz.localize(datetime(2026, 2, day, 9, 15))] * 2,
+                "strike_price": [22000.0, 22000.0],
+                "option_type": ["CE", "PE"],
+                "open_interest": [100.0, 200.0],
+                "oi_change": [0.0, 0.0],
+                "volume": [10.0, 20.0],
+                "ltp": [ltp, ltp],
+            }
+        )
+
+    def test_merge_reads_range_and_prefers_live_rows(self):
+        for day in (2, 3, 4):
+            SnapshotArchive.write_partition("option_chain_snapshot", SYMBOL, date(2026, 2, day), self._chain(day, 1.0))
+        live = self._chain(3, 9.0).assign(symbol=SYMBOL)
+        columns = list(self._chain(3, 0.0).columns) + ["symbol"]
+
+        merged = SnapshotArchive.merge("option_chain_snapshot", SYMBOL, "2026-02-02", "2026-02-03", live, columns)
+
+        self.assertEqual(list(merged.columns), columns)
+        self.assertEqual(len(merged), 4)
+        self.assertTrue(merged["snapshot_time"].is_monotonic_increasing)
+        self.assertEqual(merged["ltp"].tolist(), [1.0, 1.0, 9.0, 9.0])
+        self.assertTrue((merged["symbol"] == SYMBOL).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from datetime import datetime, timedelta
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import pytz
+    from database.snapshot_batch_repository import SnapshotBatchRepository, nearest_time_params
+    from historical_test_runner import HistoricalTestRunner
+except Exception:
+    SnapshotBatchRepository = None
+
+SYMBOL = "NSE:NIFTY50-INDEX"
+
+
+@unittest.skipIf(SnapshotBatchRepository is None, "runner dependencies unavailable")
+class TestExactSnapshotAddressing(unittest.TestCase):
+    def setUp(self):
+        self.target = pytz.timezone("Asia/Kolkata").localize(datetime(2026, 2, 20, 10, 2))
+        self.batch_time = self.target - timedelta(minutes=2)
+
+    def test_nearest_window_params(self):
+        params = nearest_time_params(SYMBOL, self.target)
+
+        self.assertEqual(params[1:3], (self.target, self.target - timedelta(minutes=5)))
+        self.assertEqual(params[4:6], (self.target, self.target + timedelta(minutes=5)))
+
+    @patch("historical_test_runner.DatabaseConnection")
+    def test_fetch_snapshot_loads_only_the_resolved_batch(self, db):
+        cursor = db.get_connection.return_value.cursor.return_value
+        cursor.fetchone.return_value = (7, self.batch_time)
+        cursor.fetchall.return_value = [
+            (22000, "CE", 100, 10, 50.5, self.batch_time),
+            (22000, "PE", 200, 20, 40.0, self.batch_time),
+        ]
+
+        df = HistoricalTestRunner.fetch_snapshot(SYMBOL, self.target)
+
+        self.assertEqual(len(df), 2)
+        sql, params = cursor.execute.call_args[0]
+        self.assertIn("WHERE batch_id = %s", sql)
+        self.assertNotIn("LIMIT", sql)
+        self.assertEqual(params, (7, self.batch_time))
+
+    @patch("historical_test_runner.DatabaseConnection")
+    def test_previous_snapshot_is_one_row_per_contract(self, db):
+        cursor = db.get_connection.return_value.cursor.return_value
+        cursor.fetchone.return_value = (6, self.batch_time - timedelta(minutes=3))
+        cursor.fetchall.return_value = [(22000, "CE", 90), (22000, "CE", 95), (22000, "PE", 180)]
+
+        df = HistoricalTestRunner.fetch_previous_snapshot(SYMBOL, self.batch_time)
+
+        self.assertEqual(df[["strike_price", "option_type"]].duplicated().sum(), 0)
+        self.assertEqual(df["open_interest"].tolist(), [95, 180])
+
+    def test_missing_batch_returns_none(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = None
+
+        self.assertIsNone(SnapshotBatchRepository.nearest_batch(cursor, SYMBOL, self.target))
+        self.assertIsNone(SnapshotBatchRepository.previous_batch(cursor, SYMBOL, self.target))
+
+
+if __name__ == "__main__":
+    unittest.main()
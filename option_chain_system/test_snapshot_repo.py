@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from datetime import datetime
+import csv
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import pandas as pd
+    import pytz
+    from database.snapshot_repository import SnapshotRepository
+except Exception:
+    SnapshotRepository = None
+
+
+class _DuplicateId(Exception):
+    pgcode = "23505"
+
+    def __str__(self) -> str:
+        return 'duplicate key value violates unique constraint "option_chain_snapshot_pkey"'
+
+
+def _snapshot():
+    snapshot_time = pytz.timezone("Asia/Kolkata").localize(datetime(2026, 2, 20, 10, 0))
+    return pd.DataFrame(
+        {
+            "symbol": ["NSE:NIFTY50-INDEX"] * 2,
+            "strike_price": [22000.0, 22050.0],
+            "option_type": ["CE", "PE"],
+            "open_interest": [125000.0, float("nan")],
+            "oi_change": [-300.0, 450.0],
+            "volume": [9800.0, 120.0],
+            "ltp": [101.35, 0.05],
+            "snapshot_time": [snapshot_time] * 2,
+            "iv": [0.14, 0.16],
+        }
+    )
+
+
+@unittest.skipIf(SnapshotRepository is None, "db dependencies unavailable")
+class TestSnapshotCopy(unittest.TestCase):
+    def test_copy_buffer_matches_table_columns(self):
+        rows = list(csv.reader(SnapshotRepository._to_copy_buffer(_snapshot())))  # noqa: SLF001
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(len(rows[0]), len(SnapshotRepository.COPY_COLUMNS))
+        self.assertEqual(rows[0][3:6], ["125000", "-300", "9800"])
+        self.assertEqual(rows[1][3], "")
+        self.assertEqual(rows[0][7], "2026-02-20 10:00:00.000000+0530")
+
+    @patch("database.snapshot_repository.DatabaseConnection")
+    def test_bulk_insert_heals_sequence_and_retries(self, db):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.copy_expert.side_effect = [_DuplicateId(), None]
+        db.get_connection.return_value = conn
+
+        SnapshotRepository.bulk_insert_snapshot(_snapshot())
+
+        self.assertEqual(cursor.copy_expert.call_count, 2)
+        self.assertIn("COPY option_chain_snapshot", cursor.copy_expert.call_args[0][0])
+        self.assertTrue(any("setval" in str(c) for c in cursor.execute.call_args_list))
+        db.release_connection.assert_called_once_with(conn)
+
+    def test_batch_header_written_before_rows(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (42,)
+
+        batch_id = SnapshotRepository.write_snapshot(cursor, _snapshot(), spot_price=22010.0)
+
+        self.assertEqual(batch_id, 42)
+        sql, params = cursor.execute.call_args[0]
+        self.assertIn("INSERT INTO snapshot_batches", sql)
+        self.assertEqual(params[:4], ("NSE:NIFTY50-INDEX", _snapshot()["snapshot_time"].iloc[0], 2, 22010.0))
+        rows = list(csv.reader(cursor.copy_expert.call_args[0][1]))
+        self.assertEqual({row[-1] for row in rows}, {"42"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+import json
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    from config.settings import settings
+    from monitoring.stage_timer import TOTAL_STAGE, StageTimer, percentile
+except Exception:
+    StageTimer = None
+
+
+@unittest.skipIf(StageTimer is None, "stage timer dependencies unavailable")
+class TestStageTimer(unittest.TestCase):
+    def setUp(self):
+        StageTimer.clear()
+        self.log = Path(tempfile.mkdtemp()) / "stages.jsonl"
+        patcher = patch.object(settings, "STAGE_TIMING_LOG", str(self.log))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(StageTimer.clear)
+
+    def _records(self) -> list[dict]:
+        return [json.loads(line) for line in self.log.read_text(encoding="utf-8").splitlines()]
+
+    def test_cycle_records_stage_time_and_queries(self):
+        with StageTimer.cycle("NSE:NIFTY50-INDEX"):
+            with StageTimer.stage("fetch_chain"):
+                pass
+            with StageTimer.stage("db_writes"):
+                StageTimer.count_query(3)
+            StageTimer.count_query()
+
+        record = self._records()[0]
+        self.assertEqual(record["symbol"], "NSE:NIFTY50-INDEX")
+        self.assertEqual(record["status"], "ok")
+        self.assertEqual(record["stages"]["fetch_chain"]["queries"], 0)
+        self.assertEqual(record["stages"]["db_writes"]["queries"], 3)
+        self.assertEqual(record["stages"][TOTAL_STAGE]["queries"], 4)
+        self.assertEqual({row["stage"] for row in StageTimer.summary()}, {"fetch_chain", "db_writes", TOTAL_STAGE})
+
+    def test_failed_cycle_is_logged_and_reraised(self):
+        with self.assertRaises(ValueError):
+            with StageTimer.cycle("NSE:NIFTY50-INDEX"):
+                with StageTimer.stage("fetch_spot"):
+                    raise ValueError("boom")
+
+        record = self._records()[0]
+        self.assertEqual(record["status"], "failed")
+        self.assertIn("fetch_spot", record["stages"])
+
+    def test_concurrent_cycles_do_not_share_traces(self):
+        barrier = threading.Barrier(2)
+
+        def _cycle(symbol: str, queries: int) -> None:
+            with StageTimer.cycle(symbol):
+                barrier.wait()
+                with StageTimer.stage("levels"):
+                    StageTimer.count_query(queries)
+                barrier.wait()
+
+        threads = [threading.Thread(target=_cycle, args=(s, n)) for s, n in (("A", 1), ("B", 5))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        queries = {r["symbol"]: r["stages"]["levels"]["queries"] for r in self._records()}
+        self.assertEqual(queries, {"A": 1, "B": 5})
+
+    def test_outside_a_cycle_is_a_noop(self):
+        with StageTimer.stage("levels"):
+            StageTimer.count_query()
+        self.assertFalse(self.log.exists())
+        self.assertEqual(StageTimer.summary(), [])
+
+    def test_log_percentiles_per_symbol(self):
+        lines = [
+            {"symbol": "A" if i % 2 else "B", "stages": {"greeks": {"ms": float(i), "queries": 0}}}
+            for i in range(1, 201)
+        ]
+        self.log.write_text("\n".join(json.dumps(line) for line in lines) + "\nnot json\n", encoding="utf-8")
+
+        rows = StageTimer.summary(StageTimer.read_log(self.log, symbol="A"))
+
+        self.assertEqual(rows[0]["count"], 100)
+        self.assertEqual((rows[0]["p50"], rows[0]["p95"], rows[0]["p99"]), (99.0, 189.0, 197.0))
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    import numpy as np
+    from analytics.implied_volatility_engine import ImpliedVolatilityEngine
+    from benchmarking.engine_benchmark import EngineBenchmark
+    from benchmarking.stub_fyers import StubFyersModel
+    from benchmarking.synthetic_chain import ChainProfile, SyntheticChainGenerator
+    from data_layer.data_fetcher import OptionChainFetcher
+except Exception:
+    SyntheticChainGenerator = None
+
+SYMBOL = "NSE:NIFTY50-INDEX"
+
+
+@unittest.skipIf(SyntheticChainGenerator is None, "synthetic chain dependencies unavailable")
+class TestSyntheticChain(unittest.TestCase):
+    def test_same_seed_same_session(self):
+        a = SyntheticChainGenerator(ChainProfile(seed=3)).step().step()
+        b = SyntheticChainGenerator(ChainProfile(seed=3)).step().step()
+        c = SyntheticChainGenerator(ChainProfile(seed=4)).step().step()
+
+        self.assertEqual(a.options_chain_payload(), b.options_chain_payload())
+        self.assertNotEqual(a.options_chain_payload(), c.options_chain_payload())
+
+    def test_stub_payload_parses_through_fetcher(self):
+        generator = SyntheticChainGenerator(ChainProfile(strikes=100))
+        stub = StubFyersModel([generator])
+        fetcher = OptionChainFetcher(client=stub)
+
+        spot = fetcher.fetch_spot_price(SYMBOL)
+        df = fetcher.fetch_option_chain(SYMBOL, strike_count=10)
+
+        self.assertEqual(spot, round(generator.spot, 2))
+        self.assertEqual(df["strike_price"].nunique(), 21)
+        self.assertNotIn(-1, df["strike_price"].tolist())
+        self.assertEqual(set(df["option_type"]), {"CE", "PE"})
+        self.assertEqual(dict(stub.calls), {"quotes": 1, "optionchain": 1})
+
+    def test_no_expiries_is_the_empty_chain_response(self):
+        stub = StubFyersModel([SyntheticChainGenerator(ChainProfile(expiry_days=()))])
+
+        self.assertTrue(OptionChainFetcher(client=stub).fetch_option_chain(SYMBOL).empty)
+
+    def test_prices_invert_to_the_configured_smile(self):
+        generator = SyntheticChainGenerator(ChainProfile(strikes=40))
+        df = generator.frame()
+        near = df[(df["strike_price"] - generator.spot).abs() <= 500]
+
+        solved = ImpliedVolatilityEngine.solve(
+            spot=generator.spot,
+            strikes=near["strike_price"].to_numpy(),
+            prices=near["ltp"].to_numpy(),
+            time_years=generator._time_to_expiry(0),  # noqa: SLF001
+            is_call=(near["option_type"] == "CE").to_numpy(),
+        )
+        model = dict(zip(generator.strikes, generator.smile(0)))
+
+        np.testing.assert_allclose(solved, near["strike_price"].map(model).to_numpy(), atol=0.01)
+
+    def test_oi_walls_and_flow(self):
+        generator = SyntheticChainGenerator(ChainProfile(strikes=40, pe_flow_pct=2.0, vol_pct=0.0))
+        start = generator.frame()
+        walls = start[(start["strike_price"] % 500 == 0) & (start["option_type"] == "PE")]
+        others = start[(start["strike_price"] % 500 != 0) & (start["option_type"] == "PE")]
+
+        snapshots, spots = generator.session(6)
+
+        self.assertGreater(walls["open_interest"].mean(), others["open_interest"].mean())
+        last = snapshots[snapshots["snapshot_time"] == spots["snapshot_time"].iloc[-1]]
+        self.assertGreater(
+            last.loc[last["option_type"] == "PE", "open_interest"].sum(),
+            start.loc[start["option_type"] == "PE", "open_interest"].sum(),
+        )
+        self.assertEqual(len(spots), 6)
+
+
+@unittest.skipIf(SyntheticChainGenerator is None, "synthetic chain dependencies unavailable")
+class TestEngineBenchmark(unittest.TestCase):
+    def test_run_and_compare(self):
+        record = EngineBenchmark.run(sizes=[40], repeats=1, steps=4, engines=["max_pain", "pipeline"])
+        self.assertEqual([r["engine"] for r in record["results"]], ["max_pain", "pipeline"])
+
+        baseline = {"results": [{"strikes": 40, "engine": "greeks", "p50_ms": 10.0}, {"strikes": 40, "engine": "max_pain", "p50_ms": 0.2}]}
+        current = {"results": [{"strikes": 40, "engine": "greeks", "p50_ms": 14.0}, {"strikes": 40, "engine": "max_pain", "p50_ms": 0.4}]}
+        rows = {r["engine"]: r for r in EngineBenchmark.compare(current, baseline, tolerance=0.25)}
+
+        self.assertTrue(rows["greeks"]["regression"])
+        # +100% but under MIN_DELTA_MS: timer noise, not a regression.
+        self.assertFalse(rows["max_pain"]["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main()
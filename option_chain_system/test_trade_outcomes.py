@@ -0,0 +1,47 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from datetime import datetime
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    from database.trade_outcome_repository import TradeOutcomeRepository
+except Exception:
+    TradeOutcomeRepository = None
+
+
+@unittest.skipIf(TradeOutcomeRepository is None, "db dependencies unavailable")
+class TestSetBasedLabeling(unittest.TestCase):
+    @patch("database.trade_outcome_repository.execute_values")
+    def test_one_select_and_one_upsert_for_all_pending(self, execute_values):
+        exit_time = datetime(2026, 2, 20, 10, 30)
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            # signal_id, horizon, entry, sl, target, missing, exit_time, exit_ltp
+            (1, 10, 100.0, 25.0, 45.0, True, exit_time, 150.0),
+            (1, 30, 100.0, 25.0, 45.0, False, exit_time, 70.0),
+            (1, 60, 100.0, 25.0, 45.0, True, None, None),
+            (2, 60, 80.0, None, None, False, None, None),
+        ]
+
+        written = TradeOutcomeRepository.write_pending_outcomes(cursor, "NSE:NIFTY50-INDEX")
+
+        cursor.execute.assert_called_once()
+        self.assertIn("LATERAL", cursor.execute.call_args[0][0])
+        execute_values.assert_called_once()
+        rows = execute_values.call_args[0][2]
+        self.assertEqual(written, 3)
+        self.assertEqual([(r[0], r[1], r[6]) for r in rows], [(1, 10, "WIN"), (1, 30, "LOSS"), (1, 60, "OPEN")])
+
+    @patch("database.trade_outcome_repository.execute_values")
+    def test_nothing_to_write_when_all_open_unchanged(self, execute_values):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(5, 30, 90.0, 25.0, 45.0, False, None, None)]
+
+        self.assertEqual(TradeOutcomeRepository.write_outcomes_for_signal(cursor, 5), 0)
+        execute_values.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
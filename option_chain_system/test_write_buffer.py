@@ -0,0 +1,128 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+try:
+    from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+    from database.write_buffer import CycleWriteBuffer
+except Exception:
+    CycleWriteBuffer = None
+
+
+class _DuplicateId(Exception):
+    pgcode = "23505"
+
+
+class _Healer:
+    resets = 0
+
+    @staticmethod
+    def _is_id_duplicate(exc: Exception) -> bool:
+        return isinstance(exc, _DuplicateId)
+
+    @staticmethod
+    def _reset_id_sequence(cursor) -> None:
+        _Healer.resets += 1
+
+
+@unittest.skipIf(CycleWriteBuffer is None, "db dependencies unavailable")
+class TestCycleWriteBuffer(unittest.TestCase):
+    def setUp(self):
+        self.conn = MagicMock()
+        self.cursor = self.conn.cursor.return_value
+        patcher = patch("database.write_buffer.DatabaseConnection")
+        self.db = patcher.start()
+        self.db.get_connection.return_value = self.conn
+        self.addCleanup(patcher.stop)
+
+    def test_flush_uses_one_connection_and_commit(self):
+        writes = CycleWriteBuffer()
+        writes.add("Snapshot", lambda cursor: cursor.execute("INSERT 1"))
+        writes.add("Summary", lambda cursor: cursor.execute("INSERT 2"))
+        writes.add("Trade signal", lambda cursor: 42, required=False)
+
+        results = writes.flush()
+
+        self.assertEqual(results["Trade signal"], 42)
+        self.db.get_connection.assert_called_once()
+        self.conn.commit.assert_called_once()
+        self.db.release_connection.assert_called_once_with(self.conn)
+        self.assertEqual(len(writes), 0)
+
+    def test_optional_failure_keeps_other_writes(self):
+        def fail(cursor):
+            raise ValueError("bad scalp row")
+
+        writes = CycleWriteBuffer()
+        writes.add("Snapshot", lambda cursor: "ok")
+        writes.add("Scalp score", fail, required=False)
+        results = writes.flush()
+
+        self.assertEqual(results, {"Snapshot": "ok", "Scalp score": None})
+        self.cursor.execute.assert_any_call("ROLLBACK TO SAVEPOINT cycle_write")
+        self.conn.commit.assert_called_once()
+
+    def test_required_failure_rolls_back_cycle(self):
+        def fail(cursor):
+            raise ValueError("bad snapshot")
+
+        writes = CycleWriteBuffer()
+        writes.add("Snapshot", fail)
+        with self.assertRaises(RuntimeError):
+            writes.flush()
+
+        self.conn.commit.assert_not_called()
+        self.conn.rollback.assert_called_once()
+        self.db.release_connection.assert_called_once_with(self.conn)
+
+    def test_sequence_drift_is_healed_once(self):
+        attempts = []
+
+        def insert(cursor):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise _DuplicateId("duplicate key")
+            return "inserted"
+
+        _Healer.resets = 0
+        writes = CycleWriteBuffer()
+        writes.add("Snapshot", insert, healer=_Healer)
+        results = writes.flush()
+
+        self.assertEqual(results["Snapshot"], "inserted")
+        self.assertEqual(_Healer.resets, 1)
+        self.conn.commit.assert_called_once()
+
+    def test_failed_healed_retry_is_rolled_back_to_savepoint(self):
+        def insert(cursor):
+            raise _DuplicateId("duplicate key")
+
+        _Healer.resets = 0
+        writes = CycleWriteBuffer()
+        writes.add("Snapshot", lambda cursor: "ok")
+        writes.add("Scalp score", insert, required=False, healer=_Healer)
+        writes.add("Trade signal", lambda cursor: 42, required=False)
+        results = writes.flush()
+
+        self.assertEqual(results, {"Snapshot": "ok", "Scalp score": None, "Trade signal": 42})
+        self.assertEqual(_Healer.resets, 1)
+        rollbacks = [c for c in self.cursor.execute.call_args_list if c.args == ("ROLLBACK TO SAVEPOINT cycle_write",)]
+        self.assertEqual(len(rollbacks), 2)
+        self.conn.commit.assert_called_once()
+
+    def test_aborted_transaction_is_not_committed(self):
+        self.conn.get_transaction_status.return_value = TRANSACTION_STATUS_INERROR
+        writes = CycleWriteBuffer()
+        writes.add("Snapshot", lambda cursor: "ok")
+
+        with self.assertRaises(RuntimeError):
+            writes.flush()
+
+        self.conn.commit.assert_not_called()
+        self.conn.rollback.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()